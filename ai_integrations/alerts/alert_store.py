@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+"""Append-only alert store: in-memory ring buffer backed by SQLite (WAL).
+
+The newest `ring_size` alerts are kept in a fixed-size deque for cheap
+"latest N" reads. Every alert is also appended to an SQLite table in WAL
+mode, so history survives restarts and is shared by all worker processes
+that point at the same file. Appends only touch memory; a background
+writer thread inserts them in one transaction per `batch_size` alerts or
+every `flush_interval_s`, and queries flush first to read their own writes.
+
+Queries filter on time range, severity, source_id, model and minimum risk
+and return newest first, paging by keyset: the cursor encodes the
+``(ts, id)`` of the last row returned. Each filter column has a
+``(column, ts, id)`` index, so a page (with or without a time range) is an
+index range scan regardless of table size.
+
+Configuration (env): TS360_ALERT_DB (unset or empty for memory only)
+and TS360_ALERT_RING_SIZE.
+"""
+
+import sqlite3
+import threading
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Deque, Dict, List, Optional, Tuple, Union
+
+if TYPE_CHECKING:  # fraud_alerter imports this module
+    from alerts.fraud_alerter import FraudAlert
+
+__all__ = ["AlertQuery", "AlertStore", "decode_cursor", "encode_cursor"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS alerts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    transaction_id TEXT NOT NULL,
+    source_id TEXT NOT NULL,
+    target_id TEXT NOT NULL,
+    amount REAL NOT NULL,
+    risk_score REAL NOT NULL,
+    model_used TEXT NOT NULL,
+    severity TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_alerts_ts ON alerts (ts, id);
+CREATE INDEX IF NOT EXISTS ix_alerts_severity ON alerts (severity, ts, id);
+CREATE INDEX IF NOT EXISTS ix_alerts_source ON alerts (source_id, ts, id);
+CREATE INDEX IF NOT EXISTS ix_alerts_model ON alerts (model_used, ts, id);
+"""
+
+_INSERT = (
+    "INSERT INTO alerts (ts, transaction_id, source_id, target_id, amount, risk_score, model_used, severity) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_COLUMNS = "id, ts, transaction_id, source_id, target_id, amount, risk_score, model_used, severity"
+
+
+def encode_cursor(ts: float, alert_id: int) -> str:
+    return f"{ts!r}_{alert_id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    try:
+        ts, _, alert_id = cursor.rpartition("_")
+        return float(ts), int(alert_id)
+    except ValueError:
+        raise ValueError(f"Malformed alert cursor {cursor!r}") from None
+
+
+@dataclass
+class AlertQuery:
+    """Filters for `AlertStore.query`; None means "any"."""
+
+    severity: Optional[str] = None
+    source_id: Optional[str] = None
+    model_used: Optional[str] = None
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    min_risk: Optional[float] = None
+
+    def where(self) -> Tuple[List[str], List[Any]]:
+        clauses: List[str] = []
+        params: List[Any] = []
+        for column, value in (("severity", self.severity), ("source_id", self.source_id), ("model_used", self.model_used)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if self.since is not None:
+            clauses.append("ts >= ?")
+            params.append(self.since.timestamp())
+        if self.until is not None:
+            clauses.append("ts < ?")
+            params.append(self.until.timestamp())
+        if self.min_risk is not None:
+            clauses.append("risk_score >= ?")
+            params.append(self.min_risk)
+        return clauses, params
+
+    def matches(self, alert: FraudAlert) -> bool:
+        return (
+            (self.severity is None or alert.severity == self.severity)
+            and (self.source_id is None or alert.source_id == self.source_id)
+            and (self.model_used is None or alert.model_used == self.model_used)
+            and (self.since is None or alert.timestamp.timestamp() >= self.since.timestamp())
+            and (self.until is None or alert.timestamp.timestamp() < self.until.timestamp())
+            and (self.min_risk is None or alert.risk_score >= self.min_risk)
+        )
+
+
+class AlertStore:
+    """Ring buffer of recent alerts plus an optional durable SQLite log."""
+
+    def __init__(
+        self,
+        path: Union[str, Path, None] = "alerts.db",
+        ring_size: int = 1000,
+        batch_size: int = 256,
+        flush_interval_s: float = 1.0,
+    ):
+        self.path = Path(path) if path else None
+        self.ring_size = ring_size
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        # (id, alert); ids are only assigned locally when there is no database
+        self._ring: Deque[Tuple[int, FraudAlert]] = deque(maxlen=ring_size)
+        self._pending: List[FraudAlert] = []
+        self._next_id = 1
+        self._lock = threading.Lock()  # ring + pending
+        self._db_lock = threading.Lock()  # connection
+        self._wake = threading.Event()
+        self._closed = False
+        self.rejected = 0  # rows SQLite refused (constraint violations), dropped rather than retried
+        self._writer: threading.Thread | None = None
+        self._conn: sqlite3.Connection | None = None
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")  # durable at checkpoints, fsync-free commits
+            self._conn.execute("PRAGMA busy_timeout=5000")  # other workers may hold the write lock
+            self._conn.executescript(_SCHEMA)
+            self._writer = threading.Thread(target=self._write_loop, name="ts360-alert-store", daemon=True)
+            self._writer.start()
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+    def append(self, alert: FraudAlert) -> None:
+        with self._lock:
+            self._ring.append((self._next_id, alert))
+            self._next_id += 1
+            if self._conn is not None:
+                self._pending.append(alert)
+                if len(self._pending) >= self.batch_size:
+                    self._wake.set()
+
+    def _write_loop(self) -> None:
+        while not self._closed:
+            self._wake.wait(self.flush_interval_s)
+            self._wake.clear()
+            try:
+                self.flush()
+            except sqlite3.Error as e:  # rows stay pending and are retried
+                print(f"Alert store flush failed: {e}")
+
+    def flush(self) -> None:
+        """Write pending alerts to SQLite in a single transaction."""
+        with self._db_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+            if not pending or self._conn is None:
+                return
+            rows = [
+                (a.timestamp.timestamp(), a.transaction_id, a.source_id, a.target_id,
+                 float(a.amount), float(a.risk_score), a.model_used, a.severity)
+                for a in pending
+            ]
+            try:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(_INSERT, rows)
+                self._conn.execute("COMMIT")
+            except sqlite3.IntegrityError:
+                # One bad row must not block the batch forever: keep the rest, drop the rejects
+                self._conn.execute("ROLLBACK")
+                self._insert_each(rows)
+            except BaseException:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                with self._lock:
+                    self._pending[:0] = pending
+                raise
+
+    def _insert_each(self, rows: List[Tuple[Any, ...]]) -> None:
+        self._conn.execute("BEGIN")
+        try:
+            for row in rows:
+                try:
+                    self._conn.execute(_INSERT, row)
+                except sqlite3.IntegrityError as e:
+                    self.rejected += 1
+                    print(f"Alert store dropped alert {row[1]!r}: {e}")
+            self._conn.execute("COMMIT")
+        except BaseException:
+            if self._conn.in_transaction:
+                self._conn.execute("ROLLBACK")
+            raise
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def recent(self, limit: int = 10) -> List[FraudAlert]:
+        """Latest *limit* alerts seen by this process, oldest first."""
+        if limit <= 0:
+            return []
+        with self._lock:
+            return [a for _, a in list(self._ring)[-limit:]]
+
+    def query(
+        self, filters: Optional[AlertQuery] = None, limit: int = 20, cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Newest-first page of matching alerts and the cursor for the next page."""
+        filters = filters or AlertQuery()
+        after = decode_cursor(cursor) if cursor else None
+        if self._conn is None:
+            return self._query_ring(filters, limit, after)
+        clauses, params = filters.where()
+        if after is not None:
+            clauses.append("(ts, id) < (?, ?)")
+            params.extend(after)
+        sql = f"SELECT {_COLUMNS} FROM alerts"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY ts DESC, id DESC LIMIT ?"
+        self.flush()  # read your own writes
+        with self._db_lock:
+            rows = self._conn.execute(sql, (*params, limit + 1)).fetchall()
+        page = [self._row_to_dict(r) for r in rows[:limit]]
+        next_cursor = encode_cursor(rows[limit - 1][1], rows[limit - 1][0]) if len(rows) > limit else None
+        return page, next_cursor
+
+    def _query_ring(
+        self, filters: AlertQuery, limit: int, after: Optional[Tuple[float, int]]
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        with self._lock:
+            entries = [(a.timestamp.timestamp(), alert_id, a) for alert_id, a in self._ring]
+        entries.sort(key=lambda e: e[:2], reverse=True)
+        matched = [
+            e for e in entries
+            if (after is None or e[:2] < after) and filters.matches(e[2])
+        ]
+        page = [{"id": alert_id, **alert.to_dict()} for _, alert_id, alert in matched[:limit]]
+        next_cursor = encode_cursor(*matched[limit - 1][:2]) if len(matched) > limit else None
+        return page, next_cursor
+
+    def count(self) -> int:
+        if self._conn is None:
+            return len(self._ring)
+        self.flush()
+        with self._db_lock:
+            return self._conn.execute("SELECT COUNT(*) FROM alerts").fetchone()[0]
+
+    @staticmethod
+    def _row_to_dict(row: Tuple[Any, ...]) -> Dict[str, Any]:
+        alert_id, ts, transaction_id, source_id, target_id, amount, risk_score, model_used, severity = row
+        return {
+            "id": alert_id,
+            "transaction_id": transaction_id,
+            "source_id": source_id,
+            "target_id": target_id,
+            "amount": amount,
+            "risk_score": risk_score,
+            "model_used": model_used,
+            "timestamp": datetime.fromtimestamp(ts).isoformat(),
+            "severity": severity,
+        }
+
+    def close(self) -> None:
+        self._closed = True
+        self._wake.set()
+        if self._writer is not None:
+            self._writer.join()
+            self._writer = None
+        self.flush()
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
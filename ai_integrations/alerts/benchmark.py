@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+"""Benchmark pooled vs per-message alert connections against local stand-ins.
+
+Starts a minimal SMTP server and a minimal HTTP/1.1 webhook server on
+localhost, then delivers the same alerts twice per channel:
+
+    per-message  a new SMTP connection (aiosmtplib.send) / a new aiohttp
+                 ClientSession for every alert, as the channels used to do
+    pooled       EmailAlerter / SlackAlerter with their long-lived pools
+
+`--handshake-ms` delays every new connection on the server side to stand in
+for the TCP + TLS + AUTH round trips a real relay or Slack costs.
+
+Usage:
+    python -m alerts.benchmark --alerts 500 --concurrency 16 --handshake-ms 20
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+import aiosmtplib  # type: ignore
+
+from alerts.fraud_alerter import EmailAlerter, FraudAlert, SlackAlerter
+
+__all__ = ["StandInSMTPServer", "StandInWebhookServer", "run_benchmark"]
+
+
+# ----------------------------------------------------------------------
+# Stand-in servers
+# ----------------------------------------------------------------------
+class _StandInServer:
+    def __init__(self, handshake_ms: float = 0.0):
+        self.handshake_s = handshake_ms / 1000.0
+        self.connections = 0
+        self.messages = 0
+        self.port = 0
+        self._server: asyncio.AbstractServer | None = None
+
+    async def start(self) -> "_StandInServer":
+        self._server = await asyncio.start_server(self._accept, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def reset(self) -> None:
+        self.connections = self.messages = 0
+
+    async def _accept(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        await asyncio.sleep(self.handshake_s)
+        try:
+            await self._serve(reader, writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        raise NotImplementedError
+
+
+class StandInSMTPServer(_StandInServer):
+    """Accepts EHLO, AUTH PLAIN, MAIL/RCPT/DATA, NOOP, RSET and QUIT."""
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        writer.write(b"220 localhost ESMTP stand-in\r\n")
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            verb = line[:4].upper()
+            if verb in (b"EHLO", b"HELO"):
+                writer.write(b"250-localhost\r\n250-AUTH PLAIN\r\n250 8BITMIME\r\n")
+            elif verb == b"AUTH":
+                if len(line.split()) < 3:  # credentials follow on the next line
+                    writer.write(b"334 \r\n")
+                    await writer.drain()
+                    await reader.readline()
+                writer.write(b"235 2.7.0 Authentication successful\r\n")
+            elif verb == b"DATA":
+                writer.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+                await writer.drain()
+                while (await reader.readline()) not in (b".\r\n", b""):
+                    pass
+                self.messages += 1
+                writer.write(b"250 2.0.0 Ok: queued\r\n")
+            elif verb == b"QUIT":
+                writer.write(b"221 2.0.0 Bye\r\n")
+                await writer.drain()
+                return
+            else:  # MAIL, RCPT, NOOP, RSET
+                writer.write(b"250 2.0.0 Ok\r\n")
+            await writer.drain()
+
+
+class StandInWebhookServer(_StandInServer):
+    """HTTP/1.1 keep-alive server that answers every request with 200 ok."""
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for header in head.split(b"\r\n")[1:]:
+                name, _, value = header.partition(b":")
+                if name.strip().lower() == b"content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+            self.messages += 1
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\nConnection: keep-alive\r\n\r\nok")
+            await writer.drain()
+
+
+# ----------------------------------------------------------------------
+# Runs
+# ----------------------------------------------------------------------
+def _alerts(n: int) -> List[FraudAlert]:
+    return [
+        FraudAlert(
+            transaction_id=f"T{i:07d}", source_id="U0001", target_id="M0001",
+            amount=100.0 + i, risk_score=0.95, model_used="isolation_forest", severity="CRITICAL",
+        )
+        for i in range(n)
+    ]
+
+
+async def _drive(send: Callable[[FraudAlert], Awaitable[Any]], alerts: List[FraudAlert], concurrency: int) -> float:
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one(alert: FraudAlert) -> None:
+        async with slots:
+            await send(alert)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(a) for a in alerts))
+    return time.perf_counter() - start
+
+
+def _row(channel: str, mode: str, seconds: float, server: _StandInServer) -> Dict[str, Any]:
+    return {
+        "channel": channel,
+        "mode": mode,
+        "seconds": round(seconds, 3),
+        "alerts_per_second": round(server.messages / seconds, 1) if seconds else 0.0,
+        "delivered": server.messages,
+        "connections": server.connections,
+    }
+
+
+async def run_benchmark(n_alerts: int = 500, concurrency: int = 16, handshake_ms: float = 20.0) -> List[Dict[str, Any]]:
+    import aiohttp  # type: ignore
+
+    alerts = _alerts(n_alerts)
+    smtp = await StandInSMTPServer(handshake_ms).start()
+    hook = await StandInWebhookServer(handshake_ms).start()
+    email = EmailAlerter("127.0.0.1", smtp.port, username="bench", password="bench", start_tls=False)
+    slack = SlackAlerter(f"http://127.0.0.1:{hook.port}/hook")
+    results = []
+    try:
+        async def smtp_per_message(alert: FraudAlert) -> None:
+            await aiosmtplib.send(
+                email._build_message(alert), hostname="127.0.0.1", port=smtp.port,
+                start_tls=False, username="bench", password="bench",
+            )
+
+        results.append(_row("email", "per-message", await _drive(smtp_per_message, alerts, concurrency), smtp))
+        smtp.reset()
+        results.append(_row("email", "pooled", await _drive(email.send_alert, alerts, concurrency), smtp))
+
+        async def webhook_per_message(alert: FraudAlert) -> None:
+            async with aiohttp.ClientSession() as session:
+                async with session.post(slack.webhook_url, json={"text": alert.transaction_id}) as resp:
+                    await resp.read()
+
+        results.append(_row("slack", "per-message", await _drive(webhook_per_message, alerts, concurrency), hook))
+        hook.reset()
+        results.append(_row("slack", "pooled", await _drive(slack.send_alert, alerts, concurrency), hook))
+    finally:
+        await email.close()
+        await slack.close()
+        await smtp.stop()
+        await hook.stop()
+    return results
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Pooled vs per-message alert delivery benchmark")
+    parser.add_argument("--alerts", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--handshake-ms", type=float, default=20.0,
+                        help="server-side delay per new connection (stands in for TCP+TLS+AUTH)")
+    args = parser.parse_args(argv)
+
+    rows = asyncio.run(run_benchmark(args.alerts, args.concurrency, args.handshake_ms))
+    print(f"{'channel':8} {'mode':12} {'seconds':>8} {'alerts/s':>10} {'delivered':>10} {'connections':>12}")
+    for r in rows:
+        print(f"{r['channel']:8} {r['mode']:12} {r['seconds']:>8} {r['alerts_per_second']:>10} "
+              f"{r['delivered']:>10} {r['connections']:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,57 @@
 from __future__ import annotations
 
-"""Real-time fraud alerting system supporting multiple channels."""
+"""Real-time fraud alerting system supporting multiple channels.
+
+Alerts raised on the scoring path are *enqueued* (`enqueue_fraud_alert`) into
+a bounded in-memory priority queue (most severe first) and delivered by a pool
+of background workers, so request latency never depends on SMTP/Slack/SMS.
+Each channel call has its own timeout and is retried with jittered
+exponential backoff. When the queue is full the overflow policy applies:
+
+    drop_lowest  evict the least severe queued alert (or the new one if it is
+                 not more severe than anything queued)
+    spill        append the new alert to a JSONL file; it is re-queued once
+                 the workers have drained the queue
+
+Configuration (env): TS360_ALERT_QUEUE_SIZE, TS360_ALERT_WORKERS,
+TS360_ALERT_TIMEOUTS ("email=10,slack=3,default=5"), TS360_ALERT_RETRIES,
+TS360_ALERT_OVERFLOW and TS360_ALERT_SPILL_PATH.
+
+Channels keep long-lived connections: email reuses authenticated SMTP
+sessions from a small pool (TS360_SMTP_POOL_SIZE) and Slack posts through one
+keep-alive HTTP session (TS360_HTTP_POOL_SIZE connections). Idle SMTP
+sessions are checked with NOOP before reuse, and a request that hits a
+connection the server already closed is retried once on a fresh one.
+`python -m alerts.benchmark` compares this with per-message connections
+against local stand-in servers.
+
+Before queueing, alerts are coalesced per entity (``ring_id`` when the
+transaction carries one, else ``source_id``) and severity. Each severity has
+a window (TS360_ALERT_WINDOWS, default "CRITICAL=0,HIGH=5,MEDIUM=30,LOW=120"
+seconds); alerts arriving within it go out as one digest per channel, and a
+window of 0 sends immediately. Repeats of the same transaction are
+suppressed for TS360_ALERT_DEDUP_TTL seconds.
+"""
 
 import asyncio
+import heapq
+import itertools
 import json
 import os
+import random
+import threading
+import time
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from pathlib import Path
+from collections import OrderedDict
+from typing import Callable, Dict, List, Any, Optional, Tuple, Union
 
 import aiosmtplib  # type: ignore
 from email.message import EmailMessage
 
+from alerts.alert_store import AlertQuery, AlertStore
+
 
 @dataclass
 class FraudAlert:
@@ -36,37 +76,252 @@ class FraudAlert:
             "severity": self.severity
         }
 
+    @classmethod
+    def from_dict(cls, record: Dict[str, Any]) -> "FraudAlert":
+        return cls(**{**record, "timestamp": datetime.fromisoformat(record["timestamp"])})
+
+
+@dataclass
+class AlertDigest:
+    """Alerts for one entity and severity coalesced over a window."""
+
+    group: str
+    severity: str
+    alerts: List[FraudAlert] = field(default_factory=list)
+
+    @property
+    def total_amount(self) -> float:
+        return sum(a.amount for a in self.alerts)
+
+    @property
+    def max_risk(self) -> float:
+        return max(a.risk_score for a in self.alerts)
+
+    def lines(self, limit: int) -> List[str]:
+        """One line per transaction (highest risk first), capped at *limit*."""
+        ranked = sorted(self.alerts, key=lambda a: a.risk_score, reverse=True)
+        out = [
+            f"{a.transaction_id}  ${a.amount:,.2f}  risk {a.risk_score:.3f}  {a.source_id} → {a.target_id}"
+            for a in ranked[:limit]
+        ]
+        if len(ranked) > limit:
+            out.append(f"… and {len(ranked) - limit} more")
+        return out
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "group": self.group,
+            "severity": self.severity,
+            "alerts": [a.to_dict() for a in self.alerts],
+        }
+
+    @classmethod
+    def from_dict(cls, record: Dict[str, Any]) -> "AlertDigest":
+        return cls(record["group"], record["severity"], [FraudAlert.from_dict(a) for a in record["alerts"]])
+
+
+# What the queue carries and channels deliver
+Delivery = Union[FraudAlert, AlertDigest]
+
 
 class AlertChannel:
     """Base class for alert channels."""
+
+    name = "channel"
     
     async def send_alert(self, alert: FraudAlert) -> bool:
         raise NotImplementedError
 
+    async def send_digest(self, digest: AlertDigest) -> bool:
+        """Send a coalesced digest; channels without a digest format send each alert."""
+        results = [await self.send_alert(a) for a in digest.alerts]
+        return all(results)
+
+    async def check_health(self) -> bool:
+        """Cheap liveness probe of the channel's backend."""
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+    async def close(self) -> None:
+        """Release pooled connections."""
+
+
+# ----------------------------------------------------------------------
+# Connection pooling
+# ----------------------------------------------------------------------
+@dataclass
+class _SMTPSession:
+    client: aiosmtplib.SMTP
+    sent: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class SMTPConnectionPool:
+    """Authenticated SMTP sessions reused across messages.
+
+    At most `max_connections` sessions send concurrently. A session idle for
+    longer than `idle_check_s` is probed with NOOP before reuse, and sessions
+    are recycled after `max_messages` sends (relays often cap this).
+    """
+
+    def __init__(
+        self,
+        hostname: str,
+        port: int,
+        username: str = "",
+        password: str = "",
+        start_tls: bool = True,
+        max_connections: int = 4,
+        max_messages: int = 100,
+        idle_check_s: float = 30.0,
+        timeout: float = 10.0,
+    ):
+        self.hostname = hostname
+        self.port = port
+        self.username = username
+        self.password = password
+        self.start_tls = start_tls
+        self.max_connections = max_connections
+        self.max_messages = max_messages
+        self.idle_check_s = idle_check_s
+        self.timeout = timeout
+        self._idle: List[_SMTPSession] = []
+        self._slots: asyncio.Semaphore | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self.counters = {"opened": 0, "reused": 0, "recycled": 0, "stale": 0}
+
+    def _bind_loop(self) -> asyncio.Semaphore:
+        # Sessions belong to the loop that opened them; start over on a new loop
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            for session in self._idle:
+                session.client.close()
+            self._idle = []
+            self._slots = asyncio.Semaphore(self.max_connections)
+            self._loop = loop
+        assert self._slots is not None
+        return self._slots
+
+    async def _open(self) -> _SMTPSession:
+        client = aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            start_tls=self.start_tls,
+            username=self.username or None,
+            password=self.password or None,
+            timeout=self.timeout,
+        )
+        await client.connect()  # EHLO, STARTTLS and AUTH happen once here
+        self.counters["opened"] += 1
+        return _SMTPSession(client)
+
+    def _discard(self, session: _SMTPSession) -> None:
+        session.client.close()
+
+    async def _acquire(self) -> _SMTPSession:
+        while self._idle:
+            session = self._idle.pop()  # LIFO keeps the warmest session busy
+            if not session.client.is_connected:
+                self.counters["stale"] += 1
+                continue
+            if time.monotonic() - session.last_used > self.idle_check_s:
+                try:
+                    await session.client.noop()
+                except Exception:  # noqa - server dropped the idle session
+                    self.counters["stale"] += 1
+                    self._discard(session)
+                    continue
+            self.counters["reused"] += 1
+            return session
+        return await self._open()
+
+    def _release(self, session: _SMTPSession) -> None:
+        session.sent += 1
+        session.last_used = time.monotonic()
+        if session.sent >= self.max_messages:
+            self.counters["recycled"] += 1
+            self._discard(session)
+        else:
+            self._idle.append(session)
+
+    async def send(self, message: EmailMessage) -> None:
+        async with self._bind_loop():
+            session = await self._acquire()
+            try:
+                try:
+                    await session.client.send_message(message)
+                except aiosmtplib.SMTPServerDisconnected:
+                    # Closed between the health check and the send: one fresh attempt
+                    self.counters["stale"] += 1
+                    self._discard(session)
+                    session = await self._open()
+                    await session.client.send_message(message)
+            except BaseException:
+                self._discard(session)
+                raise
+            self._release(session)
+
+    async def check_health(self) -> bool:
+        async with self._bind_loop():
+            session = await self._acquire()
+            try:
+                await session.client.noop()
+            except Exception:  # noqa
+                self._discard(session)
+                return False
+            self._idle.append(session)
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {"idle": len(self._idle), "max_connections": self.max_connections, **self.counters}
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for session in idle:
+            try:
+                await session.client.quit()
+            except Exception:  # noqa
+                session.client.close()
+
 
 class EmailAlerter(AlertChannel):
-    """Email alert channel using SMTP."""
+    """Email alert channel using pooled SMTP sessions."""
+
+    name = "email"
     
-    def __init__(self, smtp_host: str = "smtp.gmail.com", smtp_port: int = 587):
+    def __init__(
+        self,
+        smtp_host: str = "smtp.gmail.com",
+        smtp_port: int = 587,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        start_tls: bool = True,
+        max_connections: Optional[int] = None,
+    ):
         self.smtp_host = smtp_host
         self.smtp_port = smtp_port
-        self.username = os.getenv("SMTP_USERNAME", "")
-        self.password = os.getenv("SMTP_PASSWORD", "")
+        self.username = os.getenv("SMTP_USERNAME", "") if username is None else username
+        self.password = os.getenv("SMTP_PASSWORD", "") if password is None else password
         self.from_email = os.getenv("ALERT_FROM_EMAIL", "trustshield@walmart.com")
         self.to_emails = os.getenv("ALERT_TO_EMAILS", "security@walmart.com").split(",")
-    
-    async def send_alert(self, alert: FraudAlert) -> bool:
-        if not self.username or not self.password:
-            print(f"[EMAIL] Mock alert: {alert.transaction_id} - Risk: {alert.risk_score:.3f}")
-            return True
-            
-        try:
-            message = EmailMessage()
-            message["From"] = self.from_email
-            message["To"] = ", ".join(self.to_emails)
-            message["Subject"] = f"🚨 TrustShield Alert: {alert.severity} Risk Transaction"
-            
-            body = f"""
+        self.pool = SMTPConnectionPool(
+            smtp_host,
+            smtp_port,
+            self.username,
+            self.password,
+            start_tls=start_tls,
+            max_connections=max_connections or int(os.getenv("TS360_SMTP_POOL_SIZE", "4")),
+        )
+
+    def _build_message(self, alert: FraudAlert) -> EmailMessage:
+        message = EmailMessage()
+        message["From"] = self.from_email
+        message["To"] = ", ".join(self.to_emails)
+        message["Subject"] = f"🚨 TrustShield Alert: {alert.severity} Risk Transaction"
+        
+        body = f"""
 TrustShield 360 Fraud Alert
 
 Transaction ID: {alert.transaction_id}
@@ -81,27 +336,115 @@ Target: {alert.target_id}
 
 This transaction has been flagged for manual review.
             """
-            message.set_content(body)
+        message.set_content(body)
+        return message
+    
+    def _build_digest_message(self, digest: AlertDigest) -> EmailMessage:
+        message = EmailMessage()
+        message["From"] = self.from_email
+        message["To"] = ", ".join(self.to_emails)
+        message["Subject"] = (
+            f"🚨 TrustShield Digest: {len(digest.alerts)} {digest.severity} Risk Transactions ({digest.group})"
+        )
+        rows = "\n".join(digest.lines(limit=100))
+        message.set_content(f"""
+TrustShield 360 Fraud Alert Digest
+
+Entity: {digest.group}
+Severity: {digest.severity}
+Transactions: {len(digest.alerts)}
+Total Amount: ${digest.total_amount:,.2f}
+Max Risk Score: {digest.max_risk:.3f}
+
+{rows}
+
+These transactions have been flagged for manual review.
+""")
+        return message
+    
+    async def send_alert(self, alert: FraudAlert) -> bool:
+        if not self.username or not self.password:
+            print(f"[EMAIL] Mock alert: {alert.transaction_id} - Risk: {alert.risk_score:.3f}")
+            return True
             
-            await aiosmtplib.send(
-                message,
-                hostname=self.smtp_host,
-                port=self.smtp_port,
-                start_tls=True,
-                username=self.username,
-                password=self.password,
-            )
+        try:
+            await self.pool.send(self._build_message(alert))
             return True
         except Exception as e:
             print(f"Email alert failed: {e}")
             return False
 
+    async def send_digest(self, digest: AlertDigest) -> bool:
+        if not self.username or not self.password:
+            print(f"[EMAIL] Mock digest: {len(digest.alerts)} {digest.severity} alerts for {digest.group}")
+            return True
+
+        try:
+            await self.pool.send(self._build_digest_message(digest))
+            return True
+        except Exception as e:
+            print(f"Email digest failed: {e}")
+            return False
+
+    async def check_health(self) -> bool:
+        if not self.username or not self.password:
+            return True
+        return await self.pool.check_health()
+
+    def stats(self) -> Dict[str, Any]:
+        return self.pool.stats()
+
+    async def close(self) -> None:
+        await self.pool.close()
+
 
 class SlackAlerter(AlertChannel):
-    """Slack alert channel using webhook."""
+    """Slack alert channel using webhook over a keep-alive HTTP session."""
+
+    name = "slack"
+
+    severity_colors = {
+        "LOW": "#36a64f",
+        "MEDIUM": "#ff9500", 
+        "HIGH": "#ff0000",
+        "CRITICAL": "#8b0000"
+    }
     
-    def __init__(self):
-        self.webhook_url = os.getenv("SLACK_WEBHOOK_URL", "")
+    def __init__(self, webhook_url: Optional[str] = None, max_connections: Optional[int] = None, timeout: float = 10.0):
+        self.webhook_url = os.getenv("SLACK_WEBHOOK_URL", "") if webhook_url is None else webhook_url
+        self.max_connections = max_connections or int(os.getenv("TS360_HTTP_POOL_SIZE", "8"))
+        self.timeout = timeout
+        self._session = None  # aiohttp.ClientSession, created on first use
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self.counters = {"sessions": 0, "requests": 0, "stale": 0, "non_200": 0}
+
+    async def _get_session(self):
+        import aiohttp  # type: ignore
+
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            # The connector bounds concurrent sockets and keeps them alive between posts
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=30),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+            self._loop = loop
+            self.counters["sessions"] += 1
+        return self._session
+
+    async def _post(self, payload: Dict[str, Any]) -> int:
+        import aiohttp  # type: ignore
+
+        session = await self._get_session()
+        self.counters["requests"] += 1
+        try:
+            async with session.post(self.webhook_url, json=payload) as resp:
+                return resp.status
+        except (aiohttp.ServerDisconnectedError, aiohttp.ClientOSError):
+            # Keep-alive socket closed by the server while idle: retry once
+            self.counters["stale"] += 1
+            async with session.post(self.webhook_url, json=payload) as resp:
+                return resp.status
     
     async def send_alert(self, alert: FraudAlert) -> bool:
         if not self.webhook_url:
@@ -109,18 +452,9 @@ class SlackAlerter(AlertChannel):
             return True
             
         try:
-            import aiohttp  # type: ignore
-            
-            severity_colors = {
-                "LOW": "#36a64f",
-                "MEDIUM": "#ff9500", 
-                "HIGH": "#ff0000",
-                "CRITICAL": "#8b0000"
-            }
-            
             payload = {
                 "attachments": [{
-                    "color": severity_colors.get(alert.severity, "#ff0000"),
+                    "color": self.severity_colors.get(alert.severity, "#ff0000"),
                     "title": f"🚨 TrustShield Fraud Alert - {alert.severity}",
                     "fields": [
                         {"title": "Transaction ID", "value": alert.transaction_id, "short": True},
@@ -134,17 +468,65 @@ class SlackAlerter(AlertChannel):
                 }]
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(self.webhook_url, json=payload) as resp:
-                    return resp.status == 200
+            status = await self._post(payload)
+            if status != 200:
+                self.counters["non_200"] += 1
+            return status == 200
                     
         except Exception as e:
             print(f"Slack alert failed: {e}")
             return False
 
+    async def send_digest(self, digest: AlertDigest) -> bool:
+        if not self.webhook_url:
+            print(f"[SLACK] Mock digest: {len(digest.alerts)} {digest.severity} alerts for {digest.group}")
+            return True
+
+        try:
+            rows = "\n".join(digest.lines(limit=20))
+            payload = {
+                "attachments": [{
+                    "color": self.severity_colors.get(digest.severity, "#ff0000"),
+                    "title": f"🚨 TrustShield Fraud Digest - {len(digest.alerts)} {digest.severity} alerts",
+                    "fields": [
+                        {"title": "Entity", "value": digest.group, "short": True},
+                        {"title": "Transactions", "value": str(len(digest.alerts)), "short": True},
+                        {"title": "Total Amount", "value": f"${digest.total_amount:,.2f}", "short": True},
+                        {"title": "Max Risk Score", "value": f"{digest.max_risk:.3f}", "short": True},
+                    ],
+                    "text": f"```{rows}```",
+                    "footer": "Walmart TrustShield 360",
+                    "ts": int(digest.alerts[-1].timestamp.timestamp())
+                }]
+            }
+            status = await self._post(payload)
+            if status != 200:
+                self.counters["non_200"] += 1
+            return status == 200
+
+        except Exception as e:
+            print(f"Slack digest failed: {e}")
+            return False
+
+    async def check_health(self) -> bool:
+        # Incoming webhooks have no side-effect-free probe; report session state
+        if not self.webhook_url:
+            return True
+        return not (await self._get_session()).closed
+
+    def stats(self) -> Dict[str, Any]:
+        return {"max_connections": self.max_connections, **self.counters}
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
 
 class SMSAlerter(AlertChannel):
     """SMS alert channel (mock implementation)."""
+
+    name = "sms"
     
     def __init__(self):
         self.phone_numbers = os.getenv("ALERT_PHONE_NUMBERS", "+1234567890").split(",")
@@ -155,17 +537,262 @@ class SMSAlerter(AlertChannel):
         print(f"[SMS] Sending to {len(self.phone_numbers)} numbers: {sms_text}")
         return True
 
+    async def send_digest(self, digest: AlertDigest) -> bool:
+        sms_text = (
+            f"TrustShield Alert: {len(digest.alerts)} {digest.severity} transactions for {digest.group}. "
+            f"Max risk: {digest.max_risk:.2f}. Total: ${digest.total_amount:,.2f}"
+        )
+        print(f"[SMS] Sending to {len(self.phone_numbers)} numbers: {sms_text}")
+        return True
+
+
+SEVERITY_RANK = {"LOW": 0, "MEDIUM": 1, "HIGH": 2, "CRITICAL": 3}
+OVERFLOW_POLICIES = ("drop_lowest", "spill")
+
+
+def _parse_seconds(spec: str) -> Dict[str, float]:
+    """Parse "name=seconds,..." (channel timeouts, severity windows)."""
+    seconds: Dict[str, float] = {}
+    for item in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, value = item.partition("=")
+        seconds[name.strip()] = float(value)
+    return seconds
+
+
+DEFAULT_WINDOWS = {"CRITICAL": 0.0, "HIGH": 5.0, "MEDIUM": 30.0, "LOW": 120.0}
+
+
+class AlertCoalescer:
+    """Group alerts per (entity, severity) over a per-severity time window.
+
+    The first alert for a key opens a window; everything for that key until
+    it closes is emitted as one `AlertDigest` (a lone alert is emitted as
+    is). A window of 0 emits immediately. Repeats of the same transaction at
+    the same severity within `dedup_ttl_s` are suppressed.
+    """
+
+    def __init__(
+        self,
+        emit: Callable[[Delivery], None],
+        windows: Optional[Dict[str, float]] = None,
+        max_digest_size: int = 500,
+        dedup_ttl_s: float = 300.0,
+        max_tracked: int = 100_000,
+    ):
+        self.emit = emit
+        self.windows = dict(DEFAULT_WINDOWS)
+        self.windows.update(windows or {})
+        self.max_digest_size = max_digest_size
+        self.dedup_ttl_s = dedup_ttl_s
+        self.max_tracked = max_tracked
+        self._buckets: Dict[Tuple[str, str], AlertDigest] = {}
+        self._timers: Dict[Tuple[str, str], asyncio.TimerHandle] = {}
+        self._recent: "OrderedDict[tuple, float]" = OrderedDict()
+        self.counters = {"received": 0, "duplicates": 0, "immediate": 0, "digests": 0, "coalesced": 0}
+
+    @property
+    def pending(self) -> int:
+        return sum(len(d.alerts) for d in self._buckets.values())
+
+    def add(self, alert: FraudAlert, group: str) -> bool:
+        """Take *alert*; returns False when it was suppressed as a duplicate."""
+        self.counters["received"] += 1
+        now = time.monotonic()
+        while self._recent and (
+            len(self._recent) > self.max_tracked or next(iter(self._recent.values())) < now - self.dedup_ttl_s
+        ):
+            self._recent.popitem(last=False)
+        fingerprint = (alert.transaction_id, alert.source_id, alert.target_id, alert.amount, alert.severity)
+        if fingerprint in self._recent:
+            self.counters["duplicates"] += 1
+            return False
+        self._recent[fingerprint] = now
+
+        window = self.windows.get(alert.severity, 0.0)
+        if window <= 0:
+            self.counters["immediate"] += 1
+            self.emit(alert)
+            return True
+        key = (group, alert.severity)
+        digest = self._buckets.get(key)
+        if digest is None:
+            digest = self._buckets[key] = AlertDigest(group, alert.severity)
+            self._timers[key] = asyncio.get_running_loop().call_later(window, self._flush, key)
+        digest.alerts.append(alert)
+        if len(digest.alerts) >= self.max_digest_size:
+            self._flush(key)
+        return True
+
+    def _flush(self, key: Tuple[str, str]) -> None:
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        digest = self._buckets.pop(key, None)
+        if digest is None:
+            return
+        if len(digest.alerts) == 1:
+            self.emit(digest.alerts[0])
+            return
+        self.counters["digests"] += 1
+        self.counters["coalesced"] += len(digest.alerts)
+        self.emit(digest)
+
+    def flush_all(self) -> None:
+        for key in list(self._buckets):
+            self._flush(key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "windows_s": dict(self.windows),
+            "open_windows": len(self._buckets),
+            "pending_alerts": self.pending,
+            **self.counters,
+        }
+
+
+class AlertQueue:
+    """Bounded priority queue of alerts: most severe first, FIFO within a severity."""
+
+    def __init__(self, maxsize: int, overflow: str = "drop_lowest", spill_path: Optional[Path] = None):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy {overflow!r}; expected one of {OVERFLOW_POLICIES}")
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.spill_path = spill_path
+        self._heap: List[Tuple[int, int, Delivery]] = []
+        self._seq = itertools.count()
+        self._available: asyncio.Semaphore | None = None  # counts items in _heap
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    @property
+    def spilled_pending(self) -> bool:
+        return self.spill_path is not None and self.spill_path.exists() and self.spill_path.stat().st_size > 0
+
+    def put_nowait(self, alert: Delivery) -> Tuple[bool, str | None]:
+        """Queue *alert*; returns ``(accepted, overflow_action)``."""
+        if len(self._heap) < self.maxsize:
+            self._push(alert)
+            return True, None
+        if self.overflow == "spill":
+            self._spill(alert)
+            return False, "spilled"
+        # drop_lowest: the largest key is the least severe, most recent alert
+        worst = max(range(len(self._heap)), key=lambda i: self._heap[i][:2])
+        if SEVERITY_RANK.get(alert.severity, 0) <= -self._heap[worst][0]:
+            return False, "dropped"
+        self._heap[worst] = self._heap[-1]
+        self._heap.pop()
+        heapq.heapify(self._heap)
+        self._heap_push(alert)  # size unchanged, so the semaphore count still matches
+        return True, "dropped"
+
+    async def get(self) -> Delivery:
+        await self._semaphore().acquire()
+        return heapq.heappop(self._heap)[2]
+
+    def refill_from_spill(self) -> int:
+        """Move spilled alerts back into free queue slots; returns how many."""
+        if not self.spilled_pending:
+            return 0
+        assert self.spill_path is not None
+        lines = self.spill_path.read_text().splitlines()
+        room = self.maxsize - len(self._heap)
+        for line in lines[:room]:
+            record = json.loads(line)
+            self._push(AlertDigest.from_dict(record) if "alerts" in record else FraudAlert.from_dict(record))
+        rest = lines[room:]
+        tmp = self.spill_path.with_suffix(".tmp")
+        tmp.write_text("".join(f"{l}\n" for l in rest))
+        os.replace(tmp, self.spill_path)
+        return min(room, len(lines))
+
+    def _push(self, alert: Delivery) -> None:
+        self._heap_push(alert)
+        self._semaphore().release()
+
+    def _heap_push(self, alert: Delivery) -> None:
+        heapq.heappush(self._heap, (-SEVERITY_RANK.get(alert.severity, 0), next(self._seq), alert))
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        if self._available is None:
+            self._available = asyncio.Semaphore(len(self._heap))
+        return self._available
+
+    def _spill(self, alert: Delivery) -> None:
+        if self.spill_path is None:
+            raise RuntimeError("overflow='spill' needs a spill_path")
+        self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.spill_path, "a") as f:
+            f.write(json.dumps(alert.to_dict()) + "\n")
+
+
+@dataclass
+class AlertMetrics:
+    enqueued: int = 0
+    delivered: int = 0
+    dropped: int = 0
+    spilled: int = 0
+    refilled: int = 0  # spilled alerts moved back into the queue; delivered <= enqueued + refilled
+    max_queue_depth: int = 0
+    delivery_seconds_total: float = 0.0
+    delivery_seconds_max: float = 0.0
+    channel_sent: Dict[str, int] = field(default_factory=dict)
+    channel_failed: Dict[str, int] = field(default_factory=dict)
+    channel_retries: Dict[str, int] = field(default_factory=dict)
+    channel_timeouts: Dict[str, int] = field(default_factory=dict)
+
+    @staticmethod
+    def bump(counter: Dict[str, int], key: str) -> None:
+        counter[key] = counter.get(key, 0) + 1
+
 
 class FraudAlerter:
-    """Central alerting system that manages multiple channels."""
+    """Central alerting system that manages multiple channels.
+
+    `enqueue_fraud_alert` returns immediately; `send_fraud_alert` still
+    delivers inline (with the same timeouts/retries) for scripts and tests.
+    """
     
-    def __init__(self):
-        self.channels: List[AlertChannel] = [
+    def __init__(
+        self,
+        channels: Optional[List[AlertChannel]] = None,
+        queue_size: Optional[int] = None,
+        workers: Optional[int] = None,
+        timeouts: Optional[Dict[str, float]] = None,
+        max_retries: Optional[int] = None,
+        overflow: Optional[str] = None,
+        spill_path: Optional[str] = None,
+        windows: Optional[Dict[str, float]] = None,
+    ):
+        self.channels: List[AlertChannel] = channels if channels is not None else [
             EmailAlerter(),
             SlackAlerter(),
             SMSAlerter()
         ]
-        self.alert_history: List[FraudAlert] = []
+        self.workers = workers or int(os.getenv("TS360_ALERT_WORKERS", "4"))
+        self.timeouts = {"default": 5.0}
+        self.timeouts.update(_parse_seconds(os.getenv("TS360_ALERT_TIMEOUTS", "")))
+        self.timeouts.update(timeouts or {})
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("TS360_ALERT_RETRIES", "3"))
+        self.backoff_base_s = 0.2
+        self.queue = AlertQueue(
+            maxsize=queue_size or int(os.getenv("TS360_ALERT_QUEUE_SIZE", "1000")),
+            overflow=overflow or os.getenv("TS360_ALERT_OVERFLOW", "drop_lowest"),
+            spill_path=Path(spill_path or os.getenv("TS360_ALERT_SPILL_PATH", "alerts_spill.jsonl")),
+        )
+        self.metrics = AlertMetrics()
+        self.coalescer = AlertCoalescer(
+            self._enqueue,
+            windows=windows if windows is not None else _parse_seconds(os.getenv("TS360_ALERT_WINDOWS", "")),
+            dedup_ttl_s=float(os.getenv("TS360_ALERT_DEDUP_TTL", "300")),
+        )
+        self._workers: List[asyncio.Task] = []
+        self._inflight = 0
+        # Opened on first use, so importing this module creates no file or writer thread
+        self._store: Optional[AlertStore] = None
+        self._store_lock = threading.Lock()
         self.thresholds = {
             "CRITICAL": 0.9,
             "HIGH": 0.7,
@@ -173,6 +800,22 @@ class FraudAlerter:
             "LOW": 0.3
         }
     
+    @property
+    def store(self) -> AlertStore:
+        """Alert history; SQLite at TS360_ALERT_DB when set, else the in-memory ring only."""
+        with self._store_lock:
+            if self._store is None:
+                self._store = AlertStore(
+                    os.getenv("TS360_ALERT_DB") or None,
+                    ring_size=int(os.getenv("TS360_ALERT_RING_SIZE", "1000")),
+                )
+            return self._store
+
+    @property
+    def alert_history(self) -> List[FraudAlert]:
+        """Alerts still in this process's in-memory ring buffer, oldest first."""
+        return self.store.recent(self.store.ring_size)
+
     def _determine_severity(self, risk_score: float) -> str:
         """Determine alert severity based on risk score."""
         for severity, threshold in self.thresholds.items():
@@ -180,42 +823,169 @@ class FraudAlerter:
                 return severity
         return "LOW"
     
+    def _build_alert(self, transaction_data: Dict[str, Any], risk_score: float, model_used: str) -> FraudAlert:
+        alert = FraudAlert(
+            # Keys are often present with a None value (e.g. /predict without a transaction_id)
+            transaction_id=transaction_data.get("transaction_id") or "UNKNOWN",
+            source_id=transaction_data.get("source_id") or "UNKNOWN",
+            target_id=transaction_data.get("target_id") or "UNKNOWN",
+            amount=float(transaction_data.get("amount") or 0),
+            risk_score=risk_score,
+            model_used=model_used,
+            severity=self._determine_severity(risk_score)
+        )
+        
+        # Store in history
+        self.store.append(alert)
+        return alert
+
+    def enqueue_fraud_alert(self, transaction_data: Dict[str, Any], risk_score: float, model_used: str) -> bool:
+        """Queue an alert for background delivery; never waits on a channel.
+
+        Must be called from a running event loop. The alert passes through
+        the coalescer first; returns False when it was suppressed as a
+        duplicate. Overflow drops/spills are counted in `stats()`.
+        """
+        alert = self._build_alert(transaction_data, risk_score, model_used)
+        self._ensure_workers()
+        group = str(transaction_data.get("ring_id") or alert.source_id)
+        return self.coalescer.add(alert, group)
+
+    def _enqueue(self, item: Delivery) -> None:
+        accepted, action = self.queue.put_nowait(item)
+        if accepted:
+            self.metrics.enqueued += 1
+        if action == "dropped":
+            self.metrics.dropped += 1
+        elif action == "spilled":
+            self.metrics.spilled += 1
+        self.metrics.max_queue_depth = max(self.metrics.max_queue_depth, len(self.queue))
+
     async def send_fraud_alert(
         self, 
         transaction_data: Dict[str, Any], 
         risk_score: float, 
         model_used: str
     ) -> List[bool]:
-        """Send fraud alert across all configured channels."""
-        
-        severity = self._determine_severity(risk_score)
-        
-        alert = FraudAlert(
-            transaction_id=transaction_data.get("transaction_id", "UNKNOWN"),
-            source_id=transaction_data.get("source_id", "UNKNOWN"),
-            target_id=transaction_data.get("target_id", "UNKNOWN"),
-            amount=float(transaction_data.get("amount", 0)),
-            risk_score=risk_score,
-            model_used=model_used,
-            severity=severity
-        )
-        
+        """Send fraud alert across all configured channels (inline)."""
+        alert = self._build_alert(transaction_data, risk_score, model_used)
+        return await self._deliver(alert)
+
+    # ------------------------------------------------------------------
+    # Delivery
+    # ------------------------------------------------------------------
+    async def _deliver(self, alert: Delivery) -> List[bool]:
         # Send alerts in parallel
-        tasks = [channel.send_alert(alert) for channel in self.channels]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Store in history
-        self.alert_history.append(alert)
-        
-        # Keep only last 1000 alerts
-        if len(self.alert_history) > 1000:
-            self.alert_history = self.alert_history[-1000:]
-        
-        return [r for r in results if isinstance(r, bool)]
+        started = time.perf_counter()
+        results = await asyncio.gather(*(self._send_with_retry(c, alert) for c in self.channels))
+        elapsed = time.perf_counter() - started
+        self.metrics.delivered += 1
+        self.metrics.delivery_seconds_total += elapsed
+        self.metrics.delivery_seconds_max = max(self.metrics.delivery_seconds_max, elapsed)
+        return list(results)
+
+    async def _send_with_retry(self, channel: AlertChannel, alert: Delivery) -> bool:
+        timeout = self.timeouts.get(channel.name, self.timeouts["default"])
+        send = channel.send_digest if isinstance(alert, AlertDigest) else channel.send_alert
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.metrics.bump(self.metrics.channel_retries, channel.name)
+                # Full jitter keeps retries from many workers from synchronising
+                await asyncio.sleep(random.uniform(0, self.backoff_base_s * 2 ** attempt))
+            try:
+                if await asyncio.wait_for(send(alert), timeout):
+                    self.metrics.bump(self.metrics.channel_sent, channel.name)
+                    return True
+            except asyncio.TimeoutError:
+                self.metrics.bump(self.metrics.channel_timeouts, channel.name)
+            except Exception as e:  # noqa
+                print(f"{channel.name} alert failed: {e}")
+        self.metrics.bump(self.metrics.channel_failed, channel.name)
+        return False
+
+    def _ensure_workers(self) -> None:
+        # Started lazily so they bind to the loop that serves requests
+        self._workers = [w for w in self._workers if not w.done()]
+        loop = asyncio.get_running_loop()
+        while len(self._workers) < self.workers:
+            self._workers.append(loop.create_task(self._worker()))
+
+    async def _worker(self) -> None:
+        while True:
+            if not len(self.queue):
+                self.metrics.refilled += self.queue.refill_from_spill()
+            alert = await self.queue.get()
+            self._inflight += 1
+            try:
+                await self._deliver(alert)
+            except Exception as e:  # noqa - a worker must never die
+                print(f"Alert delivery failed: {e}")
+            finally:
+                self._inflight -= 1
+
+    async def close(self, drain_timeout: float = 5.0) -> None:
+        """Give queued and in-flight alerts `drain_timeout` seconds, then stop the workers."""
+        self.coalescer.flush_all()  # don't sit on open digest windows
+        deadline = time.perf_counter() + drain_timeout
+        while (len(self.queue) or self._inflight) and time.perf_counter() < deadline:
+            await asyncio.sleep(0.05)
+        for w in self._workers:
+            w.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        await asyncio.gather(*(c.close() for c in self.channels), return_exceptions=True)
+        if self._store is not None:
+            self._store.flush()
+
+    async def check_health(self) -> Dict[str, bool]:
+        """Probe every channel (SMTP NOOP, HTTP session state)."""
+        results = await asyncio.gather(
+            *(asyncio.wait_for(c.check_health(), self.timeouts.get(c.name, self.timeouts["default"])) for c in self.channels),
+            return_exceptions=True,
+        )
+        return {c.name: r is True for c, r in zip(self.channels, results)}
+
+    def stats(self) -> Dict[str, Any]:
+        m = self.metrics
+        return {
+            "queue_depth": len(self.queue),
+            "queue_capacity": self.queue.maxsize,
+            "max_queue_depth": m.max_queue_depth,
+            "overflow_policy": self.queue.overflow,
+            "spill_pending": self.queue.spilled_pending,
+            "workers": len([w for w in self._workers if not w.done()]),
+            "in_flight": self._inflight,
+            "enqueued": m.enqueued,
+            "delivered": m.delivered,
+            "dropped": m.dropped,
+            "spilled": m.spilled,
+            "refilled": m.refilled,
+            "store_rejected": self._store.rejected if self._store is not None else 0,
+            "delivery_seconds_mean": m.delivery_seconds_total / m.delivered if m.delivered else 0.0,
+            "delivery_seconds_max": m.delivery_seconds_max,
+            "coalescing": self.coalescer.stats(),
+            "channels": {
+                c.name: {
+                    "timeout_s": self.timeouts.get(c.name, self.timeouts["default"]),
+                    "sent": m.channel_sent.get(c.name, 0),
+                    "failed": m.channel_failed.get(c.name, 0),
+                    "retries": m.channel_retries.get(c.name, 0),
+                    "timeouts": m.channel_timeouts.get(c.name, 0),
+                    "connections": c.stats(),
+                }
+                for c in self.channels
+            },
+        }
     
     def get_recent_alerts(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get recent fraud alerts for dashboard display."""
-        return [alert.to_dict() for alert in self.alert_history[-limit:]]
+        return [alert.to_dict() for alert in self.store.recent(limit)]
+
+    def query_alerts(
+        self, filters: Optional[AlertQuery] = None, limit: int = 20, cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Filtered, newest-first page of stored alerts plus the next-page cursor."""
+        return self.store.query(filters, limit, cursor)
 
 
 # Global alerter instance
@@ -227,6 +997,32 @@ async def send_fraud_alert(transaction_data: Dict[str, Any], risk_score: float,
     return await _alerter.send_fraud_alert(transaction_data, risk_score, model_used)
 
 
+def enqueue_fraud_alert(transaction_data: Dict[str, Any], risk_score: float, model_used: str) -> bool:
+    """Queue a fraud alert for background delivery (non-blocking)."""
+    return _alerter.enqueue_fraud_alert(transaction_data, risk_score, model_used)
+
+
+def get_alert_stats() -> Dict[str, Any]:
+    """Queue depth and per-channel delivery metrics."""
+    return _alerter.stats()
+
+
+async def check_alert_channels() -> Dict[str, bool]:
+    """Health of each alert channel's backend connection."""
+    return await _alerter.check_health()
+
+
+async def close_alerter(drain_timeout: float = 5.0) -> None:
+    await _alerter.close(drain_timeout)
+
+
 def get_recent_alerts(limit: int = 10) -> List[Dict[str, Any]]:
     """Get recent alerts for API/dashboard."""
-    return _alerter.get_recent_alerts(limit) 
\ No newline at end of file
+    return _alerter.get_recent_alerts(limit) 
+
+
+def query_alerts(
+    filters: Optional[AlertQuery] = None, limit: int = 20, cursor: Optional[str] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Filtered, paginated alert history (see `AlertStore.query`)."""
+    return _alerter.query_alerts(filters, limit, cursor)
\ No newline at end of file
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
-"""Advanced fraud analytics including trend prediction, customer clustering, and geographic hotspot mapping."""
+"""Advanced fraud analytics including trend prediction, customer clustering, and geographic hotspot mapping.
+
+Every analysis takes one columnar frame (a pandas DataFrame, or anything
+with ``to_pandas()`` such as a pyarrow Table) and works on it with masks and
+group-bys; a list of transaction dicts is still accepted and converted once.
+"""
 
 import json
 import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Tuple, Union
 
 import numpy as np
 import pandas as pd
@@ -14,6 +19,28 @@ from sklearn.preprocessing import StandardScaler  # type: ignore
 from sklearn.linear_model import LinearRegression  # type: ignore
 from scipy import stats  # type: ignore
 
+# DataFrame, Arrow table or list of transaction dicts
+TransactionData = Union[pd.DataFrame, List[Dict[str, Any]], Any]
+
+
+def as_frame(data: TransactionData) -> pd.DataFrame:
+    """View *data* as a DataFrame (no copy when it already is one)."""
+    if isinstance(data, pd.DataFrame):
+        return data
+    if hasattr(data, "to_pandas"):  # pyarrow Table / RecordBatch
+        return data.to_pandas()
+    return pd.DataFrame(list(data))
+
+
+def fraud_mask(df: pd.DataFrame, threshold: float = 0.7) -> pd.Series:
+    """Rows flagged `is_fraud` or scored above *threshold*; missing values count as legitimate."""
+    mask = pd.Series(False, index=df.index)
+    if 'is_fraud' in df.columns:
+        mask |= df['is_fraud'].astype('boolean').fillna(False).astype(bool)
+    if 'fraud_score' in df.columns:
+        mask |= df['fraud_score'].gt(threshold)
+    return mask
+
 
 class FraudTrendPredictor:
     """Predicts fraud trends using time series analysis."""
@@ -23,23 +50,16 @@ class FraudTrendPredictor:
         self.seasonality_model = LinearRegression()
         self.is_fitted = False
         
-    def fit(self, fraud_data: List[Dict[str, Any]]) -> None:
+    def fit(self, fraud_data: TransactionData) -> None:
         """Fit trend prediction models on historical fraud data."""
-        if not fraud_data:
-            return
-            
-        df = pd.DataFrame(fraud_data)
-        if 'timestamp' not in df.columns:
+        df = as_frame(fraud_data)
+        if df.empty or 'timestamp' not in df.columns:
             return
             
-        # Convert timestamps and create time features
-        df['datetime'] = pd.to_datetime(df['timestamp'], unit='s')
-        df['hour'] = df['datetime'].dt.hour
-        df['day_of_week'] = df['datetime'].dt.dayofweek
-        df['day_of_month'] = df['datetime'].dt.day
-        
-        # Aggregate fraud counts by hour
-        hourly_fraud = df.groupby(df['datetime'].dt.floor('H')).size().reset_index()
+        # Hourly fraud counts (the caller's frame is left untouched)
+        ts = df['timestamp']
+        ts = ts if pd.api.types.is_datetime64_any_dtype(ts) else pd.to_datetime(ts, unit='s')
+        hourly_fraud = ts.dt.floor('H').value_counts().sort_index().reset_index()
         hourly_fraud.columns = ['datetime', 'fraud_count']
         
         if len(hourly_fraud) < 24:  # Need at least 24 hours of data
@@ -125,46 +145,40 @@ class CustomerClusterAnalyzer:
         self.scaler = StandardScaler()
         self.is_fitted = False
         
-    def analyze_customer_segments(self, transaction_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def analyze_customer_segments(self, transaction_data: TransactionData) -> Dict[str, Any]:
         """Analyze customer segments based on transaction patterns."""
-        if not transaction_data:
+        df = as_frame(transaction_data)
+        if df.empty:
             return self._mock_customer_analysis()
-            
-        df = pd.DataFrame(transaction_data)
         
         # Create customer features
-        customer_features = df.groupby('source_id').agg({
-            'amount': ['mean', 'std', 'sum', 'count'],
-            'timestamp': ['min', 'max']
-        }).fillna(0)
-        
-        # Flatten column names
-        customer_features.columns = ['_'.join(col).strip() for col in customer_features.columns]
+        customer_features = df.groupby('source_id', observed=True)['amount'].agg(
+            amount_mean='mean', amount_std='std', amount_sum='sum', amount_count='count'
+        ).fillna(0)
         
         if len(customer_features) < 5:
             return self._mock_customer_analysis()
         
-        # Select only numeric columns for scaling (exclude timestamp columns)
-        numeric_columns = [col for col in customer_features.columns if not col.startswith('timestamp_')]
-        numeric_features = customer_features[numeric_columns]
-        
-        # Scale only numeric features
-        features_scaled = self.scaler.fit_transform(numeric_features)
+        features_scaled = self.scaler.fit_transform(customer_features)
         
         # K-means clustering
         clusters = self.kmeans_model.fit_predict(features_scaled)
         
-        # Analyze clusters
-        cluster_analysis = {}
-        for cluster_id in range(self.kmeans_model.n_clusters):
-            cluster_mask = clusters == cluster_id
-            cluster_customers = customer_features[cluster_mask]
-            cluster_analysis[f"cluster_{cluster_id}"] = {
-                "size": len(cluster_customers),
-                "avg_transaction_amount": float(cluster_customers['amount_mean'].mean()),
-                "avg_transaction_count": float(cluster_customers['amount_count'].mean()),
-                "risk_profile": self._determine_risk_profile(cluster_customers)
+        # Per-cluster statistics in one group-by
+        per_cluster = customer_features.groupby(clusters).agg(
+            size=('amount_mean', 'size'),
+            avg_amount=('amount_mean', 'mean'),
+            avg_count=('amount_count', 'mean'),
+        ).reindex(range(self.kmeans_model.n_clusters)).fillna({'size': 0})
+        cluster_analysis = {
+            f"cluster_{cluster_id}": {
+                "size": int(row.size),
+                "avg_transaction_amount": float(row.avg_amount),
+                "avg_transaction_count": float(row.avg_count),
+                "risk_profile": self._determine_risk_profile(row.avg_amount, row.avg_count)
             }
+            for cluster_id, row in zip(per_cluster.index, per_cluster.itertuples(index=False))
+        }
         
         return {
             "total_customers": len(customer_features),
@@ -173,11 +187,8 @@ class CustomerClusterAnalyzer:
             "suspicious_patterns": self._detect_suspicious_patterns(customer_features, clusters)
         }
     
-    def _determine_risk_profile(self, cluster_data: pd.DataFrame) -> str:
+    def _determine_risk_profile(self, avg_amount: float, avg_frequency: float) -> str:
         """Determine risk profile for a customer cluster."""
-        avg_amount = cluster_data['amount_mean'].mean()
-        avg_frequency = cluster_data['amount_count'].mean()
-        
         if avg_amount > 1000 and avg_frequency > 10:
             return "HIGH_VALUE"
         elif avg_amount > 500:
@@ -242,46 +253,37 @@ class GeographicHotspotMapper:
             "Denver_CO": (39.7392, -104.9903)
         }
     
-    def analyze_geographic_patterns(self, transaction_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def analyze_geographic_patterns(self, transaction_data: TransactionData) -> Dict[str, Any]:
         """Analyze geographic fraud patterns and hotspots."""
-        if not transaction_data:
-            return self._mock_geographic_analysis()
-        
-        df = pd.DataFrame(transaction_data)
-        if 'location' not in df.columns:
+        df = as_frame(transaction_data)
+        if df.empty or 'location' not in df.columns:
             return self._mock_geographic_analysis()
         
         # Analyze fraud by location
-        location_stats = df.groupby('location').agg({
-            'amount': ['sum', 'mean', 'count'],
-            'timestamp': ['min', 'max']
-        })
-        
-        # Flatten columns
-        location_stats.columns = ['_'.join(col).strip() for col in location_stats.columns]
+        location_stats = df.groupby('location', observed=True)['amount'].agg(
+            amount_sum='sum', amount_count='count'
+        )
         
         # Calculate fraud rates (simplified)
         location_stats['fraud_rate'] = location_stats['amount_count'] / location_stats['amount_count'].sum()
         
-        # Identify hotspots
+        # Hotspots: known cities, highest fraud rate first
+        location_stats = location_stats[location_stats.index.isin(list(self.city_coordinates))]
+        location_stats = location_stats.sort_values('fraud_rate', ascending=False, kind='stable')
         hotspots = []
-        for location in location_stats.index:
-            if location in self.city_coordinates:
-                lat, lon = self.city_coordinates[location]
-                fraud_rate = location_stats.loc[location, 'fraud_rate']
-                
-                hotspots.append({
-                    "location": location,
-                    "latitude": lat,
-                    "longitude": lon,
-                    "fraud_count": int(location_stats.loc[location, 'amount_count']),
-                    "total_amount": float(location_stats.loc[location, 'amount_sum']),
-                    "fraud_rate": float(fraud_rate),
-                    "risk_level": self._calculate_risk_level(fraud_rate)
-                })
-        
-        # Sort by fraud rate
-        hotspots.sort(key=lambda x: x['fraud_rate'], reverse=True)
+        for location, fraud_count, total_amount, fraud_rate in zip(
+            location_stats.index, location_stats['amount_count'], location_stats['amount_sum'], location_stats['fraud_rate']
+        ):
+            lat, lon = self.city_coordinates[location]
+            hotspots.append({
+                "location": location,
+                "latitude": lat,
+                "longitude": lon,
+                "fraud_count": int(fraud_count),
+                "total_amount": float(total_amount),
+                "fraud_rate": float(fraud_rate),
+                "risk_level": self._calculate_risk_level(fraud_rate)
+            })
         
         return {
             "total_locations": len(hotspots),
@@ -370,20 +372,22 @@ class AdvancedFraudAnalytics:
         self.customer_analyzer = CustomerClusterAnalyzer()
         self.geo_mapper = GeographicHotspotMapper()
         
-    def generate_comprehensive_report(self, transaction_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def generate_comprehensive_report(self, transaction_data: TransactionData) -> Dict[str, Any]:
         """Generate comprehensive fraud analytics report."""
+        df = as_frame(transaction_data)
         
-        # Separate fraud and legitimate transactions
-        fraud_data = [t for t in transaction_data if t.get('is_fraud', False) or t.get('fraud_score', 0) > 0.7]
+        # Fraud subset by boolean mask (no per-row Python)
+        is_fraud = fraud_mask(df)
+        fraud_data = df[is_fraud]
         
         # Run all analyses
         trend_analysis = self.trend_predictor.predict_next_hours(24)
-        customer_analysis = self.customer_analyzer.analyze_customer_segments(transaction_data)
+        customer_analysis = self.customer_analyzer.analyze_customer_segments(df)
         geographic_analysis = self.geo_mapper.analyze_geographic_patterns(fraud_data)
         
         # Calculate summary statistics
-        total_transactions = len(transaction_data)
-        total_fraud = len(fraud_data)
+        total_transactions = len(df)
+        total_fraud = int(is_fraud.sum())
         fraud_rate = total_fraud / total_transactions if total_transactions > 0 else 0
         
         return {
@@ -440,6 +444,6 @@ class AdvancedFraudAnalytics:
 _analytics_engine = AdvancedFraudAnalytics()
 
 
-def generate_fraud_analytics_report(transaction_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+def generate_fraud_analytics_report(transaction_data: TransactionData) -> Dict[str, Any]:
     """Convenience function to generate analytics report."""
     return _analytics_engine.generate_comprehensive_report(transaction_data) 
\ No newline at end of file
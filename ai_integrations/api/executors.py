@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+"""Execution layer that keeps CPU-bound work off the FastAPI event loop.
+
+Routes hand their synchronous work to `ExecutionLayer.run(route, fn, ...)`;
+each route name maps to a pool:
+
+    thread   numpy / sklearn / torch work that releases the GIL, blocking I/O (SQLite)
+    process  pure-Python work (networkx cycle search, pandas-heavy analytics)
+    inline   cheap calls that are not worth a hop
+
+Process-pool callables and their arguments must be picklable, so pass
+snapshots (e.g. `TransactionGraph.snapshot()`) rather than live objects.
+The mapping can be overridden with TS360_EXEC_ROUTES="route=pool,...".
+"""
+
+import asyncio
+import functools
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict
+
+from api.micro_batcher import Histogram, LATENCY_BUCKETS_MS
+from cortex.thread_budget import get_budget
+
+__all__ = ["ExecutionLayer", "DEFAULT_ROUTES"]
+
+POOLS = ("thread", "process", "inline")
+
+DEFAULT_ROUTES: Dict[str, str] = {
+    "predict": "thread",
+    "batch_predict": "thread",
+    "benchmark": "thread",
+    "ring_risk": "thread",
+    "graph_scan": "process",
+    "analytics_report": "process",
+    "alerts_query": "thread",
+    "blockchain_track": "thread",
+    "blockchain_read": "thread",
+}
+
+
+def _parse_routes(spec: str) -> Dict[str, str]:
+    routes: Dict[str, str] = {}
+    for item in filter(None, (p.strip() for p in spec.split(","))):
+        route, _, pool = item.partition("=")
+        if pool not in POOLS:
+            raise ValueError(f"Unknown pool {pool!r} for route {route!r}; expected one of {POOLS}")
+        routes[route.strip()] = pool
+    return routes
+
+
+@dataclass
+class PoolStats:
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    max_depth: int = 0
+    latency_ms: Histogram = field(default_factory=lambda: Histogram(LATENCY_BUCKETS_MS))
+
+    @property
+    def depth(self) -> int:
+        """Tasks queued or running in the pool."""
+        return self.submitted - self.completed - self.failed
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self.depth,
+            "max_queue_depth": self.max_depth,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "latency_ms": self.latency_ms.snapshot(),
+        }
+
+
+class ExecutionLayer:
+    """Thread pool + process pool with per-route routing and depth metrics."""
+
+    def __init__(
+        self,
+        thread_workers: int | None = None,
+        process_workers: int | None = None,
+        routes: Dict[str, str] | None = None,
+    ):
+        budget = get_budget().threads
+        self.thread_workers = thread_workers or min(4, budget)
+        self.process_workers = process_workers or max(1, min(2, budget))
+        self.routes = dict(DEFAULT_ROUTES)
+        self.routes.update(routes or {})
+        self._threads: ThreadPoolExecutor | None = None
+        self._processes: ProcessPoolExecutor | None = None
+        self._stats: Dict[str, PoolStats] = {p: PoolStats() for p in POOLS}
+
+    @classmethod
+    def from_env(cls) -> "ExecutionLayer":
+        return cls(
+            thread_workers=int(os.environ.get("TS360_THREAD_WORKERS", "0")) or None,
+            process_workers=int(os.environ.get("TS360_PROCESS_WORKERS", "0")) or None,
+            routes=_parse_routes(os.environ.get("TS360_EXEC_ROUTES", "")),
+        )
+
+    # ------------------------------------------------------------------
+    # Pools (created on first use so importing the app stays cheap)
+    # ------------------------------------------------------------------
+    @property
+    def thread_pool(self) -> ThreadPoolExecutor:
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(self.thread_workers, thread_name_prefix="ts360-cpu")
+        return self._threads
+
+    @property
+    def process_pool(self) -> ProcessPoolExecutor:
+        if self._processes is None:
+            # spawn: forking a process that already runs torch/OpenMP threads can deadlock
+            self._processes = ProcessPoolExecutor(
+                self.process_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._processes
+
+    def executor_for(self, route: str) -> Executor | None:
+        pool = self.routes.get(route, "thread")
+        if pool == "process":
+            return self.process_pool
+        if pool == "thread":
+            return self.thread_pool
+        return None
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    async def run(self, route: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run ``fn(*args, **kwargs)`` on the pool configured for *route*."""
+        pool = self.routes.get(route, "thread")
+        stats = self._stats[pool]
+        stats.submitted += 1
+        stats.max_depth = max(stats.max_depth, stats.depth)
+        start = time.perf_counter()
+        try:
+            executor = self.executor_for(route)
+            if executor is None:
+                result = fn(*args, **kwargs)
+            else:
+                result = await asyncio.get_running_loop().run_in_executor(
+                    executor, functools.partial(fn, *args, **kwargs)
+                )
+        except BaseException:
+            stats.failed += 1
+            raise
+        stats.completed += 1
+        stats.latency_ms.observe((time.perf_counter() - start) * 1000.0)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "routes": dict(self.routes),
+            "thread_budget": get_budget().threads,
+            "thread_workers": self.thread_workers,
+            "process_workers": self.process_workers,
+            "pools": {p: s.snapshot() for p, s in self._stats.items()},
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._threads is not None:
+            self._threads.shutdown(wait=wait)
+            self._threads = None
+        if self._processes is not None:
+            self._processes.shutdown(wait=wait)
+            self._processes = None
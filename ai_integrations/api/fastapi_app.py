@@ -5,43 +5,76 @@ Run:
     uvicorn api.fastapi_app:app --reload --port 8000
 """
 
+import json
 import os
 from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List
 
+import numpy as np
 import pandas as pd
-from fastapi import FastAPI, File, HTTPException, UploadFile, WebSocket  # type: ignore
+from fastapi import FastAPI, File, HTTPException, Query, Response, UploadFile, WebSocket  # type: ignore
 from fastapi.middleware.cors import CORSMiddleware  # type: ignore
+from fastapi.responses import StreamingResponse  # type: ignore
 from pydantic import BaseModel  # type: ignore
-import json
-import io
 import time
+import io
 from datetime import datetime, timedelta
 
-from cortex.fraud_detection import FraudDetector
+try:  # optional: Parquet / Arrow IPC uploads and Arrow output
+    import pyarrow as _pa  # type: ignore
+except ImportError:
+    _pa = None
+
+from cortex.fraud_detection import FraudDetector, TRANSACTION_SCHEMA, scored_table
 from cortex.tab_transformer_detector import TabTransformerDetector
-from cortex.graph_analytics import build_transaction_graph, detect_fraud_rings, ring_stats
+from cortex.graph_analytics import TransactionGraph, find_rings, ring_stats
 from cortex.gnn_ring_risk import score_rings, RingRiskGNN
-from alerts.fraud_alerter import send_fraud_alert, get_recent_alerts
+from cortex.model_registry import ModelRegistry, schema_hash
+from cortex.thread_budget import configure_threads
+from alerts.alert_store import AlertQuery
+from alerts.fraud_alerter import check_alert_channels, close_alerter, enqueue_fraud_alert, get_alert_stats, query_alerts
 from crypto.quantum_simulator import QuantumResistantSession
 from blockchain.fraud_logger import log_fraud_to_blockchain, get_wallet_reputation, _blockchain_logger
 from analytics.fraud_analytics import generate_fraud_analytics_report
+from api.micro_batcher import MicroBatcher
+from api.executors import ExecutionLayer
 
 # -----------------------------------------------------
 # Model loading at startup
 # -----------------------------------------------------
+# Share the host's cores with sibling workers (TS360_WORKERS / TS360_THREAD_BUDGET)
+configure_threads()
+
 DATA_PATH = Path(os.environ.get("TS360_DATA", "data/sample_transactions.jsonl"))
 if DATA_PATH.exists():
-    _hist_df = FraudDetector.load_jsonl(DATA_PATH)
+    _hist_df = FraudDetector.load_jsonl(DATA_PATH, schema=TRANSACTION_SCHEMA)
 else:
     from main import _generate_synthetic_transactions  # type: ignore
 
     _hist_df = _generate_synthetic_transactions(500)
 
-# Train both models
-_iso_detector = FraudDetector().fit(_hist_df)
-_tab_detector = TabTransformerDetector(epochs=3).fit(_hist_df)  # shorter train for demo
+# Warm start from the model registry (TS360_MODEL_DIR) when a version has been
+# published with `python -m cortex.model_registry publish`; otherwise train here.
+_bundle = ModelRegistry().load_latest_or_none()
+if _bundle is not None:
+    _iso_detector = _bundle.fraud_detector
+    _tab_detector = _bundle.tab_detector
+    _ring_model = _bundle.ring_model
+    if _bundle.schema_hash != schema_hash(_hist_df):
+        print(f"[WARN] model version {_bundle.version} was trained on a different schema than {DATA_PATH}")
+else:
+    _iso_detector = FraudDetector().fit(_hist_df)
+    _tab_detector = TabTransformerDetector(epochs=3).fit(_hist_df)  # shorter train for demo
+    _ring_model = RingRiskGNN()
+
+# Live account graph: seeded from history, then fed every scored transaction
+_window = os.environ.get("TS360_GRAPH_WINDOW_S")
+_live_graph = TransactionGraph(
+    window_seconds=float(_window) if _window else None,
+    track_rings=True,
+    max_cycle_len=int(os.environ.get("TS360_RING_MAX_LEN", "8")),
+).ingest(_hist_df)
 
 
 class ModelChoice(str, Enum):
@@ -49,6 +82,25 @@ class ModelChoice(str, Enum):
     tab_transformer = "tab_transformer"
 
 
+class StreamFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+    arrow = "arrow"  # Arrow IPC stream
+
+
+ARROW_STREAM_TYPE = "application/vnd.apache.arrow.stream"
+ARROW_TYPES = (ARROW_STREAM_TYPE, "application/vnd.apache.arrow.file")
+PARQUET_TYPE = "application/vnd.apache.parquet"
+UPLOAD_TYPES = {
+    "text/csv",
+    "application/json",
+    "application/jsonl",
+    "application/octet-stream",
+    *ARROW_TYPES,
+    PARQUET_TYPE,
+}
+
+
 class Transaction(BaseModel):
     timestamp: str
     transaction_id: str | None = None
@@ -73,21 +125,52 @@ app.add_middleware(
 # Helpers
 # -----------------------------------------------------
 
-def _predict_one(txn_dict: Dict[str, Any], model: ModelChoice):
-    df = pd.DataFrame([txn_dict])
+def _score_frame(df: pd.DataFrame, model: ModelChoice):
+    """Score every row of *df* with one model call; returns (preds, scores)."""
     if model == ModelChoice.tab_transformer:
-        score = float(_tab_detector.predict_score(df)[0])
-        pred = -1 if score > 0.5 else 1  # simple threshold
+        scores = _tab_detector.predict_score(df)
+        preds = (-1 * (scores > 0.5).astype(int)) + (scores <= 0.5).astype(int)  # map True->-1, False->1
     else:
-        pred = int(_iso_detector.predict(df)[0])
-        score = float(_iso_detector.score_samples(df)[0])
-    return {"prediction": pred, "score": score}
+        preds, scores = _iso_detector.predict_with_scores(df)
+    return preds, scores
 
 
-def _detect_rings():
-    g = build_transaction_graph(_hist_df)
-    cycles = detect_fraud_rings(g)
-    return ring_stats(cycles)
+def _predict_many(txns: List[Dict[str, Any]], model: ModelChoice) -> List[Dict[str, Any]]:
+    df = pd.DataFrame(txns)
+    preds, scores = _score_frame(df, model)
+    _live_graph.ingest(df)
+    return [{"prediction": int(p), "score": float(s)} for p, s in zip(preds, scores)]
+
+
+# CPU-bound work runs on thread/process pools; the event loop only does I/O
+_exec = ExecutionLayer.from_env()
+
+# One micro-batcher per model so pooled rows always share a scoring call
+BATCH_MAX_SIZE = int(os.environ.get("TS360_BATCH_MAX_SIZE", "64"))
+BATCH_MAX_WAIT_MS = float(os.environ.get("TS360_BATCH_MAX_WAIT_MS", "2"))
+_batchers: Dict[ModelChoice, MicroBatcher] = {
+    m: MicroBatcher(
+        lambda txns, m=m: _predict_many(txns, m),
+        BATCH_MAX_SIZE,
+        BATCH_MAX_WAIT_MS,
+        runner=lambda fn, items: _exec.run("predict", fn, items),
+    )
+    for m in ModelChoice
+}
+
+
+async def _predict_one(txn_dict: Dict[str, Any], model: ModelChoice) -> Dict[str, Any]:
+    return await _batchers[model].submit(txn_dict)
+
+
+async def _detect_rings(max_cycle_len: int | None = None):
+    if max_cycle_len is None:
+        return _live_graph.ring_stats()  # rings tracked as edges arrive
+    # Full scan is pure-Python networkx work: run it on a snapshot in the process pool
+    cycles, truncated = await _exec.run(
+        "graph_scan", find_rings, _live_graph.snapshot(), max_cycle_len=max_cycle_len
+    )
+    return ring_stats(cycles, truncated)
 
 
 # -----------------------------------------------------
@@ -100,57 +183,169 @@ async def health():
 
 @app.post("/predict")
 async def predict(txn: Transaction, model: ModelChoice = ModelChoice.isolation_forest):
-    result = _predict_one(txn.dict(), model)
+    result = await _predict_one(txn.dict(), model)
     
-    # Send alert if high risk
+    # Queue an alert if high risk (delivered in the background)
     if result["prediction"] == -1 or abs(result["score"]) > 0.7:
-        await send_fraud_alert(txn.dict(), abs(result["score"]), model.value)
+        enqueue_fraud_alert(txn.dict(), abs(result["score"]), model.value)
     
     return result
 
 
+# Rows parsed and scored per step when streaming /batch_predict
+STREAM_CHUNK_ROWS = int(os.environ.get("TS360_STREAM_CHUNK_ROWS", "5000"))
+
+
+def _upload_chunks(file: UploadFile, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Parse an uploaded CSV, JSONL, Parquet or Arrow IPC file incrementally.
+
+    The format is sniffed from the content type and leading bytes instead of
+    trying CSV first: a JSONL file parses "successfully" as a garbage CSV.
+    """
+    raw = file.file.read(4096)
+    file.file.seek(0)
+    name = (file.filename or "").lower()
+    parquet = raw.startswith(b"PAR1") or name.endswith((".parquet", ".pq")) or file.content_type == PARQUET_TYPE
+    arrow = file.content_type in ARROW_TYPES or raw.startswith((b"ARROW1", b"\xff\xff\xff\xff"))
+    if (parquet or arrow) and _pa is None:
+        raise HTTPException(status_code=415, detail="Parquet/Arrow uploads require pyarrow on the server")
+    if parquet:
+        return FraudDetector.iter_parquet_chunks(file.file, chunk_size, schema=None)
+    if arrow:
+        return FraudDetector.iter_arrow_chunks(file.file, chunk_size, schema=None)
+    if raw.lstrip().startswith(b"{") or name.endswith((".jsonl", ".ndjson")):
+        return FraudDetector.iter_jsonl_chunks(file.file, chunk_size, schema=None)
+    return FraudDetector.iter_csv_chunks(file.file, chunk_size, schema=None)
+
+
+def _score_chunk(df: pd.DataFrame, model: ModelChoice) -> pd.DataFrame:
+    df["prediction"], df["score"] = _score_frame(df, model)
+    return df
+
+
+class _ChunkEncoder:
+    """Score chunks and serialise them as one continuous NDJSON/CSV/Arrow stream."""
+
+    def __init__(self, fmt: StreamFormat):
+        self.fmt = fmt
+        self._first = True
+        self._buf = io.BytesIO()
+        self._arrow = None  # Arrow IPC stream writer, opened with the first chunk's schema
+        self._schema = None
+
+    def encode(self, df: pd.DataFrame, model: ModelChoice) -> bytes:
+        first, self._first = self._first, False
+        if self.fmt == StreamFormat.arrow:
+            preds, scores = _score_frame(df, model)
+            table = scored_table(df, {"prediction": preds, "score": scores}, self._schema)
+            if self._arrow is None:
+                self._schema = table.schema
+                self._arrow = _pa.ipc.new_stream(self._buf, table.schema)
+            self._arrow.write_table(table)
+            return self._drain()
+        df = _score_chunk(df, model)
+        if self.fmt == StreamFormat.csv:
+            return df.to_csv(index=False, header=first).encode()
+        return df.to_json(orient="records", lines=True, date_format="iso").encode()
+
+    def close(self) -> bytes:
+        if self._arrow is None:
+            return b""
+        self._arrow.close()  # end-of-stream marker
+        return self._drain()
+
+    def _drain(self) -> bytes:
+        data = self._buf.getvalue()
+        self._buf.seek(0)
+        self._buf.truncate()
+        return data
+
+
+def _close_chunks(chunks: Iterator[pd.DataFrame]) -> None:
+    """Release the upload parser while the upload file is still open."""
+    close = getattr(chunks, "close", None)
+    if close is not None:
+        close()
+
+
+async def _next_chunk(chunks: Iterator[pd.DataFrame]) -> pd.DataFrame | None:
+    try:
+        return await _exec.run("batch_predict", next, chunks, None)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail="Failed to parse file") from e
+
+
 @app.post("/batch_predict")
 async def batch_predict(
     file: UploadFile = File(...),
     model: ModelChoice = ModelChoice.isolation_forest,
+    stream: bool = False,
+    output: StreamFormat = StreamFormat.ndjson,
+    chunk_size: int = STREAM_CHUNK_ROWS,
 ):
-    if file.content_type not in {"text/csv", "application/json", "application/jsonl", "application/octet-stream"}:
+    """Score an uploaded CSV/JSONL file.
+
+    Parquet and Arrow IPC (`application/vnd.apache.arrow.stream`) uploads are
+    read batch by batch; they need pyarrow (415 without it). With `stream=true` the upload is parsed and scored
+    `chunk_size` rows at a time and results are streamed back as NDJSON, CSV
+    or an Arrow IPC stream (`output`), so memory is bounded by the chunk
+    rather than the file. If a later chunk fails, an NDJSON stream ends with
+    an ``{"error": ..., "rows_scored": n}`` record; CSV and Arrow streams are
+    aborted without their terminating chunk (and Arrow end-of-stream marker).
+    """
+    if file.content_type not in UPLOAD_TYPES:
         raise HTTPException(status_code=400, detail="Unsupported file type")
+    if chunk_size < 1:
+        raise HTTPException(status_code=400, detail="chunk_size must be >= 1")
+    if stream and output == StreamFormat.arrow and _pa is None:
+        raise HTTPException(status_code=400, detail="output=arrow requires pyarrow on the server")
 
-    contents = await file.read()
-    # Try CSV first
-    df: pd.DataFrame | None = None
+    chunks = _upload_chunks(file, chunk_size)
+    handed_off = False  # the streaming body closes the parser itself
     try:
-        df = pd.read_csv(io.StringIO(contents.decode()))
-    except Exception:
+        first = await _next_chunk(chunks)
+        if first is None or first.empty:
+            raise HTTPException(status_code=400, detail="Parsed file is empty")
+
+        if not stream:
+            frames = [first]
+            while (df := await _next_chunk(chunks)) is not None:
+                frames.append(df)
+            df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else first
+            result = await _exec.run("batch_predict", _score_chunk, df, model)
+            return result.to_dict(orient="records")
+        handed_off = True
+    finally:
+        if not handed_off:
+            _close_chunks(chunks)
+
+    async def body():
+        encoder, df, rows = _ChunkEncoder(output), first, 0
         try:
-            # assume JSONL
-            lines = contents.decode().splitlines()
-            records = [json.loads(l) for l in lines if l.strip()]
-            df = pd.DataFrame.from_records(records)
+            while df is not None:
+                yield await _exec.run("batch_predict", encoder.encode, df, model)
+                rows += len(df)
+                df = await _next_chunk(chunks)
         except Exception as e:
-            raise HTTPException(status_code=400, detail="Failed to parse file") from e
-
-    if df is None or df.empty:
-        raise HTTPException(status_code=400, detail="Parsed file is empty")
-
-    if model == ModelChoice.tab_transformer:
-        scores = _tab_detector.predict_score(df)
-        preds = (-1 * (scores > 0.5).astype(int)) + (scores <= 0.5).astype(int)  # map True->-1, False->1
-    else:
-        preds = _iso_detector.predict(df)
-        scores = _iso_detector.score_samples(df)
-
-    result = df.copy()
-    result["prediction"] = preds
-    result["score"] = scores
+            # The 200 is already out, so an HTTPException can no longer reach the client
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            if output != StreamFormat.ndjson:
+                # No error record in CSV / Arrow: abort before the final chunk so the body is visibly cut
+                raise RuntimeError(f"batch_predict stream aborted after {rows} rows: {detail}") from e
+            yield (json.dumps({"error": detail, "rows_scored": rows}) + "\n").encode()
+            return
+        finally:
+            _close_chunks(chunks)
+        yield encoder.close()
 
-    return result.to_dict(orient="records")
+    media_types = {StreamFormat.csv: "text/csv", StreamFormat.arrow: ARROW_STREAM_TYPE}
+    return StreamingResponse(body(), media_type=media_types.get(output, "application/x-ndjson"))
 
 
 @app.get("/graph/stats")
-async def graph_stats():
-    return _detect_rings()
+async def graph_stats(max_cycle_len: int | None = None):
+    """Ring registry read; pass `max_cycle_len` to force a bounded full scan."""
+    return await _detect_rings(max_cycle_len)
 
 
 @app.get("/metrics")
@@ -202,18 +397,48 @@ async def get_metrics():
     }
 
 
+@app.get("/metrics/batching")
+async def batching_metrics():
+    """Micro-batcher latency and batch-size histograms per model."""
+    return {m.value: b.stats() for m, b in _batchers.items()}
+
+
+@app.get("/metrics/executors")
+async def executor_metrics():
+    """Queue depth and latency of the thread/process pools, plus route mapping."""
+    return _exec.stats()
+
+
+@app.get("/metrics/alerts")
+async def alert_metrics():
+    """Alert queue depth, overflow counts and per-channel delivery stats."""
+    return get_alert_stats()
+
+
+@app.on_event("shutdown")
+async def _stop_batchers():
+    for b in _batchers.values():
+        await b.close()
+    _exec.shutdown(wait=False)
+    await close_alerter()
+    _blockchain_logger.close()
+
+
 @app.get("/benchmark")
 async def benchmark_models():
     """Performance benchmark comparing models."""
+    return await _exec.run("benchmark", _run_benchmark)
+
+
+def _run_benchmark():
     import time as timing
-    
+
     # Create test dataset
     test_df = _hist_df.head(100)
     
     # Benchmark IsolationForest
     start = timing.time()
-    iso_preds = _iso_detector.predict(test_df)
-    iso_scores = _iso_detector.score_samples(test_df)
+    iso_preds, iso_scores = _iso_detector.predict_with_scores(test_df)
     iso_time = timing.time() - start
     
     # Benchmark TabTransformer
@@ -243,13 +468,14 @@ async def benchmark_models():
 # GNN Ring Risk endpoint
 # -----------------------------------------------------
 
-_ring_model = RingRiskGNN()
-
-
 @app.get("/ring_risk")
 async def ring_risk():
-    g = build_transaction_graph(_hist_df)  # type: ignore[arg-type]
-    cycles = detect_fraud_rings(g)
+    return await _exec.run("ring_risk", _score_ring_risk)
+
+
+def _score_ring_risk():
+    # One locked read: scorer threads must not see concurrent ingests, and every ring must be in `g`
+    g, cycles = _live_graph.snapshot_with_rings()
     scores = score_rings(g, cycles, _ring_model)
     return [{"ring": list(c), "risk": s} for c, s in zip(cycles, scores)]
 
@@ -267,7 +493,7 @@ async def ws_predict(websocket: WebSocket):
             model_name = data.get("model", "isolation_forest")
             txn = {k: v for k, v in data.items() if k != "model"}
             try:
-                pred = _predict_one(txn, ModelChoice(model_name))  # type: ignore[arg-type]
+                pred = await _predict_one(txn, ModelChoice(model_name))  # type: ignore[arg-type]
                 await websocket.send_json(pred)
             except Exception as exc:  # noqa
                 await websocket.send_json({"error": str(exc)})
@@ -275,10 +501,45 @@ async def ws_predict(websocket: WebSocket):
         await websocket.close() 
 
 
+@app.get("/alerts/health")
+async def alert_channel_health():
+    """Probe each alert channel's pooled connection."""
+    return await check_alert_channels()
+
+
 @app.get("/alerts")
-async def recent_alerts(limit: int = 20):
-    """Get recent fraud alerts."""
-    return get_recent_alerts(limit) 
+async def recent_alerts(
+    response: Response,
+    limit: int = Query(20, ge=1, le=1000),
+    cursor: str | None = None,
+    severity: str | None = None,
+    source_id: str | None = None,
+    model: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    min_risk: float | None = None,
+):
+    """Stored fraud alerts, newest first, filtered and paginated.
+
+    Pass the `X-Next-Cursor` response header back as `cursor` for the next
+    page; the header is absent on the last page.
+    """
+    filters = AlertQuery(
+        severity=severity.upper() if severity else None,
+        source_id=source_id,
+        model_used=model,
+        since=since,
+        until=until,
+        min_risk=min_risk,
+    )
+    try:
+        # SQLite may wait on the writer thread's lock: keep it off the event loop
+        alerts, next_cursor = await _exec.run("alerts_query", query_alerts, filters, limit, cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return alerts
 
 
 # -----------------------------------------------------
@@ -307,45 +568,54 @@ async def quantum_threat():
 @app.get("/blockchain/wallet/{wallet_address}/reputation")
 async def wallet_reputation(wallet_address: str):
     """Get blockchain-verified wallet reputation."""
-    return get_wallet_reputation(wallet_address)
+    # A cache miss rebuilds from the ledger (SQLite + preads behind its lock)
+    return await _exec.run("blockchain_read", get_wallet_reputation, wallet_address)
 
 
 @app.post("/blockchain/product/track")
 async def track_product(product_id: str, event_type: str, location: str):
     """Track product through blockchain supply chain."""
-    return _blockchain_logger.track_product_journey(product_id, event_type, location)
+    # Sealing appends to the ledger and may checkpoint it (fsync + SQLite commit)
+    return await _exec.run(
+        "blockchain_track", _blockchain_logger.track_product_journey, product_id, event_type, location
+    )
 
 
 @app.get("/blockchain/product/{product_id}/provenance")
 async def product_provenance(product_id: str):
     """Get complete blockchain-verified product journey."""
-    return _blockchain_logger.get_product_provenance(product_id)
+    return await _exec.run("blockchain_read", _blockchain_logger.get_product_provenance, product_id)
+
+
+@app.get("/blockchain/proof/{tx_hash}")
+async def inclusion_proof(tx_hash: str):
+    """Merkle inclusion proof for a fraud log or provenance event hash."""
+    proof = await _exec.run("blockchain_read", _blockchain_logger.get_inclusion_proof, tx_hash)
+    if proof is None:
+        raise HTTPException(status_code=404, detail=f"Unknown or not yet sealed transaction {tx_hash}")
+    return {**proof, "verified": _blockchain_logger.blockchain.verify_inclusion(proof)}
 
 
 @app.get("/analytics/report")
 async def analytics_report():
     """Generate comprehensive fraud analytics report."""
-    # Convert historical data to list of dicts for analytics
-    hist_data = _hist_df.to_dict('records')
-    
-    # Add some recent transaction activity (simulated)
-    recent_transactions = []
-    now = datetime.now()
-    for i in range(50):  # simulate 50 recent transactions
-        recent_transactions.append({
-            "timestamp": (now - timedelta(minutes=i*5)).timestamp(),
-            "source_id": f"U{1000 + (i % 200)}",
-            "target_id": f"TARGET_{i % 10}",
-            "amount": 50.0 + (i * 10) + (i % 100),
-            "location": ["New_York_NY", "Los_Angeles_CA", "Chicago_IL", "Miami_FL"][i % 4],
-            "is_fraud": (i % 7 == 0),  # simulate some fraud
-            "fraud_score": 0.9 if (i % 7 == 0) else 0.1 + (i % 5) * 0.1
-        })
+    # Add some recent transaction activity (simulated), built column-wise
+    i = np.arange(50)  # simulate 50 recent transactions
+    is_fraud = i % 7 == 0  # simulate some fraud
+    recent_transactions = pd.DataFrame({
+        "timestamp": pd.Timestamp.now(tz=_hist_df["timestamp"].dt.tz) - pd.to_timedelta(i * 5, unit="m"),
+        "source_id": [f"U{1000 + (k % 200)}" for k in i],
+        "target_id": [f"TARGET_{k % 10}" for k in i],
+        "amount": 50.0 + i * 10 + i % 100,
+        "location": np.array(["New_York_NY", "Los_Angeles_CA", "Chicago_IL", "Miami_FL"])[i % 4],
+        "is_fraud": is_fraud,
+        "fraud_score": np.where(is_fraud, 0.9, 0.1 + (i % 5) * 0.1),
+    })
     
-    # Combine historical and recent data
-    all_data = hist_data + recent_transactions
+    # One frame for the whole report: historical + recent, no per-row dicts
+    all_data = pd.concat([_hist_df, recent_transactions], ignore_index=True)
     
-    # Generate comprehensive analytics report
-    report = generate_fraud_analytics_report(all_data)
+    # Generate comprehensive analytics report (KMeans etc. in the process pool)
+    report = await _exec.run("analytics_report", generate_fraud_analytics_report, all_data)
     
     return report 
\ No newline at end of file
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+"""Asyncio micro-batching scheduler for single-transaction scoring.
+
+Concurrent `/predict` and `/ws/predict` callers each submit one transaction;
+the batcher pools them for at most `max_wait_ms` (or until `max_batch_size`
+items are queued), scores the whole pool with a single model call and fans
+the results back out to the waiting futures.
+"""
+
+import asyncio
+import bisect
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Sequence, Tuple
+
+__all__ = ["Histogram", "MicroBatcher"]
+
+# Upper bucket edges; the final bucket is open-ended (+Inf)
+LATENCY_BUCKETS_MS: Tuple[float, ...] = (0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+BATCH_SIZE_BUCKETS: Tuple[float, ...] = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+
+@dataclass
+class Histogram:
+    """Fixed-bucket histogram (Prometheus style cumulative export)."""
+
+    buckets: Tuple[float, ...]
+    _counts: List[int] = field(init=False)
+    count: int = field(init=False, default=0)
+    total: float = field(init=False, default=0.0)
+
+    def __post_init__(self):
+        self._counts = [0] * (len(self.buckets) + 1)
+
+    def observe(self, value: float) -> None:
+        self._counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def snapshot(self) -> Dict[str, Any]:
+        cumulative, running = {}, 0
+        for edge, n in zip(list(self.buckets) + ["+Inf"], self._counts):
+            running += n
+            cumulative[str(edge)] = running
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "buckets": cumulative,
+        }
+
+
+class MicroBatcher:
+    """Pool concurrent requests and score them with one call to *score_fn*.
+
+    `score_fn` receives the list of pooled items and must return one result
+    per item, in order. If a pooled call raises, items are retried one by one
+    so a single malformed transaction cannot fail its neighbours.
+
+    `runner(fn, items)`, when given, is awaited to execute `score_fn` (e.g. on
+    a thread pool) so scoring never blocks the event loop.
+    """
+
+    def __init__(
+        self,
+        score_fn: Callable[[List[Any]], Sequence[Any]],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 2.0,
+        runner: Callable[[Callable[[List[Any]], Sequence[Any]], List[Any]], Awaitable[Sequence[Any]]] | None = None,
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        self.score_fn = score_fn
+        self.runner = runner
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.latency_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.batch_size = Histogram(BATCH_SIZE_BUCKETS)
+        self._queue: asyncio.Queue | None = None
+        self._worker: asyncio.Task | None = None
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    async def submit(self, item: Any) -> Any:
+        """Queue *item* for the next batch and wait for its result."""
+        self._ensure_worker()
+        assert self._queue is not None
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, fut, time.perf_counter()))
+        return await fut
+
+    async def close(self) -> None:
+        """Stop the background worker (pending callers are cancelled)."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._worker = None
+        self._queue = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "latency_ms": self.latency_ms.snapshot(),
+            "batch_size": self.batch_size.snapshot(),
+        }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _ensure_worker(self) -> None:
+        # Created lazily so the queue binds to the loop that serves requests
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def _collect(self) -> List[Tuple[Any, asyncio.Future, float]]:
+        assert self._queue is not None
+        pending = [await self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait_ms / 1000.0
+        while len(pending) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                pending.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        # Drain anything that is already queued without waiting further
+        while len(pending) < self.max_batch_size and not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        return pending
+
+    async def _run(self) -> None:
+        while True:
+            pending = await self._collect()
+            pending = [p for p in pending if not p[1].cancelled()]
+            if not pending:
+                continue
+            self.batch_size.observe(len(pending))
+            await self._dispatch(pending)
+
+    async def _score(self, items: List[Any]) -> Sequence[Any]:
+        if self.runner is None:
+            return self.score_fn(items)
+        return await self.runner(self.score_fn, items)
+
+    async def _dispatch(self, pending: List[Tuple[Any, asyncio.Future, float]]) -> None:
+        items = [p[0] for p in pending]
+        try:
+            results = list(await self._score(items))
+            if len(results) != len(items):
+                raise RuntimeError("score_fn returned wrong number of results")
+            outcomes: List[Tuple[Any, BaseException | None]] = [(r, None) for r in results]
+        except Exception:
+            outcomes = []
+            for item in items:
+                try:
+                    outcomes.append(((await self._score([item]))[0], None))
+                except Exception as exc:  # noqa
+                    outcomes.append((None, exc))
+
+        done = time.perf_counter()
+        for (_, fut, enqueued), (result, exc) in zip(pending, outcomes):
+            self.latency_ms.observe((done - enqueued) * 1000.0)
+            if fut.done():
+                continue
+            if exc is not None:
+                fut.set_exception(exc)
+            else:
+                fut.set_result(result)
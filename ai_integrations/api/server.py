@@ -18,24 +18,31 @@ from typing import Dict, Any
 import pandas as pd
 from flask import Flask, jsonify, request
 
-from cortex.fraud_detection import FraudDetector
-from cortex.graph_analytics import build_transaction_graph, detect_fraud_rings, ring_stats
+from cortex.fraud_detection import FraudDetector, TRANSACTION_SCHEMA
+from cortex.model_registry import ModelRegistry
+from cortex.graph_analytics import TransactionGraph, find_rings, ring_stats
+from cortex.thread_budget import configure_threads
 
 app = Flask(__name__)
 
 # ---------------------------------------------------------------------
 # Load & train model at startup
 # ---------------------------------------------------------------------
+configure_threads()  # cap joblib/torch/OpenMP at this worker's share of cores
+
 DATA_PATH = Path(os.environ.get("TS360_DATA", "data/sample_transactions.jsonl"))
 if DATA_PATH.exists():
-    hist_df = FraudDetector.load_jsonl(DATA_PATH)
+    hist_df = FraudDetector.load_jsonl(DATA_PATH, schema=TRANSACTION_SCHEMA)
 else:
     # fallback synthetic dataset
     from main import _generate_synthetic_transactions  # type: ignore
 
     hist_df = _generate_synthetic_transactions(500)
 
-_detector = FraudDetector().fit(hist_df)
+# Reuse the published model when available (see cortex.model_registry)
+_bundle = ModelRegistry().load_latest_or_none()
+_detector = _bundle.fraud_detector if _bundle is not None else FraudDetector().fit(hist_df)
+_graph = TransactionGraph(track_rings=True).ingest(hist_df)
 
 
 # ---------------------------------------------------------------------
@@ -44,9 +51,9 @@ _detector = FraudDetector().fit(hist_df)
 
 def _predict_single(txn: Dict[str, Any]):
     df = pd.DataFrame([txn])
-    pred = _detector.predict(df)[0]
-    score = _detector.score_samples(df)[0]
-    return {"prediction": int(pred), "score": float(score)}
+    preds, scores = _detector.predict_with_scores(df)
+    _graph.ingest(df)
+    return {"prediction": int(preds[0]), "score": float(scores[0])}
 
 
 # ---------------------------------------------------------------------
@@ -67,9 +74,12 @@ def predict():
 
 @app.route("/graph/stats")
 def graph_stats():
-    g = build_transaction_graph(hist_df)
-    cycles = detect_fraud_rings(g)
-    return jsonify(ring_stats(cycles))
+    max_cycle_len = request.args.get("max_cycle_len", type=int)
+    if max_cycle_len is None:
+        return jsonify(_graph.ring_stats())
+    # Scan a copy: other request threads keep ingesting into the live graph
+    cycles, truncated = find_rings(_graph.snapshot(), max_cycle_len=max_cycle_len)
+    return jsonify(ring_stats(cycles, truncated))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+"""Write-behind batching of fraud log entries into ledger blocks.
+
+`FraudLogBatcher.submit` returns a pending `LedgerReceipt` immediately (its
+transaction hash is known up front: the entry's Merkle leaf hash). Entries
+accumulate until `max_entries` are pending or `max_wait_ms` has passed
+since the first of them, then the whole batch is sealed into one block with
+a single call to `seal`. Receipts are confirmed in place, and per-entry
+callbacks plus any registered listeners are invoked; `await receipt.wait()`
+blocks until confirmation. Ledger throughput is then bounded by the batch
+size rather than by per-entry commit latency.
+
+On a running event loop `seal` runs in the loop's default thread pool (a
+ledger append may fsync and checkpoint), one batch at a time; entries
+submitted meanwhile go into the next block. `flush()` seals inline.
+"""
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from blockchain.merkle import leaf_hash
+
+if TYPE_CHECKING:  # fraud_logger imports this module
+    from blockchain.fraud_logger import FraudLogEntry
+
+__all__ = ["FraudLogBatcher", "LedgerReceipt"]
+
+# Called with the confirmed receipt; may be a coroutine function
+ConfirmCallback = Callable[["LedgerReceipt"], Any]
+
+
+@dataclass
+class LedgerReceipt:
+    tx_hash: str
+    transaction_id: str
+    status: str = "pending"  # pending -> confirmed
+    submitted_at: float = field(default_factory=time.time)
+    block_number: Optional[int] = None
+    block_hash: Optional[str] = None
+    merkle_root: Optional[str] = None
+    confirmed_at: Optional[float] = None
+    _waiter: Optional[asyncio.Future] = field(default=None, repr=False)
+
+    @property
+    def confirmed(self) -> bool:
+        return self.status == "confirmed"
+
+    def _confirm(self, block: Dict[str, Any], now: float) -> None:
+        self.status = "confirmed"
+        self.block_number = block["number"]
+        self.block_hash = block["hash"]
+        self.merkle_root = block["merkle_root"]
+        self.confirmed_at = now
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(self)
+
+    async def wait(self) -> "LedgerReceipt":
+        """Wait until the entry's block is sealed."""
+        if not self.confirmed:
+            if self._waiter is None:
+                self._waiter = asyncio.get_running_loop().create_future()
+            await asyncio.shield(self._waiter)
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "tx_hash": self.tx_hash,
+            "transaction_id": self.transaction_id,
+            "status": self.status,
+            "submitted_at": self.submitted_at,
+            "block_number": self.block_number,
+            "block_hash": self.block_hash,
+            "merkle_root": self.merkle_root,
+            "confirmed_at": self.confirmed_at,
+        }
+
+
+# (entry, receipt, per-entry callback) waiting for its block
+_Pending = Tuple["FraudLogEntry", LedgerReceipt, Optional[ConfirmCallback]]
+
+
+class FraudLogBatcher:
+    """Accumulate `FraudLogEntry` records and seal them N at a time.
+
+    `seal(entries)` must append one block holding *entries* and return it
+    (a dict with ``number``, ``hash`` and ``merkle_root``); it may be called
+    from a worker thread. Without a running event loop there is no timer:
+    batches are sealed inline when full or on `flush()`.
+    """
+
+    def __init__(
+        self,
+        seal: Callable[[List["FraudLogEntry"]], Dict[str, Any]],
+        max_entries: int = 256,
+        max_wait_ms: float = 200.0,
+    ):
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        self.seal = seal
+        self.max_entries = max_entries
+        self.max_wait_ms = max_wait_ms
+        self._pending: List[_Pending] = []
+        self._inflight: List[_Pending] = []  # being sealed in a worker thread
+        self._timer: asyncio.TimerHandle | None = None
+        self._sealing: asyncio.Task | None = None
+        self._seal_lock = threading.Lock()  # one seal at a time, inline or in a worker thread
+        self._listeners: List[ConfirmCallback] = []
+        self.counters = {"submitted": 0, "blocks": 0, "sealed": 0, "largest_block": 0}
+
+    def add_listener(self, callback: ConfirmCallback) -> None:
+        """Call *callback* for every confirmed receipt."""
+        self._listeners.append(callback)
+
+    def submit(self, entry: "FraudLogEntry", callback: Optional[ConfirmCallback] = None) -> LedgerReceipt:
+        receipt = LedgerReceipt(
+            tx_hash="0x" + leaf_hash(entry.to_blockchain_data()).hex(),
+            transaction_id=entry.transaction_id,
+        )
+        self._pending.append((entry, receipt, callback))
+        self.counters["submitted"] += 1
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if len(self._pending) >= self.max_entries or self.max_wait_ms <= 0:
+            if loop is None:
+                self.flush()
+            else:
+                self._seal_soon()
+        elif self._timer is None and loop is not None:
+            self._timer = loop.call_later(self.max_wait_ms / 1000.0, self._seal_soon)
+        return receipt
+
+    def pending_entries(self) -> List[Tuple[str, "FraudLogEntry"]]:
+        """(tx hash, entry) for everything submitted but not yet confirmed.
+
+        Safe to call from other threads: entries move from `_pending` to
+        `_inflight` (assigned first), so reading in the opposite order sees
+        each of them at least once.
+        """
+        pending, inflight = self._pending, self._inflight
+        seen = {receipt.tx_hash: entry for entry, receipt, _ in pending + inflight}
+        return list(seen.items())
+
+    def flush(self) -> Optional[Dict[str, Any]]:
+        """Seal everything pending into one block now."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        with self._seal_lock:  # waits for a batch being sealed in the background
+            self._inflight = batch = self._pending
+            self._pending = []
+            if not batch:
+                return None
+            try:
+                block = self.seal([entry for entry, _, _ in batch])
+            except BaseException:
+                self._pending[:0] = batch  # keep the receipts pending for the next attempt
+                raise
+            finally:
+                self._inflight = []
+        self._confirm(batch, block)
+        return block
+
+    def _seal_soon(self) -> None:
+        """Start sealing in the background unless a seal is already running."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._sealing is None and self._pending:
+            self._sealing = asyncio.get_running_loop().create_task(self._seal_pending())
+
+    async def _seal_pending(self) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while self._pending:  # whatever arrived during the last seal goes next, N at a time
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                n = self.max_entries
+                self._inflight, self._pending = self._pending[:n], self._pending[n:]
+                try:
+                    block = await loop.run_in_executor(None, self._seal_locked, self._inflight)
+                except Exception as e:  # noqa - retried on the next submit or flush
+                    self._pending[:0] = self._inflight
+                    print(f"Ledger seal failed: {e}")
+                    return
+                finally:
+                    batch, self._inflight = self._inflight, []
+                self._confirm(batch, block)
+        finally:
+            self._sealing = None
+
+    def _seal_locked(self, batch: List[_Pending]) -> Dict[str, Any]:
+        with self._seal_lock:
+            return self.seal([entry for entry, _, _ in batch])
+
+    def _confirm(self, batch: List[_Pending], block: Dict[str, Any]) -> None:
+        now = time.time()
+        for _, receipt, callback in batch:
+            receipt._confirm(block, now)
+            for fn in ([callback] if callback else []) + self._listeners:
+                self._notify(fn, receipt)
+        self.counters["blocks"] += 1
+        self.counters["sealed"] += len(batch)
+        self.counters["largest_block"] = max(self.counters["largest_block"], len(batch))
+
+    @staticmethod
+    def _notify(fn: ConfirmCallback, receipt: LedgerReceipt) -> None:
+        try:
+            result = fn(receipt)
+            if asyncio.iscoroutine(result):
+                try:
+                    asyncio.get_running_loop().create_task(result)
+                except RuntimeError:  # sealed from synchronous code
+                    asyncio.run(result)
+        except Exception as e:  # noqa - a bad callback must not lose the block
+            print(f"Ledger confirmation callback failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_entries": self.max_entries,
+            "max_wait_ms": self.max_wait_ms,
+            "pending": len(self._pending),
+            "sealing": len(self._inflight),
+            **self.counters,
+        }
@@ -2,16 +2,28 @@ from __future__ import annotations
 
 """Blockchain-based fraud logging and supply chain transparency."""
 
+import hashlib
 import json
 import os
+import struct
+import threading
 import time
+from collections import OrderedDict
+from collections.abc import Sequence
 from dataclasses import dataclass, asdict
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional, Union
 
 from web3 import Web3  # type: ignore
 from eth_account import Account  # type: ignore
 
+from blockchain.batcher import ConfirmCallback, FraudLogBatcher
+from blockchain.merkle import leaf_hash, merkle_proof, merkle_root, verify_proof
+from blockchain.segment_ledger import Key, MemoryLedger, SegmentLedger, open_ledger
+
+# Parent of the first block
+GENESIS_HASH = "0x" + "00" * 32
+
 
 @dataclass
 class FraudLogEntry:
@@ -47,88 +59,322 @@ class SupplyChainEvent:
         if self.details is None:
             self.details = {}
 
+    def to_blockchain_data(self) -> bytes:
+        """Convert to blockchain-compatible bytes."""
+        return json.dumps(asdict(self), default=str).encode('utf-8')
+
+
+def block_header_hash(header: Dict[str, Any]) -> str:
+    """SHA-256 over the canonical JSON of a block header."""
+    return "0x" + hashlib.sha256(json.dumps(header, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+# Ledger record kinds
+BLOCK, FRAUD_LOG, SUPPLY_CHAIN = 0, 1, 2
+_RECORD_KINDS = {"fraud_log": FRAUD_LOG, "supply_chain": SUPPLY_CHAIN}
+_HEADER_FIELDS = ("number", "parent_hash", "timestamp", "merkle_root", "kind", "size")
+# Prefix of every fraud log / supply-chain record: block number, index within the block
+_PLACEMENT = struct.Struct("<QI")
+
+
+class _RecordView(Sequence):
+    """Read-only list over one record kind, decoded from the ledger on access."""
+
+    def __init__(self, count: Callable[[], int], decode: Callable[[int], Dict[str, Any]]):
+        self._count = count
+        self._decode = decode
+
+    def __len__(self) -> int:
+        return self._count()
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._decode(j) for j in range(*i.indices(len(self)))]
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("ledger index out of range")
+        return self._decode(i)
+
 
 class MockBlockchain:
-    """Mock blockchain implementation for demonstration."""
+    """Mock blockchain implementation for demonstration.
+
+    Every block header holds its number, parent hash, timestamp and the
+    Merkle root of its records (fraud log entries or supply-chain events);
+    the block hash is SHA-256 over that header, so each block commits to
+    its whole ancestry. A record's hash is its Merkle leaf hash, and
+    `get_inclusion_proof` returns the O(log n) path that ties it to a block.
+
+    Records are stored once, as their serialized bytes, in a ledger
+    (`MemoryLedger`, or a `SegmentLedger` directory that survives restarts);
+    `blocks`, `fraud_logs` and `supply_chain_records` decode on access. A
+    block and its records are appended as one atomic batch, and each
+    record carries the keys of the ledger's secondary indexes:
+
+        wallet      -> fraud logs (source or target wallet)
+        product     -> supply-chain events, by event time
+        tx          -> (record kind, position) of a record hash
+    """
     
-    def __init__(self):
-        self.blocks = []
+    def __init__(self, ledger: Union[MemoryLedger, SegmentLedger, None] = None):
+        self.ledger = ledger if ledger is not None else MemoryLedger()
+        self._write_lock = threading.Lock()  # blocks may be sealed from worker threads
         self.pending_transactions = []
-        self.fraud_logs = []
-        self.supply_chain_records = []
-        
-    def add_fraud_log(self, entry: FraudLogEntry) -> str:
-        """Add fraud log to mock blockchain."""
-        block_hash = f"0x{''.join([f'{ord(c):02x}' for c in entry.transaction_id])}"
-        
-        self.fraud_logs.append({
-            "hash": block_hash,
-            "entry": entry,
-            "block_number": len(self.blocks) + 1,
-            "confirmations": 12
-        })
-        
-        # Simulate block mining
-        block = {
-            "number": len(self.blocks) + 1,
-            "hash": block_hash,
+        self.blocks = _RecordView(lambda: self.ledger.count(BLOCK), self._read_block)
+        self.fraud_logs = _RecordView(lambda: self.ledger.count(FRAUD_LOG), self._read_fraud_log)
+        self.supply_chain_records = _RecordView(lambda: self.ledger.count(SUPPLY_CHAIN), self._read_supply_chain)
+        n_blocks = self.ledger.count(BLOCK)
+        self._head_hash = self._block_meta(n_blocks)["hash"] if n_blocks else GENESIS_HASH
+
+    @property
+    def head_hash(self) -> str:
+        return self._head_hash
+
+    # ------------------------------------------------------------------
+    # Decoding
+    # ------------------------------------------------------------------
+    def _block_meta(self, number: int) -> Dict[str, Any]:
+        """Header, hash and first record position of block *number* (1-based)."""
+        return json.loads(self.ledger.read(BLOCK, number - 1))
+
+    def _block_payloads(self, meta: Dict[str, Any]) -> List[bytes]:
+        kind = _RECORD_KINDS[meta["kind"]]
+        return [
+            self.ledger.read(kind, pos)[_PLACEMENT.size:]
+            for pos in range(meta["first"], meta["first"] + meta["size"])
+        ]
+
+    def _read_block(self, i: int) -> Dict[str, Any]:
+        meta = self._block_meta(i + 1)
+        payloads = self._block_payloads(meta)
+        return {
+            **{k: meta[k] for k in _HEADER_FIELDS},
+            "hash": meta["hash"],
+            "leaves": [leaf_hash(p) for p in payloads],
+            "transactions": payloads,
+        }
+
+    def _read_record(self, kind: int, pos: int) -> Dict[str, Any]:
+        raw = self.ledger.read(kind, pos)
+        number, index = _PLACEMENT.unpack_from(raw)
+        payload = raw[_PLACEMENT.size:]
+        return {
+            "hash": "0x" + leaf_hash(payload).hex(),
+            "data": json.loads(payload),
+            "block_number": number,
+            "block_hash": self._block_meta(number)["hash"],
+            "index": index,
+        }
+
+    def _read_fraud_log(self, pos: int) -> Dict[str, Any]:
+        record = self._read_record(FRAUD_LOG, pos)
+        return {**record, "entry": FraudLogEntry(**record.pop("data")), "confirmations": 12}
+
+    def _read_supply_chain(self, pos: int) -> Dict[str, Any]:
+        record = self._read_record(SUPPLY_CHAIN, pos)
+        return {**record, "event": SupplyChainEvent(**record.pop("data")), "confirmations": 6}
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+    def _seal_block(self, kind: str, payloads: List[bytes], keys: List[List[Key]]) -> Dict[str, Any]:
+        with self._write_lock:
+            return self._seal_block_locked(kind, payloads, keys)
+
+    def _seal_block_locked(self, kind: str, payloads: List[bytes], keys: List[List[Key]]) -> Dict[str, Any]:
+        leaves = [leaf_hash(p) for p in payloads]
+        header = {
+            "number": self.ledger.count(BLOCK) + 1,
+            "parent_hash": self.head_hash,
             "timestamp": int(time.time()),
-            "transactions": [entry.to_blockchain_data()],
-            "fraud_entry": asdict(entry)
+            "merkle_root": merkle_root(leaves).hex(),
+            "kind": kind,
+            "size": len(payloads),
         }
-        self.blocks.append(block)
+        block_hash = block_header_hash(header)
+        record_kind = _RECORD_KINDS[kind]
+        records = [
+            (
+                record_kind,
+                _PLACEMENT.pack(header["number"], index) + payload,
+                [("tx", "0x" + leaf.hex(), 0.0), *record_keys],
+            )
+            for index, (payload, leaf, record_keys) in enumerate(zip(payloads, leaves, keys))
+        ]
+        meta = {**header, "hash": block_hash, "first": self.ledger.count(record_kind)}
+        records.append((BLOCK, json.dumps(meta).encode("utf-8"), ()))
+        self.ledger.append(records)  # the block and its records land together
+        self._head_hash = block_hash
+        return {**header, "hash": block_hash, "leaves": leaves, "transactions": payloads}
         
-        return block_hash
+    def add_fraud_log(self, entry: FraudLogEntry) -> str:
+        """Add fraud log to mock blockchain (a block of one); returns its tx hash."""
+        block = self.add_fraud_block([entry])
+        return "0x" + block["leaves"][0].hex()
+
+    def add_fraud_block(self, entries: List[FraudLogEntry]) -> Dict[str, Any]:
+        """Seal *entries* into one block whose header carries their Merkle root."""
+        return self._seal_block(
+            "fraud_log",
+            [entry.to_blockchain_data() for entry in entries],
+            [[("wallet", wallet, 0.0) for wallet in dict.fromkeys((entry.source_wallet, entry.target_wallet))]
+             for entry in entries],
+        )
     
     def add_supply_chain_event(self, event: SupplyChainEvent) -> str:
         """Add supply chain event to blockchain."""
-        event_hash = f"0x{''.join([f'{ord(c):02x}' for c in event.product_id[:8]])}"
-        
-        self.supply_chain_records.append({
-            "hash": event_hash,
-            "event": event,
-            "block_number": len(self.blocks) + 1,
-            "confirmations": 6
-        })
-        
-        block = {
-            "number": len(self.blocks) + 1,
-            "hash": event_hash,
-            "timestamp": int(time.time()),
-            "supply_event": asdict(event)
+        # Late events are slotted in by timestamp, after any with the same one
+        block = self._seal_block(
+            "supply_chain", [event.to_blockchain_data()], [[("product", event.product_id, float(event.timestamp))]]
+        )
+        return "0x" + block["leaves"][0].hex()
+
+    # ------------------------------------------------------------------
+    # Proofs
+    # ------------------------------------------------------------------
+    def get_inclusion_proof(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        """Merkle path and block header proving *tx_hash* is in the ledger."""
+        found = self.ledger.postings("tx", tx_hash.lower(), limit=1)
+        if not found:
+            return None
+        kind, pos = found[0]
+        number, index = _PLACEMENT.unpack_from(self.ledger.read(kind, pos))
+        meta = self._block_meta(number)
+        payloads = self._block_payloads(meta)
+        leaves = [leaf_hash(p) for p in payloads]
+        return {
+            "tx_hash": "0x" + leaves[index].hex(),
+            "kind": meta["kind"],
+            "record": payloads[index].decode("utf-8"),
+            "index": index,
+            "proof": merkle_proof(leaves, index),
+            "block_hash": meta["hash"],
+            "header": {k: meta[k] for k in _HEADER_FIELDS},
         }
-        self.blocks.append(block)
-        
-        return event_hash
+
+    @staticmethod
+    def verify_inclusion(proof: Dict[str, Any]) -> bool:
+        """Check a proof from `get_inclusion_proof` without the rest of the ledger.
+
+        Hashes the record into its leaf, walks the sibling path to the
+        Merkle root and checks that root against the block header, and the
+        header against the block hash: O(log n) hashes.
+        """
+        leaf = leaf_hash(proof["record"].encode("utf-8"))
+        header = proof["header"]
+        return (
+            "0x" + leaf.hex() == proof["tx_hash"]
+            and verify_proof(leaf, proof["proof"], bytes.fromhex(header["merkle_root"]))
+            and block_header_hash(header) == proof["block_hash"]
+        )
+
+    def verify_chain(self) -> bool:
+        """Full replay: every record, Merkle root, header hash and parent link."""
+        parent = GENESIS_HASH
+        for number in range(1, self.ledger.count(BLOCK) + 1):
+            meta = self._block_meta(number)
+            header = {k: meta[k] for k in _HEADER_FIELDS}
+            leaves = [leaf_hash(p) for p in self._block_payloads(meta)]
+            if (
+                meta["parent_hash"] != parent
+                or merkle_root(leaves).hex() != meta["merkle_root"]
+                or block_header_hash(header) != meta["hash"]
+            ):
+                return False
+            parent = meta["hash"]
+        return True
     
     def get_fraud_history(self, wallet_address: str) -> List[Dict[str, Any]]:
         """Get fraud history for a wallet."""
-        return [
-            {
-                "hash": log["hash"],
-                "fraud_score": log["entry"].fraud_score,
-                "timestamp": log["entry"].timestamp,
-                "amount": log["entry"].amount,
-                "model": log["entry"].model_used
-            }
-            for log in self.fraud_logs
-            if log["entry"].source_wallet == wallet_address or log["entry"].target_wallet == wallet_address
-        ]
+        history = []
+        for _, pos in self.ledger.postings("wallet", wallet_address):
+            raw = self.ledger.read(FRAUD_LOG, pos)[_PLACEMENT.size:]
+            entry = json.loads(raw)
+            history.append({
+                "hash": "0x" + leaf_hash(raw).hex(),
+                "fraud_score": entry["fraud_score"],
+                "timestamp": entry["timestamp"],
+                "amount": entry["amount"],
+                "model": entry["model_used"]
+            })
+        return history
     
     def get_supply_chain_trace(self, product_id: str) -> List[Dict[str, Any]]:
         """Get complete supply chain trace for product."""
-        return [
-            {
-                "hash": record["hash"],
-                "event_type": record["event"].event_type,
-                "location": record["event"].location,
-                "timestamp": record["event"].timestamp,
-                "verified": record["event"].verified,
-                "details": record["event"].details
-            }
-            for record in self.supply_chain_records
-            if record["event"].product_id == product_id
-        ]
+        trace = []
+        for _, pos in self.ledger.postings("product", product_id):
+            raw = self.ledger.read(SUPPLY_CHAIN, pos)[_PLACEMENT.size:]
+            event = json.loads(raw)
+            trace.append({
+                "hash": "0x" + leaf_hash(raw).hex(),
+                "event_type": event["event_type"],
+                "location": event["location"],
+                "timestamp": event["timestamp"],
+                "verified": event["verified"],
+                "details": event["details"]
+            })
+        return trace
+
+    def close(self) -> None:
+        self.ledger.close()
+
+
+# Fraud score above which a logged transaction counts as an incident
+INCIDENT_THRESHOLD = 0.7
+
+
+@dataclass
+class WalletAggregate:
+    """Running reputation statistics for one wallet, updated in O(1) per log.
+
+    With a `half_life_s`, the ``decayed_*`` fields weight each log by
+    ``0.5 ** (age / half_life_s)`` so recent behaviour dominates; they are
+    kept relative to `decayed_at` and only rescaled when a log arrives.
+    """
+
+    count: int = 0
+    score_sum: float = 0.0
+    incidents: int = 0
+    last_seen: int = 0
+    decayed_weight: float = 0.0
+    decayed_score_sum: float = 0.0
+    decayed_incidents: float = 0.0
+    decayed_at: int = 0
+
+    def update(self, fraud_score: float, timestamp: int, half_life_s: float | None) -> None:
+        incident = fraud_score > INCIDENT_THRESHOLD
+        self.count += 1
+        self.score_sum += fraud_score
+        self.incidents += incident
+        self.last_seen = max(self.last_seen, timestamp)
+        if not half_life_s:
+            return
+        if timestamp >= self.decayed_at:
+            factor = 0.5 ** ((timestamp - self.decayed_at) / half_life_s)
+            self.decayed_weight *= factor
+            self.decayed_score_sum *= factor
+            self.decayed_incidents *= factor
+            self.decayed_at = timestamp
+            weight = 1.0
+        else:  # late log: discount it instead of rescaling the aggregate
+            weight = 0.5 ** ((self.decayed_at - timestamp) / half_life_s)
+        self.decayed_weight += weight
+        self.decayed_score_sum += weight * fraud_score
+        self.decayed_incidents += weight * incident
+
+    @property
+    def avg_fraud_score(self) -> float:
+        return self.score_sum / self.count if self.count else 0.0
+
+    @property
+    def decayed_avg_fraud_score(self) -> float:
+        # Decaying both sums to "now" would cancel out in the ratio
+        return self.decayed_score_sum / self.decayed_weight if self.decayed_weight else 0.0
+
+    def decayed_incidents_at(self, now: int, half_life_s: float) -> float:
+        return self.decayed_incidents * 0.5 ** (max(0, now - self.decayed_at) / half_life_s)
 
 
 class LoyaltyTokenContract:
@@ -173,13 +419,45 @@ class LoyaltyTokenContract:
 class BlockchainFraudLogger:
     """Main blockchain integration for TrustShield 360."""
     
-    def __init__(self):
-        self.blockchain = MockBlockchain()
+    def __init__(self, half_life_s: Optional[float] = None, ledger_dir: Optional[str] = None):
+        # Records on disk under TS360_LEDGER_DIR (survive restarts); unset/empty = in memory.
+        # Opened on first use, so processes that only import this module never lock it.
+        if ledger_dir is None:
+            ledger_dir = os.getenv("TS360_LEDGER_DIR", "")
+        self.ledger_dir = ledger_dir
+        self._blockchain: Optional[MockBlockchain] = None
+        self._open_lock = threading.Lock()
         self.loyalty_contract = LoyaltyTokenContract()
+        # Optional time decay for reputation (seconds; unset/0 = plain average)
+        if half_life_s is None:
+            half_life_s = float(os.getenv("TS360_REPUTATION_HALF_LIFE_S", "0"))
+        self.half_life_s = half_life_s or None
+        # Per-wallet aggregates (LRU), rebuilt from the ledger when a wallet is seen again
+        self.aggregate_cache_size = max(1, int(os.getenv("TS360_REPUTATION_CACHE_SIZE", "65536")))
+        self._aggregates: "OrderedDict[str, WalletAggregate]" = OrderedDict()
+        self._agg_lock = threading.RLock()  # reputation reads run on worker threads
+        # Fraud logs are sealed into blocks write-behind, N entries or T ms at a time
+        self.batcher = FraudLogBatcher(
+            lambda entries: self.blockchain.add_fraud_block(entries),
+            max_entries=int(os.getenv("TS360_LEDGER_BATCH_SIZE", "256")),
+            max_wait_ms=float(os.getenv("TS360_LEDGER_BATCH_MS", "200")),
+        )
         
         # In production, these would be real blockchain connections
         self.fraud_contract_address = "0x1234567890abcdef1234567890abcdef12345678"
         self.supply_contract_address = "0xfedcba0987654321fedcba0987654321fedcba09"
+
+    @property
+    def blockchain(self) -> MockBlockchain:
+        if self._blockchain is None:
+            with self._open_lock:  # first use may come from several worker threads at once
+                if self._blockchain is None:
+                    self._blockchain = MockBlockchain(open_ledger(
+                        self.ledger_dir,
+                        segment_bytes=int(os.getenv("TS360_LEDGER_SEGMENT_MB", "64")) << 20,
+                        checkpoint_every=int(os.getenv("TS360_LEDGER_CHECKPOINT_EVERY", "4096")),
+                    ))
+        return self._blockchain
         
     async def log_fraud_detection(
         self, 
@@ -188,9 +466,15 @@ class BlockchainFraudLogger:
         target_wallet: str,
         amount: float,
         fraud_score: float,
-        model_used: str
+        model_used: str,
+        on_confirm: Optional[ConfirmCallback] = None,
+        wait: bool = False,
     ) -> Dict[str, Any]:
-        """Log fraud detection result to blockchain."""
+        """Log fraud detection result to blockchain.
+
+        Returns as soon as the entry is queued (``status: pending``) unless
+        `wait` is set; `on_confirm(receipt)` runs once its block is sealed.
+        """
         
         entry = FraudLogEntry(
             transaction_id=transaction_id,
@@ -202,24 +486,42 @@ class BlockchainFraudLogger:
             amount=amount
         )
         
-        # Add to blockchain
-        block_hash = self.blockchain.add_fraud_log(entry)
+        # Count it and queue it under one lock hold: a wallet rebuilt in between
+        # (or evicted and rebuilt) would otherwise see it twice or not at all
+        with self._agg_lock:
+            self._update_aggregates(entry)
+            receipt = self.batcher.submit(entry, on_confirm)
         
         # Handle loyalty tokens
         tokens_earned = 0
         if fraud_score < 0.5:  # Legitimate transaction
             tokens_earned = self.loyalty_contract.earn_tokens(source_wallet, amount, fraud_score)
         
+        if wait:
+            await receipt.wait()
+        
         return {
-            "block_hash": block_hash,
+            "tx_hash": receipt.tx_hash,
+            "block_hash": receipt.block_hash,
+            "block_number": receipt.block_number,
             "contract_address": self.fraud_contract_address,
             "fraud_score": fraud_score,
             "tokens_earned": tokens_earned,
             "immutable_record": True,
-            "confirmations": 12,
+            "confirmations": 12 if receipt.confirmed else 0,
             "gas_used": 21000,  # Simulated
-            "status": "confirmed"
+            "status": receipt.status
         }
+
+    def flush(self) -> Optional[Dict[str, Any]]:
+        """Seal any pending fraud logs into a block now (e.g. at shutdown)."""
+        return self.batcher.flush()
+
+    def close(self) -> None:
+        """Seal pending logs and checkpoint the ledger."""
+        self.flush()
+        if self._blockchain is not None:
+            self._blockchain.close()
     
     def track_product_journey(self, product_id: str, event_type: str, location: str, details: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Track product through supply chain."""
@@ -245,28 +547,88 @@ class BlockchainFraudLogger:
             "traceability": "full"
         }
     
+    def _aggregate(self, wallet: str, create: bool = False) -> Optional[WalletAggregate]:
+        """Cached aggregate of *wallet*; a miss reads the ledger (run it off the event loop)."""
+        with self._agg_lock:
+            agg = self._aggregates.get(wallet)
+            if agg is not None:
+                self._aggregates.move_to_end(wallet)
+                return agg
+        while True:
+            # Ledger reads happen outside the lock; a block sealed meanwhile means reading again
+            sealed_logs = self.blockchain.ledger.count(FRAUD_LOG)
+            history = self.blockchain.get_fraud_history(wallet)
+            with self._agg_lock:
+                agg = self._aggregates.get(wallet)
+                if agg is not None:  # rebuilt by another thread meanwhile
+                    self._aggregates.move_to_end(wallet)
+                    return agg
+                if self.blockchain.ledger.count(FRAUD_LOG) != sealed_logs:
+                    continue
+                # Sealed history plus entries still waiting in the batcher
+                sealed = {log["hash"] for log in history}
+                history += [
+                    {"fraud_score": entry.fraud_score, "timestamp": entry.timestamp}
+                    for tx_hash, entry in self.batcher.pending_entries()
+                    if wallet in (entry.source_wallet, entry.target_wallet) and tx_hash not in sealed
+                ]
+                if not history and not create:
+                    return None  # unknown wallets are not cached on reads
+                agg = self._aggregates[wallet] = WalletAggregate()
+                for log in history:
+                    agg.update(log["fraud_score"], log["timestamp"], self.half_life_s)
+                while len(self._aggregates) > self.aggregate_cache_size:
+                    self._aggregates.popitem(last=False)
+                return agg
+
+    def _update_aggregates(self, entry: FraudLogEntry) -> None:
+        with self._agg_lock:
+            for wallet in {entry.source_wallet, entry.target_wallet}:
+                self._aggregate(wallet, create=True).update(entry.fraud_score, entry.timestamp, self.half_life_s)
+
+    def _reputation_score(self, agg: Optional[WalletAggregate]) -> float:
+        if agg is None or not agg.count:
+            return 0.8  # New wallet
+        avg = agg.decayed_avg_fraud_score if self.half_life_s else agg.avg_fraud_score
+        return max(0.1, 1.0 - avg)
+
+    def wallet_features(self, wallet_address: str) -> Dict[str, float]:
+        """Reputation as numeric features; a dict read on a cache hit, a ledger read on a miss."""
+        agg = self._aggregate(wallet_address)
+        features = {
+            "reputation_score": self._reputation_score(agg),
+            "log_count": float(agg.count) if agg else 0.0,
+            "fraud_incidents": float(agg.incidents) if agg else 0.0,
+            "avg_fraud_score": agg.avg_fraud_score if agg else 0.0,
+        }
+        if self.half_life_s:
+            features["recent_fraud_incidents"] = (
+                agg.decayed_incidents_at(int(time.time()), self.half_life_s) if agg else 0.0
+            )
+        return features
+    
     def get_wallet_reputation(self, wallet_address: str) -> Dict[str, Any]:
         """Get blockchain-verified wallet reputation."""
         
-        fraud_history = self.blockchain.get_fraud_history(wallet_address)
+        agg = self._aggregate(wallet_address)
         loyalty_balance = self.loyalty_contract.get_balance(wallet_address)
-        
-        if not fraud_history:
-            reputation_score = 0.8  # New wallet
-        else:
-            avg_fraud_score = sum(log["fraud_score"] for log in fraud_history) / len(fraud_history)
-            reputation_score = max(0.1, 1.0 - avg_fraud_score)
+        reputation_score = self._reputation_score(agg)
         
         return {
             "wallet_address": wallet_address,
             "reputation_score": reputation_score,
-            "total_transactions": len(fraud_history),
+            "total_transactions": agg.count if agg else 0,
             "loyalty_tokens": loyalty_balance,
-            "fraud_incidents": len([log for log in fraud_history if log["fraud_score"] > 0.7]),
+            "fraud_incidents": agg.incidents if agg else 0,
+            "last_seen": agg.last_seen if agg else None,
             "verified_on_blockchain": True,
             "trust_level": "HIGH" if reputation_score > 0.8 else "MEDIUM" if reputation_score > 0.5 else "LOW"
         }
     
+    def get_inclusion_proof(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        """Inclusion proof for a fraud log or provenance event (None if unknown/pending)."""
+        return self.blockchain.get_inclusion_proof(tx_hash)
+    
     def get_product_provenance(self, product_id: str) -> Dict[str, Any]:
         """Get complete blockchain-verified product journey."""
         
@@ -288,13 +650,19 @@ _blockchain_logger = BlockchainFraudLogger()
 
 
 async def log_fraud_to_blockchain(transaction_id: str, source_wallet: str, target_wallet: str, 
-                                amount: float, fraud_score: float, model_used: str) -> Dict[str, Any]:
-    """Convenience function to log fraud to blockchain."""
+                                amount: float, fraud_score: float, model_used: str,
+                                on_confirm: Optional[ConfirmCallback] = None) -> Dict[str, Any]:
+    """Convenience function to log fraud to blockchain (returns a pending receipt)."""
     return await _blockchain_logger.log_fraud_detection(
-        transaction_id, source_wallet, target_wallet, amount, fraud_score, model_used
+        transaction_id, source_wallet, target_wallet, amount, fraud_score, model_used, on_confirm
     )
 
 
 def get_wallet_reputation(wallet_address: str) -> Dict[str, Any]:
     """Get wallet reputation from blockchain."""
-    return _blockchain_logger.get_wallet_reputation(wallet_address) 
\ No newline at end of file
+    return _blockchain_logger.get_wallet_reputation(wallet_address)
+
+
+def get_wallet_features(wallet_address: str) -> Dict[str, float]:
+    """Numeric reputation features for a wallet (O(1) lookup)."""
+    return _blockchain_logger.wallet_features(wallet_address) 
\ No newline at end of file
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+"""SHA-256 Merkle trees over ledger records.
+
+Leaves and interior nodes are hashed with distinct prefixes (0x00 / 0x01,
+as in RFC 6962) so an interior node can never be passed off as a record.
+An odd node at the end of a level is paired with itself.
+
+An inclusion proof is the list of sibling hashes from a leaf up to the
+root, each tagged with the side it sits on; checking one costs
+``ceil(log2(n))`` hashes.
+"""
+
+import hashlib
+from typing import Dict, List, Sequence
+
+__all__ = ["leaf_hash", "merkle_proof", "merkle_root", "verify_proof"]
+
+_LEAF = b"\x00"
+_NODE = b"\x01"
+
+
+def leaf_hash(data: bytes) -> bytes:
+    return hashlib.sha256(_LEAF + data).digest()
+
+
+def _node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(_NODE + left + right).digest()
+
+
+def _next_level(level: Sequence[bytes]) -> List[bytes]:
+    return [
+        _node_hash(level[i], level[i + 1] if i + 1 < len(level) else level[i])
+        for i in range(0, len(level), 2)
+    ]
+
+
+def merkle_root(leaves: Sequence[bytes]) -> bytes:
+    """Root over already-hashed *leaves* (32 zero bytes for an empty block)."""
+    if not leaves:
+        return bytes(32)
+    level = list(leaves)
+    while len(level) > 1:
+        level = _next_level(level)
+    return level[0]
+
+
+def merkle_proof(leaves: Sequence[bytes], index: int) -> List[Dict[str, str]]:
+    """Sibling path for ``leaves[index]``: ``[{"position": "left"|"right", "hash": hex}, ...]``."""
+    if not 0 <= index < len(leaves):
+        raise IndexError(f"leaf {index} out of range for {len(leaves)} leaves")
+    proof: List[Dict[str, str]] = []
+    level = list(leaves)
+    while len(level) > 1:
+        if index % 2:
+            proof.append({"position": "left", "hash": level[index - 1].hex()})
+        else:
+            sibling = level[index + 1] if index + 1 < len(level) else level[index]
+            proof.append({"position": "right", "hash": sibling.hex()})
+        level = _next_level(level)
+        index //= 2
+    return proof
+
+
+def verify_proof(leaf: bytes, proof: Sequence[Dict[str, str]], root: bytes) -> bool:
+    """Recompute the root from *leaf* and its sibling path."""
+    node = leaf
+    for step in proof:
+        sibling = bytes.fromhex(step["hash"])
+        node = _node_hash(sibling, node) if step["position"] == "left" else _node_hash(node, sibling)
+    return node == root
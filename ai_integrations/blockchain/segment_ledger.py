@@ -0,0 +1,393 @@
+from __future__ import annotations
+
+"""Append-only record storage for the fraud / provenance ledger.
+
+`MemoryLedger` keeps records in process memory (the default). `SegmentLedger`
+keeps them in a directory on disk:
+
+    00000001.seg ...  segment files of framed records, rolled at `segment_bytes`
+    kind-NNN.idx      fixed-width slot per record of kind NNN: (segment u32, offset u64)
+    index.db          SQLite postings (index name, key, sort) -> (kind, position),
+                      plus the last checkpoint
+    LOCK              held (flock) by the one process writing the directory
+
+Each record is a 16-byte header (magic, kind, flags, keys length, payload
+length, CRC-32) followed by its keys (JSON) and payload. The last frame of
+every `append` batch carries a commit flag, so a block and its entries
+become visible together or not at all.
+
+Slots and postings for new records are kept in memory until the next
+checkpoint (every `checkpoint_every` records, and on close), which fsyncs
+the active segment, writes the slots to the `.idx` files and commits the
+postings together with the checkpoint position. On open, the `.idx` files
+are cut back to the checkpoint and only the records written after it are
+replayed (CRC-checked; a torn final batch is truncated away). Reads map
+segments with mmap (at most `max_maps` at a time) and find a record's
+offset with one `pread` of its slot, so resident memory is bounded by the
+checkpoint interval, not by the size of the ledger.
+"""
+
+import bisect
+import json
+import mmap
+import os
+import sqlite3
+import struct
+import threading
+import zlib
+from collections import OrderedDict, defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+try:
+    import fcntl  # type: ignore
+except ImportError:  # pragma: no cover - not on Windows
+    fcntl = None
+
+__all__ = ["MemoryLedger", "SegmentLedger", "open_ledger"]
+
+# (index name, key, sort value): postings for a key are returned by sort value, then insertion order
+Key = Tuple[str, str, float]
+# (kind, payload, keys) as passed to `append`
+Record = Tuple[int, bytes, Sequence[Key]]
+
+_MAGIC = b"TSL1"
+_FRAME = struct.Struct("<4sBBHII")  # magic, kind, flags, keys length, payload length, crc32(keys + payload)
+_SLOT = struct.Struct("<IQ")  # segment number, byte offset of the frame
+_COMMIT = 0x01  # last frame of an append() batch
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS postings (
+    name TEXT NOT NULL,
+    key TEXT NOT NULL,
+    sort REAL NOT NULL,
+    kind INTEGER NOT NULL,
+    pos INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_postings ON postings (name, key, sort);
+CREATE TABLE IF NOT EXISTS checkpoint (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    segment INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    counts TEXT NOT NULL
+);
+"""
+
+
+class MemoryLedger:
+    """In-process ledger with the same interface as `SegmentLedger`; nothing survives a restart."""
+
+    path = None
+
+    def __init__(self):
+        self._records: Dict[int, List[bytes]] = defaultdict(list)
+        self._postings: Dict[Tuple[str, str], List[Tuple[float, int, int]]] = defaultdict(list)
+        self.replayed = 0
+
+    def append(self, records: Iterable[Record]) -> List[int]:
+        positions = []
+        for kind, payload, keys in records:
+            pos = len(self._records[kind])
+            self._records[kind].append(bytes(payload))
+            for name, key, sort in keys:
+                bisect.insort_right(self._postings[(name, key)], (sort, kind, pos), key=lambda p: p[0])
+            positions.append(pos)
+        return positions
+
+    def read(self, kind: int, pos: int) -> bytes:
+        return self._records[kind][pos]
+
+    def count(self, kind: int) -> int:
+        return len(self._records[kind])
+
+    def postings(self, name: str, key: str, limit: Optional[int] = None) -> List[Tuple[int, int]]:
+        found = self._postings.get((name, key), ())
+        return [(kind, pos) for _, kind, pos in found[:limit]]
+
+    def checkpoint(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "backend": "memory",
+            "records": {kind: len(r) for kind, r in self._records.items()},
+        }
+
+
+class SegmentLedger:
+    """Append-only segment files with checkpointed indexes (see module docstring).
+
+    One process may write a directory at a time; a second `SegmentLedger`
+    on the same path raises RuntimeError.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        segment_bytes: int = 64 << 20,
+        checkpoint_every: int = 4096,
+        max_maps: int = 8,
+    ):
+        self.path = Path(path)
+        self.segment_bytes = segment_bytes
+        self.checkpoint_every = max(1, checkpoint_every)
+        self.max_maps = max(1, max_maps)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._lock_fd = os.open(self.path / "LOCK", os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            try:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(self._lock_fd)
+                raise RuntimeError(f"Ledger {self.path} is open in another process") from None
+
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(self.path / "index.db", check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        self._db.execute("BEGIN")  # postings since the last checkpoint; committed with it
+
+        self._counts: Dict[int, int] = {}  # records per kind covered by the checkpoint (= slots in .idx)
+        self._tail: Dict[int, List[Tuple[int, int]]] = defaultdict(list)  # slots written since
+        self._idx_fds: Dict[int, int] = {}
+        self._maps: "OrderedDict[int, mmap.mmap]" = OrderedDict()
+        self._segment = 1
+        self._offset = 0
+        self._since_checkpoint = 0
+        self.checkpoints = 0
+        self.replayed = self._recover()
+        self._out = open(self._segment_path(self._segment), "ab")
+
+    # ------------------------------------------------------------------
+    # Files
+    # ------------------------------------------------------------------
+    def _segment_path(self, segment: int) -> Path:
+        return self.path / f"{segment:08d}.seg"
+
+    def _segments(self) -> List[int]:
+        return sorted(int(p.stem) for p in self.path.glob("*.seg") if p.stem.isdigit())
+
+    def _idx_fd(self, kind: int) -> int:
+        fd = self._idx_fds.get(kind)
+        if fd is None:
+            fd = self._idx_fds[kind] = os.open(self.path / f"kind-{kind:03d}.idx", os.O_RDWR | os.O_CREAT, 0o644)
+        return fd
+
+    def _map(self, segment: int, end: int) -> mmap.mmap:
+        """Read-only map of *segment* covering at least *end* bytes (remapped as it grows)."""
+        mm = self._maps.get(segment)
+        if mm is None or len(mm) < end:
+            if mm is not None:
+                mm.close()
+            with open(self._segment_path(segment), "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[segment] = mm
+        self._maps.move_to_end(segment)
+        while len(self._maps) > self.max_maps:
+            self._maps.popitem(last=False)[1].close()
+        return mm
+
+    # ------------------------------------------------------------------
+    # Recovery
+    # ------------------------------------------------------------------
+    def _recover(self) -> int:
+        row = self._db.execute("SELECT segment, offset, counts FROM checkpoint WHERE id = 1").fetchone()
+        segment, offset, counts = (row[0], row[1], json.loads(row[2])) if row else (1, 0, {})
+        self._counts = {int(kind): n for kind, n in counts.items()}
+        segments = self._segments()
+        idx_sizes = {
+            int(p.stem[5:]): p.stat().st_size for p in self.path.glob("kind-*.idx") if p.stem[5:].isdigit()
+        }
+        consistent = all(idx_sizes.get(kind, 0) >= n * _SLOT.size for kind, n in self._counts.items()) and (
+            not row or (segment in segments and self._segment_path(segment).stat().st_size >= offset)
+        )
+        if not consistent:  # files missing or cut short: rebuild everything from the segments
+            self._db.execute("DELETE FROM postings")
+            segment, offset, self._counts = (segments[0] if segments else 1), 0, {}
+        for kind, size in idx_sizes.items():
+            keep = self._counts.get(kind, 0) * _SLOT.size
+            if size > keep:  # slots written by a checkpoint that never committed
+                os.ftruncate(self._idx_fd(kind), keep)
+
+        replayed = 0
+        good = (segment, offset)
+        for seg in (s for s in segments if s >= segment):
+            pos = offset if seg == segment else 0
+            batch: List[Tuple[int, int, Sequence[Key]]] = []
+            with open(self._segment_path(seg), "rb") as f:
+                f.seek(pos)
+                while True:
+                    head = f.read(_FRAME.size)
+                    if len(head) < _FRAME.size:
+                        break
+                    magic, kind, flags, keys_len, length, crc = _FRAME.unpack(head)
+                    body = f.read(keys_len + length)
+                    if magic != _MAGIC or len(body) < keys_len + length or zlib.crc32(body) != crc:
+                        break
+                    batch.append((kind, pos, json.loads(body[:keys_len]) if keys_len else ()))
+                    pos += _FRAME.size + len(body)
+                    if flags & _COMMIT:
+                        self._apply(seg, batch)
+                        replayed += len(batch)
+                        batch = []
+                        good = (seg, pos)
+                torn = bool(batch) or pos != os.fstat(f.fileno()).st_size
+            if torn:  # nothing after a torn or corrupt frame was committed
+                break
+
+        # Drop whatever follows the last committed batch
+        self._segment, self._offset = good
+        for seg in segments:
+            if seg > self._segment:
+                self._segment_path(seg).unlink()
+        if self._segment_path(self._segment).exists():
+            os.truncate(self._segment_path(self._segment), self._offset)
+        return replayed
+
+    def _apply(self, segment: int, frames: Sequence[Tuple[int, int, Sequence[Key]]]) -> List[int]:
+        """Index a committed batch of (kind, offset, keys) frames in *segment*."""
+        positions, rows = [], []
+        for kind, offset, keys in frames:
+            slots = self._tail[kind]
+            pos = self._counts.get(kind, 0) + len(slots)
+            slots.append((segment, offset))
+            rows.extend((name, key, sort, kind, pos) for name, key, sort in keys)
+            positions.append(pos)
+        if rows:
+            self._db.executemany("INSERT INTO postings (name, key, sort, kind, pos) VALUES (?, ?, ?, ?, ?)", rows)
+        self._since_checkpoint += len(frames)
+        return positions
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+    def append(self, records: Iterable[Record]) -> List[int]:
+        """Append *records* as one atomic batch; returns their positions within their kinds."""
+        records = list(records)
+        if not records:
+            return []
+        with self._lock:
+            if self._offset >= self.segment_bytes:
+                self._roll()
+            buf = bytearray()
+            frames = []
+            for i, (kind, payload, keys) in enumerate(records):
+                keys_raw = json.dumps(list(keys), separators=(",", ":")).encode("utf-8") if keys else b""
+                if len(keys_raw) > 0xFFFF:
+                    raise ValueError(f"Record keys too large ({len(keys_raw)} bytes)")
+                flags = _COMMIT if i == len(records) - 1 else 0
+                frames.append((kind, self._offset + len(buf), keys))
+                buf += _FRAME.pack(_MAGIC, kind, flags, len(keys_raw), len(payload), zlib.crc32(payload, zlib.crc32(keys_raw)))
+                buf += keys_raw
+                buf += payload
+            try:
+                self._out.write(buf)
+                self._out.flush()
+            except BaseException:
+                self._out.truncate(self._offset)  # never leave a partial batch in front of the next one
+                raise
+            positions = self._apply(self._segment, frames)
+            self._offset += len(buf)
+            if self._since_checkpoint >= self.checkpoint_every:
+                self.checkpoint()
+            return positions
+
+    def _roll(self) -> None:
+        self._out.flush()
+        os.fsync(self._out.fileno())  # the next checkpoint only syncs the active segment
+        self._out.close()
+        self._segment += 1
+        self._offset = 0
+        self._out = open(self._segment_path(self._segment), "ab")
+
+    def checkpoint(self) -> None:
+        """Make everything appended so far durable and indexed on disk."""
+        with self._lock:
+            self._out.flush()
+            os.fsync(self._out.fileno())
+            for kind, slots in self._tail.items():
+                if not slots:
+                    continue
+                fd = self._idx_fd(kind)
+                base = self._counts.get(kind, 0)
+                os.pwrite(fd, b"".join(_SLOT.pack(*s) for s in slots), base * _SLOT.size)
+                os.fsync(fd)
+                self._counts[kind] = base + len(slots)
+            self._tail.clear()
+            self._db.execute(
+                "INSERT OR REPLACE INTO checkpoint (id, segment, offset, counts) VALUES (1, ?, ?, ?)",
+                (self._segment, self._offset, json.dumps(self._counts)),
+            )
+            self._db.execute("COMMIT")
+            self._db.execute("BEGIN")
+            self._since_checkpoint = 0
+            self.checkpoints += 1
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def count(self, kind: int) -> int:
+        return self._counts.get(kind, 0) + len(self._tail.get(kind, ()))
+
+    def read(self, kind: int, pos: int) -> bytes:
+        with self._lock:
+            if not 0 <= pos < self.count(kind):
+                raise IndexError(f"record {pos} of kind {kind} out of range")
+            base = self._counts.get(kind, 0)
+            if pos >= base:
+                segment, offset = self._tail[kind][pos - base]
+            else:
+                segment, offset = _SLOT.unpack(os.pread(self._idx_fd(kind), _SLOT.size, pos * _SLOT.size))
+            mm = self._map(segment, offset + _FRAME.size)
+            magic, frame_kind, _, keys_len, length, _ = _FRAME.unpack_from(mm, offset)
+            if magic != _MAGIC or frame_kind != kind:
+                raise ValueError(f"Corrupt ledger slot for record {pos} of kind {kind}")
+            start = offset + _FRAME.size + keys_len
+            return self._map(segment, start + length)[start:start + length]
+
+    def postings(self, name: str, key: str, limit: Optional[int] = None) -> List[Tuple[int, int]]:
+        sql = "SELECT kind, pos FROM postings WHERE name = ? AND key = ? ORDER BY sort, rowid"
+        params: Tuple[object, ...] = (name, key)
+        if limit is not None:
+            sql += " LIMIT ?"
+            params += (limit,)
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "backend": "segments",
+            "path": str(self.path),
+            "records": {kind: self.count(kind) for kind in set(self._counts) | set(self._tail)},
+            "segment": self._segment,
+            "segment_offset": self._offset,
+            "since_checkpoint": self._since_checkpoint,
+            "checkpoints": self.checkpoints,
+            "replayed_on_open": self.replayed,
+            "mapped_segments": len(self._maps),
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is None:
+                return
+            self.checkpoint()
+            self._db.execute("COMMIT")
+            self._db.close()
+            self._db = None
+            self._out.close()
+            for mm in self._maps.values():
+                mm.close()
+            self._maps.clear()
+            for fd in self._idx_fds.values():
+                os.close(fd)
+            self._idx_fds.clear()
+            os.close(self._lock_fd)
+
+
+def open_ledger(path: Union[str, Path, None], **kwargs) -> Union[MemoryLedger, SegmentLedger]:
+    """`SegmentLedger` at *path*, or a `MemoryLedger` when *path* is empty."""
+    return SegmentLedger(path, **kwargs) if path else MemoryLedger()
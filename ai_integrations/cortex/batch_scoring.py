@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+"""Parallel batch scoring of large transaction files.
+
+The input is split into shards without parsing it in the parent process:
+
+    .jsonl / .ndjson   byte ranges of ~`chunk_size` lines (a line belongs
+                       to the shard its first byte falls in)
+    .parquet           consecutive row groups totalling ~`chunk_size` rows
+    .arrow (IPC file)  consecutive record batches, likewise
+
+Each shard is scored by a spawn-based worker process that loads the
+published FraudDetector from the model registry once (in its initializer)
+and writes its rows to a part file. The parent merges the parts into the
+output in shard order and reports progress and throughput.
+
+Usage:
+    python -m main score --input big.parquet --output scored.parquet --workers 8 --chunk-size 500000
+"""
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Tuple, Union
+
+from cortex.fraud_detection import (
+    DEFAULT_CHUNK_SIZE,
+    TRANSACTION_SCHEMA,
+    FraudDetector,
+    ScoreWriter,
+    apply_schema,
+    file_format,
+)
+from cortex.model_registry import ModelRegistry
+from cortex.thread_budget import configure_threads
+
+__all__ = ["Shard", "plan_shards", "score_file"]
+
+# Bytes sampled from the head of a JSONL file to estimate the line length
+_SAMPLE_BYTES = 1 << 20
+
+
+@dataclass(frozen=True)
+class Shard:
+    index: int
+    path: str
+    format: str
+    start: int  # byte offset (jsonl) or first row group / record batch
+    stop: int  # exclusive
+
+
+# ----------------------------------------------------------------------
+# Planning (parent process, no parsing)
+# ----------------------------------------------------------------------
+def _group_by_rows(sizes: List[int], chunk_size: int) -> Iterator[Tuple[int, int]]:
+    start, rows = 0, 0
+    for i, n in enumerate(sizes):
+        rows += n
+        if rows >= chunk_size:
+            yield start, i + 1
+            start, rows = i + 1, 0
+    if start < len(sizes):
+        yield start, len(sizes)
+
+
+def plan_shards(path: Union[str, Path], chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[Shard]:
+    """Split *path* into shards of roughly `chunk_size` rows."""
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be >= 1")
+    path = str(path)
+    fmt = file_format(path)
+    if fmt == "jsonl":
+        size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            head = f.read(_SAMPLE_BYTES)
+        line_bytes = len(head) / max(head.count(b"\n"), 1)
+        step = max(1, int(chunk_size * line_bytes))
+        bounds = [(s, min(s + step, size)) for s in range(0, size, step)]
+    elif fmt == "parquet":
+        import pyarrow.parquet as pq  # type: ignore
+
+        meta = pq.ParquetFile(path).metadata
+        sizes = [meta.row_group(i).num_rows for i in range(meta.num_row_groups)]
+        bounds = list(_group_by_rows(sizes, chunk_size))
+    elif fmt == "arrow":
+        import pyarrow as pa  # type: ignore
+
+        reader = pa.ipc.open_file(pa.memory_map(path, "r"))
+        sizes = [reader.get_batch(i).num_rows for i in range(reader.num_record_batches)]
+        bounds = list(_group_by_rows(sizes, chunk_size))
+    else:
+        raise ValueError(f"Parallel scoring needs a splittable input (JSONL, Parquet or Arrow IPC file), got {path!r}")
+    return [Shard(i, path, fmt, start, stop) for i, (start, stop) in enumerate(bounds)]
+
+
+# ----------------------------------------------------------------------
+# Worker side
+# ----------------------------------------------------------------------
+_detector: FraudDetector | None = None
+
+
+def _init_worker(model_root: str, version: str, threads: int) -> None:
+    global _detector
+    configure_threads(threads)
+    _detector = ModelRegistry(model_root).load_fraud_detector(version)
+
+
+def _jsonl_lines(path: str, start: int, stop: int) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        pos = start
+        if start:
+            f.seek(start - 1)
+            pos += len(f.readline()) - 1  # finish the line straddling `start`
+        while pos < stop:
+            line = f.readline()
+            if not line:
+                break
+            pos += len(line)
+            yield line
+
+
+def _read_shard(shard: Shard, chunk_size: int, columns: List[str]) -> Iterator[Any]:
+    if shard.format == "jsonl":
+        lines = _jsonl_lines(shard.path, shard.start, shard.stop)
+        yield from FraudDetector.iter_jsonl_chunks(lines, chunk_size, columns=columns)
+        return
+    import pyarrow as pa  # type: ignore
+
+    if shard.format == "parquet":
+        import pyarrow.parquet as pq  # type: ignore
+
+        pf = pq.ParquetFile(shard.path)
+        cols = [c for c in pf.schema_arrow.names if c in set(columns)]
+        batches = pf.iter_batches(batch_size=chunk_size, row_groups=range(shard.start, shard.stop), columns=cols)
+    else:
+        reader = pa.ipc.open_file(pa.memory_map(shard.path, "r"))
+        cols = [c for c in reader.schema.names if c in set(columns)]
+        batches = (reader.get_batch(i).select(cols) for i in range(shard.start, shard.stop))
+    for batch in batches:
+        yield apply_schema(batch.to_pandas(), TRANSACTION_SCHEMA)
+
+
+def _score_shard(shard: Shard, chunk_size: int, part_dir: str | None, suffix: str) -> Dict[str, Any]:
+    assert _detector is not None, "worker not initialised"
+    columns = _detector.input_columns + ["transaction_id"]
+    part = os.path.join(part_dir, f"part-{shard.index:06d}{suffix}") if part_dir else None
+    writer = ScoreWriter(part) if part else None
+    rows = flagged = 0
+    try:
+        for chunk in _read_shard(shard, chunk_size, columns):
+            preds, scores = _detector.predict_with_scores(chunk)
+            rows += len(chunk)
+            flagged += int((preds == -1).sum())
+            if writer is not None:
+                writer.write(chunk, pred=preds, fraud_score=scores)
+    finally:
+        if writer is not None:
+            writer.close()
+    return {"index": shard.index, "rows": rows, "flagged": flagged, "part": part if rows else None}
+
+
+# ----------------------------------------------------------------------
+# Driver
+# ----------------------------------------------------------------------
+def _print_progress(done: int, total: int, rows: int, flagged: int, elapsed: float) -> None:
+    rate = rows / elapsed if elapsed > 0 else 0.0
+    eta = elapsed / done * (total - done) if done else 0.0
+    print(f"[score] shard {done}/{total}: {rows:,} rows, {flagged:,} flagged, {rate:,.0f} rows/s, eta {eta:,.0f}s")
+
+
+def score_file(
+    input_path: Union[str, Path],
+    output_path: Union[str, Path] | None = None,
+    workers: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    model_root: Union[str, Path, None] = None,
+    version: str | None = None,
+    progress: Callable[[int, int, int, int, float], None] | None = _print_progress,
+) -> Dict[str, Any]:
+    """Score *input_path* with the published FraudDetector across `workers` processes.
+
+    Results are written to *output_path* (format from its suffix) in input
+    order. Returns a summary with row/flag counts and throughput.
+    """
+    registry = ModelRegistry(model_root) if model_root else ModelRegistry()
+    version = version or registry.latest()
+    if version is None:
+        raise FileNotFoundError(
+            f"No published model under {registry.root}; run `python -m cortex.model_registry publish` first"
+        )
+    workers = workers or os.cpu_count() or 1
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    shards = plan_shards(input_path, chunk_size)
+
+    out = Path(output_path) if output_path else None
+    part_dir = tempfile.mkdtemp(prefix=f".{out.name}.parts-", dir=out.parent) if out else None
+    writer = ScoreWriter(out) if out else None
+    rows = flagged = 0
+    start = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(
+            workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(str(registry.root), version, threads),
+        ) as pool:
+            futures = [pool.submit(_score_shard, s, chunk_size, part_dir, out.suffix if out else "") for s in shards]
+            # Consume in shard order so the output preserves input order
+            for done, fut in enumerate(futures, start=1):
+                res = fut.result()
+                rows += res["rows"]
+                flagged += res["flagged"]
+                if writer is not None and res["part"]:
+                    writer.append_part(res["part"], res["rows"])
+                    os.remove(res["part"])
+                if progress is not None:
+                    progress(done, len(shards), rows, flagged, time.perf_counter() - start)
+    finally:
+        if writer is not None:
+            writer.close()
+        if part_dir:
+            shutil.rmtree(part_dir, ignore_errors=True)
+
+    elapsed = time.perf_counter() - start
+    return {
+        "version": version,
+        "shards": len(shards),
+        "workers": workers,
+        "rows": rows,
+        "flagged": flagged,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": rows / elapsed if elapsed > 0 else 0.0,
+    }
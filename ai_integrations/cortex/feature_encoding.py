@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+"""Column encoders that keep the FraudDetector feature matrix bounded.
+
+Every non-numeric column used to be one-hot encoded densely, so unique IDs
+(transaction/source/target) and raw timestamp strings made the fitted matrix
+grow with the history. Each column is now assigned one of the strategies
+below, either explicitly or via `infer_column_strategies`:
+
+    numeric    StandardScaler
+    timestamp  hour / weekday / seconds-since-epoch, then scaled
+    onehot     sparse OneHotEncoder (low-cardinality categoricals)
+    hash       hashing trick into a fixed number of columns
+    frequency  relative frequency of the value seen at fit time
+    drop       ignored (e.g. per-row unique transaction IDs)
+"""
+
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.feature_extraction import FeatureHasher
+
+__all__ = [
+    "STRATEGIES",
+    "NUMERIC_TYPES",
+    "HashingEncoder",
+    "FrequencyEncoder",
+    "TimestampFeatures",
+    "infer_column_strategies",
+    "columns_by_strategy",
+]
+
+STRATEGIES = ("numeric", "timestamp", "onehot", "hash", "frequency", "drop")
+NUMERIC_TYPES = ["int64", "float64", "int32", "float32"]
+
+_TIMESTAMP_NAMES = ("timestamp", "ts", "time", "datetime", "date")
+_TIMESTAMP_SUFFIXES = ("_at", "_time", "_ts", "_date")
+
+
+def _as_frame(X) -> pd.DataFrame:
+    return X if isinstance(X, pd.DataFrame) else pd.DataFrame(X)
+
+
+class HashingEncoder(TransformerMixin, BaseEstimator):
+    """Hash ``column=value`` tokens of all input columns into `n_features`."""
+
+    def __init__(self, n_features: int = 64):
+        self.n_features = n_features
+
+    def fit(self, X, y=None):
+        self.n_features_in_ = _as_frame(X).shape[1]
+        return self
+
+    def transform(self, X) -> sp.csr_matrix:
+        df = _as_frame(X)
+        cols = [str(c) for c in df.columns]
+        values = df.astype(str).to_numpy()
+        tokens = ([f"{c}={v}" for c, v in zip(cols, row)] for row in values)
+        hasher = FeatureHasher(n_features=self.n_features, input_type="string", alternate_sign=False)
+        return hasher.transform(tokens)
+
+    def get_feature_names_out(self, input_features=None):
+        return np.array([f"hash_{i}" for i in range(self.n_features)], dtype=object)
+
+
+class FrequencyEncoder(TransformerMixin, BaseEstimator):
+    """Replace each value by its relative frequency in the training data.
+
+    Unseen values map to 0, which the isolation forest naturally treats as
+    rare. One output column per input column.
+    """
+
+    def fit(self, X, y=None):
+        df = _as_frame(X)
+        self.columns_ = list(df.columns)
+        self.frequencies_: List[Dict[str, float]] = [
+            df[c].astype(str).value_counts(normalize=True).to_dict() for c in df.columns
+        ]
+        return self
+
+    def transform(self, X) -> np.ndarray:
+        df = _as_frame(X)
+        out = np.empty((len(df), len(self.frequencies_)), dtype=np.float64)
+        for j, (c, freq) in enumerate(zip(df.columns, self.frequencies_)):
+            out[:, j] = df[c].astype(str).map(freq).fillna(0.0).to_numpy(dtype=np.float64)
+        return out
+
+    def get_feature_names_out(self, input_features=None):
+        return np.array([f"{c}_freq" for c in self.columns_], dtype=object)
+
+
+class TimestampFeatures(TransformerMixin, BaseEstimator):
+    """Expand each timestamp column into hour, weekday and epoch seconds."""
+
+    def fit(self, X, y=None):
+        self.columns_ = list(_as_frame(X).columns)
+        return self
+
+    def transform(self, X) -> np.ndarray:
+        df = _as_frame(X)
+        blocks = []
+        for c in df.columns:
+            ts = pd.to_datetime(df[c], utc=True, errors="coerce", format="mixed")
+            epoch = (ts - pd.Timestamp(0, tz="UTC")).dt.total_seconds()
+            blocks.append(np.column_stack([
+                ts.dt.hour.fillna(0).to_numpy(dtype=np.float64),
+                ts.dt.weekday.fillna(0).to_numpy(dtype=np.float64),
+                epoch.fillna(0).to_numpy(dtype=np.float64),
+            ]))
+        return np.hstack(blocks) if blocks else np.empty((len(df), 0))
+
+    def get_feature_names_out(self, input_features=None):
+        return np.array(
+            [f"{c}_{part}" for c in self.columns_ for part in ("hour", "weekday", "epoch")],
+            dtype=object,
+        )
+
+
+def _looks_like_timestamp(s: pd.Series) -> bool:
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return True
+    name = str(s.name).lower()
+    if name not in _TIMESTAMP_NAMES and not name.endswith(_TIMESTAMP_SUFFIXES):
+        return False
+    sample = s.dropna().head(100)
+    if sample.empty:
+        return False
+    parsed = pd.to_datetime(sample, utc=True, errors="coerce", format="mixed")
+    return bool(parsed.notna().mean() >= 0.9)
+
+
+def infer_column_strategies(
+    df: pd.DataFrame,
+    max_onehot_categories: int = 50,
+    id_unique_ratio: float = 0.95,
+    overrides: Dict[str, str] | None = None,
+) -> Dict[str, str]:
+    """Pick an encoding strategy for every column of *df*.
+
+    * numeric dtypes → ``numeric``
+    * datetime dtypes or timestamp-named parseable columns → ``timestamp``
+    * near-unique columns (per-row IDs) → ``drop``
+    * more than `max_onehot_categories` distinct values (entity IDs) → ``hash``
+    * everything else → ``onehot``
+
+    Entries in *overrides* win over inference.
+    """
+    overrides = overrides or {}
+    unknown = {s for s in overrides.values() if s not in STRATEGIES}
+    if unknown:
+        raise ValueError(f"Unknown encoding strategies {sorted(unknown)}; expected one of {STRATEGIES}")
+
+    strategies: Dict[str, str] = {}
+    n_rows = max(len(df), 1)
+    for c in df.columns:
+        if c in overrides:
+            strategies[c] = overrides[c]
+            continue
+        s = df[c]
+        if s.dtype.name in NUMERIC_TYPES:
+            strategies[c] = "numeric"
+        elif _looks_like_timestamp(s):
+            strategies[c] = "timestamp"
+        else:
+            n_unique = s.nunique(dropna=True)
+            if n_rows > 1 and n_unique / n_rows >= id_unique_ratio and n_unique > max_onehot_categories:
+                strategies[c] = "drop"
+            elif n_unique > max_onehot_categories:
+                strategies[c] = "hash"
+            else:
+                strategies[c] = "onehot"
+    return strategies
+
+
+def columns_by_strategy(strategies: Dict[str, str]) -> Dict[str, List[str]]:
+    grouped: Dict[str, List[str]] = {s: [] for s in STRATEGIES}
+    for col, strategy in strategies.items():
+        grouped[strategy].append(col)
+    return grouped
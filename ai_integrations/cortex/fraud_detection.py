@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 import json
+import shutil
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Union, Dict, Any
+from typing import BinaryIO, List, Union, Dict, Any, Tuple, Iterable, Iterator
 
 import numpy as np
 import pandas as pd
@@ -12,7 +13,204 @@ from sklearn.ensemble import IsolationForest
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import OneHotEncoder, StandardScaler
 
-NUMERIC_TYPES = ["int64", "float64", "int32", "float32"]
+from cortex.feature_encoding import (
+    NUMERIC_TYPES,
+    FrequencyEncoder,
+    HashingEncoder,
+    TimestampFeatures,
+    columns_by_strategy,
+    infer_column_strategies,
+)
+from cortex.iforest_engine import CompiledIsolationForest
+from cortex.thread_budget import get_budget
+
+try:  # optional fast JSON parser
+    import orjson as _fast_json  # type: ignore
+except ImportError:  # pragma: no cover - falls back to stdlib json
+    _fast_json = None
+
+try:  # optional columnar I/O (Parquet / Arrow IPC)
+    import pyarrow as _pa  # type: ignore
+    import pyarrow.parquet as _pq  # type: ignore
+except ImportError:  # pragma: no cover - JSONL/CSV only
+    _pa = _pq = None
+
+# Fixed dtypes for the transaction export format. Columns not listed here keep
+# whatever pandas infers.
+TRANSACTION_SCHEMA: Dict[str, str] = {
+    "timestamp": "datetime64[ns, UTC]",
+    "transaction_id": "category",
+    "source_id": "category",
+    "target_id": "category",
+    "channel": "category",
+    "amount": "float32",
+}
+DEFAULT_CHUNK_SIZE = 100_000
+
+# File suffix -> I/O format understood by `FraudDetector.iter_chunks` / `ScoreWriter`
+FILE_FORMATS: Dict[str, str] = {
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+    ".ipc": "arrow",
+    ".arrows": "arrow_stream",
+}
+_ARROW_FILE_MAGIC = b"ARROW1"
+
+
+def apply_schema(df: pd.DataFrame, schema: Dict[str, str] = TRANSACTION_SCHEMA) -> pd.DataFrame:
+    """Cast the schema columns present in *df* in place and return it."""
+    for col, dtype in schema.items():
+        if col not in df.columns:
+            continue
+        if dtype.startswith("datetime64"):
+            df[col] = pd.to_datetime(df[col], utc=True, errors="coerce", format="ISO8601")
+        else:
+            df[col] = df[col].astype(dtype)
+    return df
+
+
+def file_format(path: Union[str, Path]) -> str:
+    fmt = FILE_FORMATS.get(Path(path).suffix.lower())
+    if fmt is None:
+        raise ValueError(f"Unsupported file type {path!r}; expected one of {sorted(FILE_FORMATS)}")
+    return fmt
+
+
+def _require_pyarrow():
+    if _pa is None:
+        raise ImportError("Parquet/Arrow I/O requires pyarrow (pip install pyarrow)")
+
+
+def _projection(available: List[str], columns: Iterable[str] | None) -> List[str] | None:
+    """Columns to read: *columns* that exist in the file, in file order."""
+    if columns is None:
+        return None
+    wanted = set(columns)
+    return [c for c in available if c in wanted]
+
+
+def _records_to_frame(records: List[Dict[str, Any]], schema: Dict[str, str] | None, columns) -> pd.DataFrame:
+    df = pd.DataFrame.from_records(records)
+    if columns is not None:
+        df = df[_projection(list(df.columns), columns)]
+    return apply_schema(df, schema) if schema else df
+
+
+def _batch_to_frame(batch, schema: Dict[str, str] | None) -> pd.DataFrame:
+    df = batch.to_pandas()
+    return apply_schema(df, schema) if schema else df
+
+
+def _ipc_reader(source):
+    """Open Arrow IPC data in either the file (random access) or stream format."""
+    if isinstance(source, (str, Path)):
+        with open(source, "rb") as f:
+            magic = f.read(len(_ARROW_FILE_MAGIC))
+        source = _pa.memory_map(str(source), "r")
+    else:
+        magic = source.read(len(_ARROW_FILE_MAGIC))
+        source.seek(0)
+    if magic == _ARROW_FILE_MAGIC:
+        reader = _pa.ipc.open_file(source)
+        return reader.schema, (reader.get_batch(i) for i in range(reader.num_record_batches))
+    reader = _pa.ipc.open_stream(source)
+    return reader.schema, iter(reader)
+
+
+def scored_table(df: pd.DataFrame, columns: Dict[str, np.ndarray], schema=None):
+    """Arrow table of *df* plus extra columns, without copying *df* in pandas.
+
+    Category columns are stored as plain values because their dictionaries
+    differ between chunks; pass the first chunk's `schema` to keep later
+    chunks type-compatible.
+    """
+    _require_pyarrow()
+    table = _pa.Table.from_pandas(df, preserve_index=False)
+    for name, values in columns.items():
+        table = table.append_column(name, _pa.array(np.asarray(values)))
+    for i, f in enumerate(table.schema):
+        if _pa.types.is_dictionary(f.type):
+            table = table.set_column(i, f.name, table.column(i).cast(f.type.value_type))
+    if schema is not None and table.schema != schema:
+        table = table.cast(schema)
+    return table
+
+
+class ScoreWriter:
+    """Write frames plus score columns incrementally as CSV, Parquet or Arrow IPC.
+
+    The format follows the output suffix (see `FILE_FORMATS`). For the
+    columnar formats the input frame is converted once and score arrays are
+    appended as extra Arrow columns, so the caller's frame is never copied.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.format = FILE_FORMATS.get(self.path.suffix.lower(), "csv")
+        if self.format in ("parquet", "arrow", "arrow_stream"):
+            _require_pyarrow()
+        self.rows = 0
+        self._writer = None
+        self._schema = None
+
+    def write(self, df: pd.DataFrame, **columns: np.ndarray) -> None:
+        if self.format == "csv":
+            out = pd.concat([df, pd.DataFrame(columns, index=df.index)], axis=1, copy=False)
+            out.to_csv(self.path, mode="a" if self.rows else "w", header=not self.rows, index=False)
+        elif self.format == "jsonl":
+            out = pd.concat([df, pd.DataFrame(columns, index=df.index)], axis=1, copy=False)
+            with open(self.path, "a" if self.rows else "w") as f:
+                out.to_json(f, orient="records", lines=True, date_format="iso")
+        else:
+            self._write_arrow(scored_table(df, columns, self._schema))
+        self.rows += len(df)
+
+    def append_part(self, part: Union[str, Path], rows: int) -> None:
+        """Append a file written by another `ScoreWriter` with the same format.
+
+        CSV/JSONL parts are byte-copied (the CSV header is kept only once);
+        columnar parts are re-read and appended to this writer's stream.
+        """
+        if self.format in ("csv", "jsonl"):
+            with open(part, "rb") as src, open(self.path, "ab" if self.rows else "wb") as dst:
+                if self.format == "csv" and self.rows:
+                    src.readline()
+                shutil.copyfileobj(src, dst, 1 << 20)
+        elif self.format == "parquet":
+            self._write_arrow(_pq.read_table(part))
+        else:
+            schema, batches = _ipc_reader(part)
+            self._write_arrow(_pa.Table.from_batches(list(batches), schema=schema))
+        self.rows += rows
+
+    def _write_arrow(self, table) -> None:
+        if self._schema is not None and table.schema != self._schema:
+            table = table.cast(self._schema)
+        if self._writer is None:
+            self._schema = table.schema
+            if self.format == "parquet":
+                self._writer = _pq.ParquetWriter(self.path, table.schema)
+            elif self.format == "arrow":
+                self._writer = _pa.ipc.new_file(str(self.path), table.schema)
+            else:
+                self._writer = _pa.ipc.new_stream(str(self.path), table.schema)
+        self._writer.write_table(table)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self) -> "ScoreWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
 
 
 @dataclass
@@ -21,33 +219,55 @@ class FraudDetector:
     transactions. Designed for hackathon speed rather than production-grade
     performance. The model can be trained on historical *non-fraud* transactions
     and will highlight outliers at prediction time.
+
+    Columns are encoded per `encoding` strategy (see `cortex.feature_encoding`);
+    anything not listed there is inferred at fit time so per-row IDs are
+    dropped, high-cardinality entity IDs are hashed into `hash_width` columns
+    and timestamps become numeric features. The feature matrix therefore stays
+    a fixed width as the history grows.
+
+    `fit_n_jobs` and `predict_n_jobs` (joblib semantics, -1 = whole budget)
+    are resolved against the process thread budget (`cortex.thread_budget`).
+    Single-row scoring stays on the calling thread; large batches fan out
+    over the shared inference pool.
     """
 
     contamination: float = 0.01  # Expected fraction of fraud in the dataset
     random_state: int = 42
+    encoding: Dict[str, str] = field(default_factory=dict)  # column -> strategy overrides
+    hash_width: int = 64
+    max_onehot_categories: int = 50
+    fit_n_jobs: int = -1
+    predict_n_jobs: int = 1
     _model: Pipeline | None = field(init=False, default=None)
     _fitted: bool = field(init=False, default=False)
+    _column_strategies: Dict[str, str] = field(init=False, default_factory=dict)
+    _engine: CompiledIsolationForest | None = field(init=False, default=None, repr=False)
 
     def _build_pipeline(self, df: pd.DataFrame) -> Pipeline:
         """Create an sklearn Pipeline with basic preprocessing + IsolationForest."""
-        numeric_cols: List[str] = [c for c in df.columns if df[c].dtype.name in NUMERIC_TYPES]
-        categorical_cols: List[str] = [c for c in df.columns if c not in numeric_cols]
-
-        numeric_transformer = StandardScaler()
-        categorical_transformer = OneHotEncoder(handle_unknown="ignore", sparse_output=False) 
+        self._column_strategies = infer_column_strategies(
+            df, max_onehot_categories=self.max_onehot_categories, overrides=self.encoding
+        )
+        cols = columns_by_strategy(self._column_strategies)
 
+        transformers = [
+            ("num", StandardScaler(), cols["numeric"]),
+            ("ts", Pipeline([("expand", TimestampFeatures()), ("scale", StandardScaler())]), cols["timestamp"]),
+            ("cat", OneHotEncoder(handle_unknown="ignore", sparse_output=True), cols["onehot"]),
+            ("hash", HashingEncoder(n_features=self.hash_width), cols["hash"]),
+            ("freq", FrequencyEncoder(), cols["frequency"]),
+        ]
         preprocessor = ColumnTransformer(
-            transformers=[
-                ("num", numeric_transformer, numeric_cols),
-                ("cat", categorical_transformer, categorical_cols),
-            ]
+            transformers=[t for t in transformers if t[2]],
+            remainder="drop",
         )
 
         iforest = IsolationForest(
             contamination='auto',  # Let sklearn auto-detect contamination
             random_state=self.random_state,
             n_estimators=200,
-            n_jobs=-1,
+            n_jobs=get_budget().resolve(self.fit_n_jobs),
         )
 
         pipeline = Pipeline([
@@ -56,6 +276,16 @@ class FraudDetector:
         ])
         return pipeline
 
+    @property
+    def column_strategies(self) -> Dict[str, str]:
+        """Encoding strategy chosen for each training column (after `fit`)."""
+        return dict(self._column_strategies)
+
+    @property
+    def input_columns(self) -> List[str]:
+        """Columns the fitted pipeline actually reads (for column projection)."""
+        return [c for c, s in self._column_strategies.items() if s != "drop"]
+
     # ---------------------------------------------------------------------
     # Public API
     # ---------------------------------------------------------------------
@@ -66,6 +296,9 @@ class FraudDetector:
 
         self._model = self._build_pipeline(df)
         self._model.fit(df)
+        # The sklearn fallback paths (predict/score_samples) must not fan out per call
+        self._model.named_steps["clf"].set_params(n_jobs=get_budget().resolve(self.predict_n_jobs))
+        self._engine = CompiledIsolationForest.from_estimator(self._model.named_steps["clf"])
         self._fitted = True
         return self
 
@@ -81,22 +314,192 @@ class FraudDetector:
             raise RuntimeError("Model must be fitted before calling score_samples()")
         return self._model.score_samples(df)
 
+    def predict_with_scores(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """Return ``(labels, scores)`` from a single forward pass.
+
+        The ColumnTransformer runs once and the trees are walked by the
+        array-backed `CompiledIsolationForest`, which skips sklearn's
+        validation and joblib overhead. Scores are bit-identical to
+        ``score_samples`` and labels match ``predict`` (+1 normal, -1 anomaly).
+        """
+        if not self._fitted or self._model is None:
+            raise RuntimeError("Model must be fitted before calling predict_with_scores()")
+        if self._engine is None:  # detectors pickled before the engine existed
+            self._engine = CompiledIsolationForest.from_estimator(self._model.named_steps["clf"])
+        features = self._model.named_steps["pre"].transform(df)
+        return self._engine.predict_with_scores(features, n_jobs=get_budget().resolve(self.predict_n_jobs))
+
+    def fit_stream(self, chunks: Iterable[pd.DataFrame], max_rows: int = 200_000) -> "FraudDetector":
+        """Fit on a uniform sample of at most `max_rows` rows from *chunks*.
+
+        IsolationForest only looks at 256 rows per tree, so a bounded sample
+        loses nothing while keeping memory independent of the input size.
+        """
+        rng = np.random.default_rng(self.random_state)
+        sample: pd.DataFrame | None = None
+        keys = np.empty(0)
+        for chunk in chunks:
+            chunk_keys = rng.random(len(chunk))
+            if sample is None:
+                sample, keys = chunk.reset_index(drop=True), chunk_keys
+            else:
+                sample = pd.concat([sample, chunk], ignore_index=True)
+                keys = np.concatenate([keys, chunk_keys])
+            if len(sample) > max_rows:
+                # bottom-k on random keys == uniform sample without replacement
+                keep = np.sort(np.argpartition(keys, max_rows)[:max_rows])
+                sample, keys = sample.iloc[keep].reset_index(drop=True), keys[keep]
+        if sample is None:
+            raise ValueError("Training stream is empty")
+        # concat of chunks with different category sets falls back to object
+        return self.fit(apply_schema(sample))
+
+    def score_stream(
+        self, chunks: Iterable[pd.DataFrame]
+    ) -> Iterator[Tuple[pd.DataFrame, np.ndarray, np.ndarray]]:
+        """Yield ``(chunk, labels, scores)`` for every chunk of *chunks*."""
+        for chunk in chunks:
+            labels, scores = self.predict_with_scores(chunk)
+            yield chunk, labels, scores
+
     # ------------------------------------------------------------------
     # Convenience helpers for JSON I/O (hackathon-friendly)
     # ------------------------------------------------------------------
     @staticmethod
-    def load_jsonl(path: Union[str, Path]) -> pd.DataFrame:
-        """Read transactions from a .jsonl (one-JSON-object-per-line) file."""
+    def iter_jsonl_chunks(
+        source: Union[str, Path, BinaryIO],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        schema: Dict[str, str] | None = TRANSACTION_SCHEMA,
+        fast_json: bool = True,
+        columns: Iterable[str] | None = None,
+    ) -> Iterator[pd.DataFrame]:
+        """Stream a .jsonl file (path or binary file object) as DataFrames of
+        at most `chunk_size` rows.
+
+        Only one chunk of parsed records is held at a time. Columns in *schema*
+        are cast to fixed dtypes; `fast_json` uses orjson when installed.
+        `columns`, if given, keeps only those fields.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be >= 1")
+        loads = _fast_json.loads if fast_json and _fast_json is not None else json.loads
         records: List[Dict[str, Any]] = []
-        with open(path, "r", encoding="utf-8") as f:
+        f = open(source, "rb") if isinstance(source, (str, Path)) else source
+        try:
             for line in f:
-                if line.strip():
-                    records.append(json.loads(line))
-        return pd.DataFrame.from_records(records)
+                if not line.strip():
+                    continue
+                records.append(loads(line))
+                if len(records) >= chunk_size:
+                    yield _records_to_frame(records, schema, columns)
+                    records = []
+        finally:
+            if f is not source:
+                f.close()
+        if records:
+            yield _records_to_frame(records, schema, columns)
+
+    @staticmethod
+    def iter_csv_chunks(
+        source: Union[str, Path, BinaryIO],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        schema: Dict[str, str] | None = TRANSACTION_SCHEMA,
+        columns: Iterable[str] | None = None,
+    ) -> Iterator[pd.DataFrame]:
+        """CSV counterpart of `iter_jsonl_chunks`."""
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be >= 1")
+        usecols = None if columns is None else set(columns).__contains__
+        with pd.read_csv(source, chunksize=chunk_size, usecols=usecols) as reader:
+            for df in reader:
+                yield apply_schema(df, schema) if schema else df
+
+    @staticmethod
+    def iter_parquet_chunks(
+        source: Union[str, Path, BinaryIO],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        schema: Dict[str, str] | None = TRANSACTION_SCHEMA,
+        columns: Iterable[str] | None = None,
+    ) -> Iterator[pd.DataFrame]:
+        """Stream a Parquet file in row batches, decoding only `columns`."""
+        _require_pyarrow()
+        pf = _pq.ParquetFile(source)
+        cols = _projection(pf.schema_arrow.names, columns)
+        for batch in pf.iter_batches(batch_size=chunk_size, columns=cols):
+            yield _batch_to_frame(batch, schema)
+
+    @staticmethod
+    def iter_arrow_chunks(
+        source: Union[str, Path, BinaryIO],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        schema: Dict[str, str] | None = TRANSACTION_SCHEMA,
+        columns: Iterable[str] | None = None,
+    ) -> Iterator[pd.DataFrame]:
+        """Stream Arrow IPC data (file or stream format) in chunks of at most
+        `chunk_size` rows. Files are memory-mapped and sliced without copying.
+        """
+        _require_pyarrow()
+        arrow_schema, batches = _ipc_reader(source)
+        cols = _projection(arrow_schema.names, columns)
+        for batch in batches:
+            if cols is not None:
+                batch = batch.select(cols)
+            for offset in range(0, batch.num_rows, chunk_size):
+                yield _batch_to_frame(batch.slice(offset, chunk_size), schema)
+
+    @staticmethod
+    def iter_chunks(
+        path: Union[str, Path],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        schema: Dict[str, str] | None = TRANSACTION_SCHEMA,
+        columns: Iterable[str] | None = None,
+    ) -> Iterator[pd.DataFrame]:
+        """Stream any supported file, picking the reader from its suffix."""
+        fmt = file_format(path)
+        if fmt == "jsonl":
+            return FraudDetector.iter_jsonl_chunks(path, chunk_size, schema=schema, columns=columns)
+        if fmt == "csv":
+            return FraudDetector.iter_csv_chunks(path, chunk_size, schema=schema, columns=columns)
+        if fmt == "parquet":
+            return FraudDetector.iter_parquet_chunks(path, chunk_size, schema=schema, columns=columns)
+        return FraudDetector.iter_arrow_chunks(path, chunk_size, schema=schema, columns=columns)
+
+    @staticmethod
+    def load(
+        path: Union[str, Path],
+        schema: Dict[str, str] | None = None,
+        columns: Iterable[str] | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> pd.DataFrame:
+        """Read a JSONL, CSV, Parquet or Arrow IPC file (optionally only `columns`)."""
+        chunks = list(FraudDetector.iter_chunks(path, chunk_size, schema=schema, columns=columns))
+        if not chunks:
+            return pd.DataFrame()
+        df = pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+        return apply_schema(df, schema) if schema and len(chunks) > 1 else df
+
+    @staticmethod
+    def load_jsonl(
+        path: Union[str, Path],
+        schema: Dict[str, str] | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> pd.DataFrame:
+        """Read transactions from a .jsonl (one-JSON-object-per-line) file.
+
+        Pass `schema=TRANSACTION_SCHEMA` for compact typed columns.
+        """
+        chunks = list(FraudDetector.iter_jsonl_chunks(path, chunk_size=chunk_size, schema=schema))
+        if not chunks:
+            return pd.DataFrame()
+        df = pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+        return apply_schema(df, schema) if schema and len(chunks) > 1 else df
 
     @staticmethod
     def save_scores(df: pd.DataFrame, scores: np.ndarray, out_path: Union[str, Path]):
-        """Persist dataframe with an additional `fraud_score` column as CSV."""
-        df_out = df.copy()
-        df_out["fraud_score"] = scores
-        df_out.to_csv(out_path, index=False) 
\ No newline at end of file
+        """Persist dataframe with an additional `fraud_score` column.
+
+        Written as CSV, JSONL, Parquet or Arrow IPC according to the suffix;
+        *df* itself is left untouched and not copied.
+        """
+        with ScoreWriter(out_path) as writer:
+            writer.write(df, fraud_score=scores) 
\ No newline at end of file
@@ -1,41 +1,378 @@
 from __future__ import annotations
 
-from typing import List, Dict, Any, Tuple
+import heapq
+import math
+import threading
+import time
+from typing import List, Dict, Any, Set, Tuple
 
 import networkx as nx
+import numpy as np
 import pandas as pd
 
 
+def _to_epoch_seconds(values: pd.Series) -> np.ndarray:
+    """Convert timestamps (datetime64, ISO strings or epoch numbers) to float seconds."""
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype("float64").to_numpy()
+    ts = pd.to_datetime(values, utc=True, errors="coerce", format="mixed")
+    return ((ts - pd.Timestamp(0, tz="UTC")).dt.total_seconds()).to_numpy(dtype="float64")
+
+
+def _canonical_ring(nodes: List[Any]) -> Tuple[Any, ...]:
+    """Rotate *nodes* so the same ring always yields the same key."""
+    i = min(range(len(nodes)), key=lambda k: str(nodes[k]))
+    return tuple(nodes[i:] + nodes[:i])
+
+
+class RingRegistry:
+    """Rings currently present in a `TransactionGraph`.
+
+    Each ring is indexed by its edges so that evicting an edge expires every
+    ring that used it in O(rings on that edge).
+    """
+
+    def __init__(self):
+        self._rings: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+        self._by_edge: Dict[Tuple[Any, Any], Set[Tuple[Any, ...]]] = {}
+        self.truncated_searches = 0
+
+    def add(self, nodes: List[Any], seen: float | None) -> bool:
+        key = _canonical_ring(nodes)
+        if key in self._rings:
+            return False
+        self._rings[key] = {"nodes": list(key), "first_seen": seen}
+        for edge in zip(key, key[1:] + key[:1]):
+            self._by_edge.setdefault(edge, set()).add(key)
+        return True
+
+    def remove_edge(self, u: Any, v: Any) -> int:
+        keys = self._by_edge.pop((u, v), set())
+        for key in keys:
+            self._rings.pop(key, None)
+            for edge in zip(key, key[1:] + key[:1]):
+                if edge != (u, v) and edge in self._by_edge:
+                    self._by_edge[edge].discard(key)
+                    if not self._by_edge[edge]:
+                        del self._by_edge[edge]
+        return len(keys)
+
+    def cycles(self) -> List[List[Any]]:
+        return [ring["nodes"] for ring in self._rings.values()]
+
+    def __len__(self) -> int:
+        return len(self._rings)
+
+
+class TransactionGraph:
+    """Persistent, incrementally-updated account graph.
+
+    Parallel transactions between the same pair of accounts collapse into one
+    edge carrying ``count``, ``total_amount``, ``amount`` (latest),
+    ``first_seen`` and ``last_seen`` (epoch seconds). Adding a transaction is
+    O(1). When `window_seconds` is set, edges whose ``last_seen`` falls more
+    than that far behind the newest transaction are evicted.
+
+    With `track_rings`, every *new* edge u → v triggers a bounded search for
+    paths v → … → u, so the rings it closes land in `rings` as they form and
+    expire with their edges. Ring queries then become a registry read. The
+    search only walks nodes that can still reach u within `max_cycle_len`
+    and stops after `max_search_steps` steps or `search_budget_s` seconds
+    (counted in ``rings.truncated_searches``), since it runs under the graph
+    lock on every ingest.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float | None = None,
+        track_rings: bool = False,
+        min_cycle_len: int = 3,
+        max_cycle_len: int = 8,
+        max_rings_per_edge: int = 100,
+        max_search_steps: int | None = 100_000,
+        search_budget_s: float | None = 0.05,
+    ):
+        self.window_seconds = window_seconds
+        self.track_rings = track_rings
+        self.min_cycle_len = min_cycle_len
+        self.max_cycle_len = max_cycle_len
+        self.max_rings_per_edge = max_rings_per_edge
+        self.max_search_steps = max_search_steps
+        self.search_budget_s = search_budget_s
+        self.rings = RingRegistry()
+        self.graph = nx.DiGraph()
+        self.latest_seen = -math.inf
+        # (last_seen, u, v) min-heap with lazy deletion of superseded entries;
+        # only kept when there is a window to evict by
+        self._expiry: List[Tuple[float, Any, Any]] = []
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------------
+    # Ingestion
+    # ------------------------------------------------------------------
+    def add_transaction(self, source: Any, target: Any, amount: float = 0.0, timestamp: float | None = None):
+        """Record one transaction source → target (`timestamp` in epoch seconds)."""
+        ts = None if timestamp is None else float(timestamp)
+        self._merge_edge(source, target, 1, float(amount), float(amount), ts, ts)
+        self._maybe_evict()
+
+    def ingest(self, df: pd.DataFrame) -> "TransactionGraph":
+        """Add every row of *df* (needs `source_id`/`target_id`; `amount`/`timestamp` optional)."""
+        if not {"source_id", "target_id"}.issubset(df.columns):
+            raise ValueError("DataFrame must contain `source_id` and `target_id` columns")
+        if df.empty:
+            return self
+
+        frame = pd.DataFrame({
+            "u": df["source_id"].astype(object).to_numpy(),
+            "v": df["target_id"].astype(object).to_numpy(),
+            "amount": pd.to_numeric(df["amount"], errors="coerce").fillna(0.0).to_numpy(dtype="float64")
+            if "amount" in df.columns else 0.0,
+            "ts": _to_epoch_seconds(df["timestamp"]) if "timestamp" in df.columns else np.nan,
+        })
+        # Aggregate the batch first so the per-edge Python work is O(unique edges)
+        agg = frame.groupby(["u", "v"], sort=False).agg(
+            count=("amount", "size"),
+            total=("amount", "sum"),
+            last_amount=("amount", "last"),
+            first=("ts", "min"),
+            last=("ts", "max"),
+        )
+        for (u, v), count, total, last_amount, first, last in agg.itertuples(name=None):
+            self._merge_edge(
+                u, v, int(count), float(total), float(last_amount),
+                None if pd.isna(first) else float(first),
+                None if pd.isna(last) else float(last),
+            )
+        self._maybe_evict()
+        return self
+
+    def _merge_edge(self, u, v, count: int, total: float, last_amount: float, first, last):
+        with self._lock:
+            data = self.graph.get_edge_data(u, v)
+            if data is None:
+                self.graph.add_edge(
+                    u, v, count=count, total_amount=total, amount=last_amount,
+                    first_seen=first, last_seen=last,
+                )
+                if self.track_rings:
+                    self._register_rings_closed_by(u, v, last)
+            else:
+                data["count"] += count
+                data["total_amount"] += total
+                data["amount"] = last_amount
+                if first is not None:
+                    data["first_seen"] = first if data["first_seen"] is None else min(data["first_seen"], first)
+                if last is not None:
+                    data["last_seen"] = last if data["last_seen"] is None else max(data["last_seen"], last)
+            if last is not None:
+                if self.window_seconds is not None:
+                    heapq.heappush(self._expiry, (last, u, v))
+                self.latest_seen = max(self.latest_seen, last)
+
+    def _register_rings_closed_by(self, u: Any, v: Any, seen: float | None):
+        """Record rings that contain the freshly inserted edge u → v."""
+        if u == v:
+            return
+        deadline = time.perf_counter() + self.search_budget_s if self.search_budget_s is not None else None
+        steps = 0
+
+        def out_of_budget() -> bool:
+            return (self.max_search_steps is not None and steps >= self.max_search_steps) or (
+                deadline is not None and steps % 1024 == 0 and time.perf_counter() > deadline
+            )
+
+        # Reverse BFS: hops from each node back to u, within the ring length
+        max_hops = self.max_cycle_len - 1
+        hops = {u: 0}
+        frontier = [u]
+        for depth in range(1, max_hops + 1):
+            nxt_frontier = []
+            for n in frontier:
+                for p in self.graph.predecessors(n):
+                    steps += 1
+                    if out_of_budget():
+                        self.rings.truncated_searches += 1
+                        return
+                    if p not in hops:
+                        hops[p] = depth
+                        nxt_frontier.append(p)
+            frontier = nxt_frontier
+        if hops.get(v, max_hops + 1) > max_hops:
+            return  # no way back to u: nothing to walk
+
+        # DFS v → … → u through nodes that can still make it back in time
+        path = [v]
+        on_path = {v}
+        stack = [iter(self.graph.successors(v))]
+        found = 0
+        while stack:
+            steps += 1
+            if out_of_budget():
+                self.rings.truncated_searches += 1
+                return
+            nxt = next(stack[-1], None)
+            if nxt is None:
+                stack.pop()
+                on_path.discard(path.pop())
+                continue
+            if nxt == u:
+                if len(path) + 1 >= self.min_cycle_len:
+                    self.rings.add(path + [u], seen)
+                found += 1
+                if found >= self.max_rings_per_edge:
+                    self.rings.truncated_searches += 1
+                    return
+                continue
+            if nxt not in on_path and len(path) + hops.get(nxt, max_hops + 1) <= max_hops:
+                path.append(nxt)
+                on_path.add(nxt)
+                stack.append(iter(self.graph.successors(nxt)))
+
+    # ------------------------------------------------------------------
+    # Eviction
+    # ------------------------------------------------------------------
+    def _maybe_evict(self):
+        if self.window_seconds is not None and self.latest_seen > -math.inf:
+            self.evict_before(self.latest_seen - self.window_seconds)
+
+    def evict_before(self, cutoff: float) -> int:
+        """Drop edges last seen before *cutoff* (epoch seconds); returns the count.
+
+        Without `window_seconds` there is no expiry heap and this scans every edge.
+        """
+        removed = 0
+        with self._lock:
+            if self.window_seconds is None:
+                stale = [
+                    (u, v) for u, v, last in self.graph.edges(data="last_seen")
+                    if last is not None and last < cutoff
+                ]
+            else:
+                stale = []
+                while self._expiry and self._expiry[0][0] < cutoff:
+                    last, u, v = heapq.heappop(self._expiry)
+                    data = self.graph.get_edge_data(u, v)
+                    if data is not None and data["last_seen"] == last:  # else refreshed or already gone
+                        stale.append((u, v))
+            for u, v in stale:
+                self.graph.remove_edge(u, v)
+                self.rings.remove_edge(u, v)
+                removed += 1
+                for n in (u, v):
+                    if n in self.graph and self.graph.degree(n) == 0:
+                        self.graph.remove_node(n)
+        return removed
+
+    # ------------------------------------------------------------------
+    # Read side
+    # ------------------------------------------------------------------
+    def snapshot(self) -> nx.DiGraph:
+        """Consistent copy of the current graph for long-running readers."""
+        with self._lock:
+            return self.graph.copy()
+
+    def snapshot_with_rings(self) -> Tuple[nx.DiGraph, List[List[Any]]]:
+        """Graph copy plus the tracked rings, taken together so every ring's nodes are in the copy."""
+        with self._lock:
+            return self.graph.copy(), self.rings.cycles()
+
+    def ring_stats(self) -> Dict[str, Any]:
+        """`ring_stats` for the tracked rings (requires `track_rings`)."""
+        with self._lock:
+            return ring_stats(self.rings.cycles(), self.rings.truncated_searches > 0)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "nodes": self.graph.number_of_nodes(),
+            "edges": self.graph.number_of_edges(),
+            "rings": len(self.rings),
+            "window_seconds": self.window_seconds,
+        }
+
+
 def build_transaction_graph(df: pd.DataFrame) -> nx.DiGraph:
     """Create a directed graph where nodes are account IDs and edges represent
     monetary transactions. Assumes the dataframe has `source_id`, `target_id`, and
     `amount` columns.
     """
-    if not {"source_id", "target_id"}.issubset(df.columns):
-        raise ValueError("DataFrame must contain `source_id` and `target_id` columns")
+    return TransactionGraph().ingest(df).graph
+
+
+def find_rings(
+    g: nx.DiGraph,
+    min_cycle_len: int = 3,
+    max_cycle_len: int = 8,
+    time_budget_s: float | None = 2.0,
+    max_results: int | None = 10_000,
+) -> Tuple[List[List[Any]], bool]:
+    """Enumerate simple cycles of `min_cycle_len`..`max_cycle_len` nodes.
+
+    Nodes outside strongly-connected components of sufficient size can never
+    be on a cycle and are skipped entirely. Within each component the search
+    starts from every node but only extends through nodes ranked after it, so
+    each ring is reported once, in its canonical rotation. The search stops
+    early once `time_budget_s` or `max_results` is exhausted.
+
+    Returns ``(cycles, truncated)``.
+    """
+    deadline = time.perf_counter() + time_budget_s if time_budget_s is not None else None
+    cycles: List[List[Any]] = []
+    steps = 0
 
-    g = nx.DiGraph()
+    for scc in nx.strongly_connected_components(g):
+        if len(scc) < min_cycle_len:
+            continue
+        rank = {n: i for i, n in enumerate(scc)}
+        adj = {n: [m for m in g.successors(n) if m in rank] for n in scc}
 
-    for _, row in df.iterrows():
-        src = row["source_id"]
-        tgt = row["target_id"]
-        amt = row.get("amount", 0.0)
-        g.add_edge(src, tgt, amount=amt)
-    return g
+        for start in scc:
+            start_rank = rank[start]
+            path = [start]
+            on_path = {start}
+            stack = [iter(adj[start])]
+            while stack:
+                steps += 1
+                if deadline is not None and steps % 1024 == 0 and time.perf_counter() > deadline:
+                    return cycles, True
+                nxt = next(stack[-1], None)
+                if nxt is None:
+                    stack.pop()
+                    on_path.discard(path.pop())
+                    continue
+                if nxt == start:
+                    if len(path) >= min_cycle_len:
+                        cycles.append(list(path))
+                        if max_results is not None and len(cycles) >= max_results:
+                            return cycles, True
+                    continue
+                if len(path) < max_cycle_len and rank[nxt] > start_rank and nxt not in on_path:
+                    path.append(nxt)
+                    on_path.add(nxt)
+                    stack.append(iter(adj[nxt]))
+    return cycles, False
 
 
-def detect_fraud_rings(g: nx.DiGraph, min_cycle_len: int = 3) -> List[Tuple[Any, ...]]:
+def detect_fraud_rings(
+    g: nx.DiGraph,
+    min_cycle_len: int = 3,
+    max_cycle_len: int = 8,
+    time_budget_s: float | None = 2.0,
+    max_results: int | None = 10_000,
+) -> List[List[Any]]:
     """Return a list of simple cycles (potential fraud rings) of at least
-    `min_cycle_len` nodes.
+    `min_cycle_len` and at most `max_cycle_len` nodes. See `find_rings` for
+    the search budget.
     """
-    cycles = [c for c in nx.simple_cycles(g) if len(c) >= min_cycle_len]
+    cycles, _ = find_rings(g, min_cycle_len, max_cycle_len, time_budget_s, max_results)
     return cycles
 
 
-def ring_stats(cycles: List[Tuple[Any, ...]]) -> Dict[str, Any]:
+def ring_stats(cycles: List[Tuple[Any, ...]], truncated: bool = False) -> Dict[str, Any]:
     """Basic statistics about detected rings for dashboard display."""
     return {
         "ring_count": len(cycles),
         "largest_ring": max((len(c) for c in cycles), default=0),
         "rings": cycles,
-    } 
\ No newline at end of file
+        "truncated": truncated,
+    }
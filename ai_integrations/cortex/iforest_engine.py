@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+"""Array-backed inference for fitted sklearn IsolationForests.
+
+`IsolationForest.score_samples` spends most of a single-row call on input
+validation, joblib dispatch and a Python loop over the estimators. This
+module flattens every fitted tree into one set of contiguous node arrays
+
+    feature     split feature (global column index; 0 for leaves)
+    threshold   split threshold (float64, compared against float32 inputs)
+    children    (n_nodes, 2) left/right child; leaves point at themselves
+    leaf_depth  decision path length + average path length correction - 1
+
+When numba is installed the trees are walked by a JIT-compiled loop (a
+single row costs a few microseconds); otherwise all trees for all rows are
+walked at once in `max_depth` vectorised numpy steps. Either way, per-tree
+depths are accumulated in estimator order, so the scores are bit-identical
+to `score_samples`.
+"""
+
+from typing import Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.ensemble import IsolationForest
+from sklearn.ensemble._iforest import _average_path_length
+
+try:  # optional JIT for the tree walk
+    import numba as _numba  # type: ignore
+except ImportError:  # pragma: no cover - vectorised numpy fallback
+    _numba = None
+
+from cortex.thread_budget import shared_pool
+
+__all__ = ["CompiledIsolationForest"]
+
+# Below this many rows per chunk, fanning out costs more than it saves
+PARALLEL_MIN_ROWS = 1024
+
+
+def _path_depths(X, feature, threshold, children, missing_left, leaf_depth, roots):
+    """Sum of per-tree leaf depths for every row of *X* (scalar reference loop)."""
+    out = np.zeros(X.shape[0], dtype=np.float64)
+    # Tree-major so one tree stays in cache across the batch; each row still
+    # accumulates its depths in estimator order
+    for root in roots:
+        for i in range(X.shape[0]):
+            node = root
+            while children[node, 0] != node:
+                v = X[i, feature[node]]
+                if np.isnan(v):
+                    node = children[node, 0] if missing_left[node] else children[node, 1]
+                elif v <= threshold[node]:
+                    node = children[node, 0]
+                else:
+                    node = children[node, 1]
+            out[i] += leaf_depth[node]
+    return out
+
+
+_jit_path_depths = _numba.njit(cache=True, nogil=True)(_path_depths) if _numba is not None else None
+
+
+class CompiledIsolationForest:
+    """Flattened, read-only copy of a fitted `IsolationForest`."""
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        children: np.ndarray,
+        missing_left: np.ndarray,
+        leaf_depth: np.ndarray,
+        roots: np.ndarray,
+        max_depth: int,
+        denominator: float,
+        offset: float,
+        n_features: int,
+    ):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.missing_left = missing_left
+        self.leaf_depth = leaf_depth
+        self.roots = roots
+        self.max_depth = max_depth
+        self.denominator = denominator
+        self.offset = offset
+        self.n_features = n_features
+
+    @classmethod
+    def from_estimator(cls, iforest: IsolationForest) -> "CompiledIsolationForest":
+        n_features = iforest.n_features_in_
+        # Same rule sklearn uses to decide whether trees saw a column subset
+        subsample_features = iforest._max_features != n_features
+
+        feature, threshold, children, missing_left, leaf_depth, roots = [], [], [], [], [], []
+        base = 0
+        for t, (est, features) in enumerate(zip(iforest.estimators_, iforest.estimators_features_)):
+            tree = est.tree_
+            n_nodes = tree.node_count
+            own = np.arange(n_nodes)
+            is_leaf = tree.children_left == -1
+
+            f = np.where(is_leaf, 0, tree.feature)
+            if subsample_features:
+                f = np.asarray(features)[f]
+            feature.append(f)
+            threshold.append(tree.threshold)
+            children.append(np.column_stack([
+                np.where(is_leaf, own, tree.children_left) + base,
+                np.where(is_leaf, own, tree.children_right) + base,
+            ]))
+            missing_left.append(np.asarray(tree.missing_go_to_left, dtype=bool))
+            # Same expression (and float op order) as sklearn's per-tree update
+            leaf_depth.append(
+                iforest._decision_path_lengths[t] + iforest._average_path_length_per_tree[t] - 1.0
+            )
+            roots.append(base)
+            base += n_nodes
+
+        return cls(
+            feature=np.concatenate(feature).astype(np.intp),
+            threshold=np.concatenate(threshold).astype(np.float64),
+            children=np.concatenate(children).astype(np.intp),
+            missing_left=np.concatenate(missing_left),
+            leaf_depth=np.concatenate(leaf_depth).astype(np.float64),
+            roots=np.asarray(roots, dtype=np.intp),
+            max_depth=max(est.tree_.max_depth for est in iforest.estimators_),
+            denominator=len(iforest.estimators_) * _average_path_length([iforest._max_samples])[0],
+            offset=float(iforest.offset_),
+            n_features=n_features,
+        )
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+    def _as_array(self, X) -> np.ndarray:
+        X = X.toarray() if sp.issparse(X) else X
+        # sklearn validates to float32 before walking the trees
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"X has {X.shape[1]} features, but the forest expects {self.n_features}")
+        return X
+
+    def leaf_nodes(self, X) -> np.ndarray:
+        """Global leaf index per (row, tree)."""
+        X = self._as_array(X)
+        rows = np.arange(X.shape[0])[:, None]
+        node = np.broadcast_to(self.roots, (X.shape[0], len(self.roots))).copy()
+        has_nan = bool(np.isnan(X).any())
+        for _ in range(self.max_depth):
+            x = X[rows, self.feature[node]]
+            go_right = x > self.threshold[node]
+            if has_nan:
+                go_right = np.where(np.isnan(x), ~self.missing_left[node], go_right)
+            node = self.children[node, go_right.view(np.int8)]
+        return node
+
+    def path_depths(self, X, n_jobs: int = 1) -> np.ndarray:
+        """Summed leaf depth over all trees, per row.
+
+        With `n_jobs` > 1, large batches are split by row across the shared
+        inference pool (rows are independent, so results are unchanged).
+        """
+        n_chunks = min(n_jobs, X.shape[0] // PARALLEL_MIN_ROWS)
+        if n_chunks > 1:
+            X = self._as_array(X)
+            parts = shared_pool().map(self.path_depths, np.array_split(X, n_chunks))
+            return np.concatenate(list(parts))
+        if _jit_path_depths is not None:
+            return _jit_path_depths(
+                self._as_array(X), self.feature, self.threshold, self.children,
+                self.missing_left, self.leaf_depth, self.roots,
+            )
+        # cumsum adds left to right like sklearn's per-tree `depths +=`;
+        # a plain sum would use pairwise summation and drift in the last bits
+        return np.cumsum(self.leaf_depth[self.leaf_nodes(X)], axis=1)[:, -1]
+
+    def score_samples(self, X, n_jobs: int = 1) -> np.ndarray:
+        """Equivalent to `IsolationForest.score_samples` (lower = more abnormal)."""
+        depths = self.path_depths(X, n_jobs)
+        scores = 2 ** (
+            -np.divide(depths, self.denominator, out=np.ones_like(depths), where=self.denominator != 0)
+        )
+        return -scores
+
+    def predict_with_scores(self, X, n_jobs: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """``(labels, scores)`` with +1 normal / -1 anomaly, as `IsolationForest.predict`."""
+        scores = self.score_samples(X, n_jobs)
+        return np.where(scores - self.offset < 0, -1, 1), scores
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+"""Versioned on-disk registry for fitted TrustShield models.
+
+A published version is one directory holding every model the API serves, so
+all workers that load it score with identical weights:
+
+    models/
+      LATEST                  -> name of the current version
+      20250709T232500-1a2b3c/
+        manifest.json         schema hash, creation time, file list
+        fraud_detector.joblib FraudDetector (joblib, loaded memory-mapped)
+        tab_transformer.pt    TabTransformer state dict (torch zip, mmap)
+        tab_transformer.json  column layout / hyper-parameters
+        ring_gnn.pt           RingRiskGNN state dict
+        ring_gnn.json         RingRiskGNN hyper-parameters
+
+Publishing writes into a temporary directory and renames it into place, then
+swaps `LATEST`, so a booting worker never observes a half-written version.
+
+Train and publish offline with:
+    python -m cortex.model_registry publish --input data/sample_transactions.jsonl
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Union
+
+import joblib
+import pandas as pd
+
+from cortex.fraud_detection import FraudDetector, TRANSACTION_SCHEMA
+
+if TYPE_CHECKING:  # torch models are imported lazily so detector-only loads stay light
+    from cortex.gnn_ring_risk import RingRiskGNN
+    from cortex.tab_transformer_detector import TabTransformerDetector
+
+__all__ = ["ModelBundle", "ModelRegistry", "schema_hash"]
+
+DEFAULT_ROOT = Path(os.environ.get("TS360_MODEL_DIR", "models"))
+
+
+def schema_hash(df: pd.DataFrame) -> str:
+    """Stable fingerprint of a training frame's column names and dtypes."""
+    layout = [[str(c), str(t)] for c, t in df.dtypes.items()]
+    return hashlib.sha256(json.dumps(layout).encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class ModelBundle:
+    fraud_detector: FraudDetector
+    tab_detector: TabTransformerDetector
+    ring_model: RingRiskGNN
+    version: str
+    schema_hash: str
+
+
+class ModelRegistry:
+    """Publish and load `ModelBundle` versions under *root*."""
+
+    def __init__(self, root: Union[str, Path] = DEFAULT_ROOT):
+        self.root = Path(root)
+
+    # ------------------------------------------------------------------
+    # Publish
+    # ------------------------------------------------------------------
+    def publish(
+        self,
+        fraud_detector: FraudDetector,
+        tab_detector: TabTransformerDetector,
+        ring_model: RingRiskGNN,
+        training_schema: str,
+    ) -> str:
+        """Persist all models as a new version and point `LATEST` at it."""
+        import torch  # type: ignore
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        version = f"{time.strftime('%Y%m%dT%H%M%S')}-{os.urandom(3).hex()}"
+        staging = Path(tempfile.mkdtemp(prefix=".staging-", dir=self.root))
+        try:
+            joblib.dump(fraud_detector, staging / "fraud_detector.joblib")
+            torch.save(tab_detector.state_dict(), staging / "tab_transformer.pt")
+            (staging / "tab_transformer.json").write_text(json.dumps(tab_detector.get_config()))
+            torch.save(ring_model.state_dict(), staging / "ring_gnn.pt")
+            (staging / "ring_gnn.json").write_text(json.dumps({
+                "hidden": ring_model.lin.in_features,
+                "heads": ring_model.gat1.heads,
+                "dropout": ring_model.dropout.p,
+            }))
+            manifest = {
+                "version": version,
+                "created": time.time(),
+                "schema_hash": training_schema,
+                "files": sorted(p.name for p in staging.iterdir()),
+            }
+            (staging / "manifest.json").write_text(json.dumps(manifest, indent=2))
+            os.replace(staging, self.root / version)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        pointer = self.root / ".LATEST.tmp"
+        pointer.write_text(version)
+        os.replace(pointer, self.root / "LATEST")
+        return version
+
+    # ------------------------------------------------------------------
+    # Load
+    # ------------------------------------------------------------------
+    def versions(self) -> List[str]:
+        if not self.root.exists():
+            return []
+        return sorted(p.name for p in self.root.iterdir() if (p / "manifest.json").exists())
+
+    def latest(self) -> str | None:
+        pointer = self.root / "LATEST"
+        return pointer.read_text().strip() if pointer.exists() else None
+
+    def manifest(self, version: str) -> Dict[str, Any]:
+        return json.loads((self.root / version / "manifest.json").read_text())
+
+    def load(self, version: str | None = None) -> ModelBundle:
+        """Load *version* (default `LATEST`) with memory-mapped weights."""
+        import torch  # type: ignore
+
+        from cortex.gnn_ring_risk import RingRiskGNN
+        from cortex.tab_transformer_detector import TabTransformerDetector
+
+        version = self._resolve(version)
+        vdir = self.root / version
+        manifest = self.manifest(version)
+
+        fraud_detector = self.load_fraud_detector(version)
+
+        tab_state = torch.load(vdir / "tab_transformer.pt", map_location="cpu", mmap=True, weights_only=True)
+        tab_config = json.loads((vdir / "tab_transformer.json").read_text())
+        tab_detector = TabTransformerDetector.from_config(tab_config, tab_state)
+
+        ring_config = json.loads((vdir / "ring_gnn.json").read_text())
+        ring_model = RingRiskGNN(**ring_config)
+        ring_model.load_state_dict(
+            torch.load(vdir / "ring_gnn.pt", map_location="cpu", mmap=True, weights_only=True)
+        )
+        ring_model.eval()
+
+        return ModelBundle(fraud_detector, tab_detector, ring_model, version, manifest["schema_hash"])
+
+    def load_fraud_detector(self, version: str | None = None) -> FraudDetector:
+        """Load only the IsolationForest detector (no torch import), e.g. for scoring workers."""
+        return joblib.load(self.root / self._resolve(version) / "fraud_detector.joblib", mmap_mode="r")
+
+    def _resolve(self, version: str | None) -> str:
+        version = version or self.latest()
+        if version is None:
+            raise FileNotFoundError(f"No published models under {self.root}")
+        return version
+
+    def load_latest_or_none(self) -> ModelBundle | None:
+        return self.load() if self.latest() else None
+
+
+# ----------------------------------------------------------------------
+# CLI
+# ----------------------------------------------------------------------
+def _publish(args: argparse.Namespace):
+    from cortex.gnn_ring_risk import RingRiskGNN, prepare_training_data, train_gnn_model
+    from cortex.tab_transformer_detector import TabTransformerDetector
+
+    df = FraudDetector.load_jsonl(args.input, schema=TRANSACTION_SCHEMA)
+    print(f"[registry] training on {len(df)} rows from {args.input}")
+    fraud_detector = FraudDetector().fit(df)
+    tab_detector = TabTransformerDetector(epochs=args.tab_epochs).fit(df)
+    if args.rings:
+        ring_model = train_gnn_model(prepare_training_data(str(args.rings)), epochs=args.gnn_epochs)
+    else:
+        ring_model = RingRiskGNN()
+    version = ModelRegistry(args.root).publish(fraud_detector, tab_detector, ring_model, schema_hash(df))
+    print(f"[registry] published {version} to {args.root}")
+
+
+def _list(args: argparse.Namespace):
+    reg = ModelRegistry(args.root)
+    latest = reg.latest()
+    for v in reg.versions():
+        m = reg.manifest(v)
+        print(f"{'*' if v == latest else ' '} {v}  schema={m['schema_hash']}")
+
+
+def main():
+    p = argparse.ArgumentParser(description="TrustShield 360 model registry")
+    p.add_argument("--root", type=Path, default=DEFAULT_ROOT, help="Registry directory (default: $TS360_MODEL_DIR or ./models)")
+    sub = p.add_subparsers(dest="command", required=True)
+
+    pub = sub.add_parser("publish", help="Train all models offline and publish a new version")
+    pub.add_argument("--input", type=Path, required=True, help="JSONL training transactions")
+    pub.add_argument("--tab-epochs", type=int, default=3)
+    pub.add_argument("--rings", type=Path, help="Optional labelled fraud rings JSONL to train the GNN")
+    pub.add_argument("--gnn-epochs", type=int, default=50)
+    pub.set_defaults(func=_publish)
+
+    ls = sub.add_parser("list", help="List published versions")
+    ls.set_defaults(func=_list)
+
+    args = p.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import List, Tuple
+from typing import Any, Dict, List, Tuple
 
 import numpy as np
 import pandas as pd
@@ -27,6 +27,8 @@ class TabTransformerDetector:
     _cat_cols: List[str] = field(init=False, default_factory=list)
     _cont_cols: List[str] = field(init=False, default_factory=list)
     _cat_sizes: Tuple[int, ...] = field(init=False, default=())
+    # Per-column training vocabulary; position in the Index is the category code
+    _vocab: Dict[str, pd.Index] = field(init=False, default_factory=dict)
     _fitted: bool = field(init=False, default=False)
 
     # ------------------------------------------------------------------
@@ -84,6 +86,41 @@ class TabTransformerDetector:
         errs = torch.mean((preds.cpu() - 0) ** 2, dim=1)  # residual vs zeros
         return errs.numpy()
 
+    # ------------------------------------------------------------------
+    # Persistence (see cortex.model_registry)
+    # ------------------------------------------------------------------
+    def get_config(self) -> Dict[str, Any]:
+        """JSON-serialisable hyper-parameters and fitted column layout."""
+        return {
+            "epochs": self.epochs,
+            "lr": self.lr,
+            "batch_size": self.batch_size,
+            "cat_cols": list(self._cat_cols),
+            "cont_cols": list(self._cont_cols),
+            "cat_sizes": list(self._cat_sizes),
+            "vocab": {c: idx.tolist() for c, idx in self._vocab.items()},
+        }
+
+    def state_dict(self) -> Dict[str, torch.Tensor]:
+        if not self._fitted or self._model is None:
+            raise RuntimeError("Model not fitted")
+        return self._model.state_dict()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], state_dict: Dict[str, torch.Tensor]) -> "TabTransformerDetector":
+        """Rebuild a fitted detector from `get_config()` + `state_dict()`."""
+        det = cls(epochs=config["epochs"], lr=config["lr"], batch_size=config["batch_size"])
+        det._cat_cols = list(config["cat_cols"])
+        det._cont_cols = list(config["cont_cols"])
+        det._cat_sizes = tuple(config["cat_sizes"])
+        det._vocab = {c: pd.Index(values) for c, values in config["vocab"].items()}
+        det._build_model()
+        assert det._model is not None
+        det._model.load_state_dict(state_dict)
+        det._model.to(det.device)
+        det._fitted = True
+        return det
+
     # ------------------------------------------------------------------
     # Internals
     # ------------------------------------------------------------------
@@ -97,15 +134,20 @@ class TabTransformerDetector:
             c for c in df.columns
             if c not in self._cat_cols and not pd.api.types.is_datetime64_any_dtype(df[c])
         ]
-        self._cat_sizes = tuple(int(df[c].astype("category").nunique()) + 1 for c in self._cat_cols)
-
+        # Freeze the vocabulary at fit time so inference codes match training
+        self._vocab = {c: pd.Index(pd.unique(df[c].dropna())) for c in self._cat_cols}
+        # +1 for the out-of-vocabulary / missing bucket (code == len(vocab))
+        self._cat_sizes = tuple(len(self._vocab[c]) + 1 for c in self._cat_cols)
 
     def _preprocess(self, df: pd.DataFrame) -> Tuple[torch.Tensor, torch.Tensor]:
-        # categorical to codes (missing -> last index)
+        # categorical to codes via hash lookup into the training vocabulary
+        # (unseen or missing -> OOV bucket, the last index)
         cat_tensors = []
         for c in self._cat_cols:
-            codes = df[c].astype("category").cat.codes.replace(-1, len(pd.unique(df[c]))).values
-            cat_tensors.append(torch.tensor(codes, dtype=torch.long))
+            vocab = self._vocab[c]
+            codes = vocab.get_indexer(df[c])
+            codes[codes < 0] = len(vocab)
+            cat_tensors.append(torch.from_numpy(codes.astype(np.int64)))
         x_categ = torch.stack(cat_tensors, dim=1) if cat_tensors else torch.empty(len(df), 0, dtype=torch.long)
 
         # continuous features – ensure float32
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+"""Process-wide CPU thread budget.
+
+joblib (`n_jobs=-1`), torch intra-op threads and the OpenMP/BLAS runtimes
+each default to "every core". With several API workers on one host that
+multiplies into heavy oversubscription. The budget gives each process a
+fixed share of the cores and applies it to all of those runtimes:
+
+    TS360_THREAD_BUDGET   threads for this process (explicit)
+    TS360_WORKERS         worker processes sharing the host (default:
+                          $WEB_CONCURRENCY or 1); budget = cores // workers
+
+`configure_threads()` should run once at process start-up. Batch inference
+can then fan out over `shared_pool()`, one persistent pool per process,
+instead of spawning workers on every call.
+"""
+
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict
+
+__all__ = ["ThreadBudget", "configure_threads", "get_budget", "shared_pool"]
+
+_OPENMP_ENV = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "NUMEXPR_NUM_THREADS")
+
+
+def _env_int(name: str) -> int | None:
+    value = os.environ.get(name, "").strip()
+    return int(value) if value else None
+
+
+@dataclass(frozen=True)
+class ThreadBudget:
+    threads: int
+
+    @classmethod
+    def from_env(cls) -> "ThreadBudget":
+        explicit = _env_int("TS360_THREAD_BUDGET")
+        if explicit:
+            return cls(max(1, explicit))
+        workers = _env_int("TS360_WORKERS") or _env_int("WEB_CONCURRENCY") or 1
+        return cls(max(1, (os.cpu_count() or 1) // max(1, workers)))
+
+    def resolve(self, n_jobs: int | None) -> int:
+        """Map a joblib-style `n_jobs` (None, -1, -2, …) onto this budget."""
+        if n_jobs is None or n_jobs == 0:
+            return 1
+        if n_jobs < 0:
+            return max(1, self.threads + 1 + n_jobs)
+        return min(n_jobs, self.threads)
+
+    def apply(self) -> Dict[str, int]:
+        """Cap OpenMP/BLAS, torch and numba thread pools at `threads`."""
+        applied: Dict[str, int] = {}
+        for var in _OPENMP_ENV:
+            # Only honoured by runtimes that are initialised after this point
+            os.environ.setdefault(var, str(self.threads))
+        try:
+            from threadpoolctl import threadpool_limits
+
+            threadpool_limits(limits=self.threads)  # already-loaded OpenMP/BLAS libraries
+            applied["openmp_blas"] = self.threads
+        except ImportError:  # pragma: no cover - shipped with scikit-learn
+            pass
+        torch = sys.modules.get("torch")  # don't import torch just to limit it
+        if torch is not None:
+            torch.set_num_threads(self.threads)
+            applied["torch"] = self.threads
+        numba = sys.modules.get("numba")
+        if numba is not None:
+            numba.set_num_threads(min(self.threads, numba.config.NUMBA_NUM_THREADS))
+            applied["numba"] = self.threads
+        return applied
+
+
+_lock = threading.Lock()
+_budget: ThreadBudget | None = None
+_pool: ThreadPoolExecutor | None = None
+
+
+def get_budget() -> ThreadBudget:
+    global _budget
+    with _lock:
+        if _budget is None:
+            _budget = ThreadBudget.from_env()
+        return _budget
+
+
+def configure_threads(threads: int | None = None) -> ThreadBudget:
+    """Set (or re-read from env) the process budget and apply it everywhere."""
+    global _budget, _pool
+    budget = ThreadBudget(max(1, threads)) if threads else ThreadBudget.from_env()
+    with _lock:
+        _budget = budget
+        if _pool is not None and _pool._max_workers != budget.threads:
+            _pool.shutdown(wait=False)
+            _pool = None
+    budget.apply()
+    return budget
+
+
+def shared_pool() -> ThreadPoolExecutor:
+    """Persistent inference pool sized to the budget (created on first use)."""
+    global _pool
+    budget = get_budget()
+    with _lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(budget.threads, thread_name_prefix="ts360-infer")
+        return _pool
@@ -53,8 +53,8 @@ class FraudExplainer:
         
         # Get prediction first
         if self.model_type == "isolation_forest":
-            prediction = self.model.predict(transaction_df)[0]  # type: ignore[attr-defined]
-            score = self.model.score_samples(transaction_df)[0]  # type: ignore[attr-defined]
+            preds, scores = self.model.predict_with_scores(transaction_df)  # type: ignore[attr-defined]
+            prediction, score = preds[0], scores[0]
         else:
             score = self.model.predict_score(transaction_df)[0]  # type: ignore[attr-defined]
             prediction = -1 if score > 0.5 else 1
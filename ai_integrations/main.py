@@ -5,8 +5,9 @@ from typing import List
 
 import pandas as pd
 
-from cortex.fraud_detection import FraudDetector
+from cortex.fraud_detection import FraudDetector, ScoreWriter, TRANSACTION_SCHEMA
 from cortex.graph_analytics import build_transaction_graph, detect_fraud_rings, ring_stats
+from cortex.thread_budget import configure_threads
 
 
 SAMPLE_FIELDS = [
@@ -38,9 +39,39 @@ def _generate_synthetic_transactions(n: int = 500) -> pd.DataFrame:
     return pd.DataFrame(rows)
 
 
+def run_streaming(args: argparse.Namespace):
+    """Fit on a bounded sample and score `--input` chunk by chunk."""
+    def chunks(columns=None):
+        return FraudDetector.iter_chunks(args.input, chunk_size=args.chunk_size, columns=columns)
+
+    detector = FraudDetector().fit_stream(chunks(), max_rows=args.train_rows)
+    print(f"[INFO] Fitted on a sample of up to {args.train_rows} rows; columns: {detector.column_strategies}")
+
+    # Scoring pass only decodes the model's columns (plus the ID to join back on)
+    projection = detector.input_columns + ["transaction_id"]
+    writer = ScoreWriter(args.output) if args.output else None
+    total = flagged = 0
+    try:
+        for i, (chunk, preds, scores) in enumerate(detector.score_stream(chunks(projection))):
+            total += len(chunk)
+            flagged += int((preds == -1).sum())
+            if writer is not None:
+                writer.write(chunk, pred=preds, fraud_score=scores)
+            print(f"[INFO] chunk {i + 1}: {total} scored, {flagged} flagged")
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if args.output:
+        print(f"Saved scored transactions to {args.output}")
+
+
 def run_demo(args: argparse.Namespace):
+    if args.input and args.chunk_size:
+        return run_streaming(args)
+
     if args.input:
-        df = FraudDetector.load_jsonl(args.input)
+        df = FraudDetector.load(args.input, schema=TRANSACTION_SCHEMA)
     else:
         print("[INFO] No input specified. Generating synthetic dataset...")
         df = _generate_synthetic_transactions()
@@ -51,8 +82,7 @@ def run_demo(args: argparse.Namespace):
 
     detector = FraudDetector()
     detector.fit(train_df)
-    preds = detector.predict(test_df)
-    scores = detector.score_samples(test_df)
+    preds, scores = detector.predict_with_scores(test_df)
 
     print("=== Fraud Detector Results (negative score = suspicious) ===")
     test_df = test_df.assign(pred=preds, score=scores)
@@ -72,13 +102,51 @@ def run_demo(args: argparse.Namespace):
 
 def parse_args() -> argparse.Namespace:
     p = argparse.ArgumentParser(description="Walmart TrustShield 360 - AI Cortex demo")
-    p.add_argument("--input", type=Path, help="Path to JSONL transactions file")
-    p.add_argument("--output", type=Path, help="Optional CSV path to save scored output")
+    p.add_argument("--input", type=Path, help="Transactions file (.jsonl, .csv, .parquet or Arrow IPC .arrow/.arrows)")
+    p.add_argument("--output", type=Path, help="Optional path to save scored output (format from suffix; default CSV)")
+    p.add_argument(
+        "--chunk-size",
+        type=int,
+        help="Stream --input in chunks of this many rows (bounded memory; skips graph analytics)",
+    )
+    p.add_argument("--train-rows", type=int, default=200_000, help="Max rows sampled for fitting in streaming mode")
+    p.add_argument("--threads", type=int, help="CPU threads for this run (default: $TS360_THREAD_BUDGET or all cores)")
+
+    sub = p.add_subparsers(dest="command")
+    score = sub.add_parser("score", help="Score a large JSONL/Parquet/Arrow file with the published model across processes")
+    score.add_argument("--input", type=Path, required=True, help="Transactions file (.jsonl, .parquet or Arrow IPC .arrow)")
+    score.add_argument("--output", type=Path, help="Scored output (format from suffix; default CSV)")
+    score.add_argument("--workers", type=int, help="Worker processes (default: all cores)")
+    score.add_argument("--chunk-size", type=int, default=100_000, help="Rows per shard handed to a worker")
+    score.add_argument("--model-dir", type=Path, help="Model registry root (default: $TS360_MODEL_DIR or ./models)")
+    score.add_argument("--version", help="Registry version to score with (default: LATEST)")
     return p.parse_args()
 
 
+def run_score(args: argparse.Namespace):
+    from cortex.batch_scoring import score_file
+
+    summary = score_file(
+        args.input,
+        args.output,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        model_root=args.model_dir,
+        version=args.version,
+    )
+    print(
+        f"[score] {summary['rows']:,} rows ({summary['flagged']:,} flagged) in {summary['seconds']}s "
+        f"with {summary['workers']} workers: {summary['rows_per_second']:,.0f} rows/s (model {summary['version']})"
+    )
+    if args.output:
+        print(f"Saved scored transactions to {args.output}")
+
+
 def main():
     args = parse_args()
+    if args.command == "score":
+        return run_score(args)
+    configure_threads(args.threads)
     run_demo(args)
 
 
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+"""Alert queue overflow: spilled alerts come back and the counters add up."""
+
+import asyncio
+
+from alerts.fraud_alerter import AlertChannel, FraudAlerter
+
+
+class _SlowChannel(AlertChannel):
+    name = "slow"
+
+    def __init__(self):
+        self.sent = []
+
+    async def send_alert(self, alert) -> bool:
+        await asyncio.sleep(0.01)
+        self.sent.append(alert.transaction_id)
+        return True
+
+
+def test_spilled_alerts_are_counted_when_refilled(tmp_path, monkeypatch):
+    monkeypatch.delenv("TS360_ALERT_DB", raising=False)
+    channel = _SlowChannel()
+    alerter = FraudAlerter(
+        channels=[channel], queue_size=4, workers=1, overflow="spill",
+        spill_path=str(tmp_path / "spill.jsonl"), windows={},
+    )
+
+    async def run():
+        for i in range(11):
+            tx = {"transaction_id": f"T{i}", "source_id": f"U{i}", "target_id": "M", "amount": 1}
+            alerter.enqueue_fraud_alert(tx, 0.95, "m")
+        await alerter.close(drain_timeout=5.0)
+
+    asyncio.run(run())
+    stats = alerter.stats()
+    assert stats["spilled"] > 0
+    assert stats["delivered"] == 11 == len(channel.sent)
+    assert stats["enqueued"] + stats["spilled"] == 11
+    assert stats["refilled"] == stats["spilled"]
+    assert stats["delivered"] <= stats["enqueued"] + stats["refilled"]
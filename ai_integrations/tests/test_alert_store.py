@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+"""AlertStore: ring buffer, SQLite batching, keyset paging and rejected rows."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from alerts.alert_store import AlertQuery, AlertStore
+from alerts.fraud_alerter import FraudAlert, FraudAlerter
+
+
+def _alert(i: int, **overrides) -> FraudAlert:
+    fields = dict(
+        transaction_id=f"T{i}",
+        source_id=f"U{i % 3}",
+        target_id="M1",
+        amount=10.0 * i,
+        risk_score=0.5 + (i % 5) / 10,
+        model_used="isolation_forest",
+        timestamp=datetime(2026, 1, 1) + timedelta(seconds=i),
+        severity="HIGH" if i % 2 else "MEDIUM",
+    )
+    fields.update(overrides)
+    return FraudAlert(**fields)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    path = tmp_path / "alerts.db" if request.param == "sqlite" else None
+    s = AlertStore(path, ring_size=100, flush_interval_s=0.05)
+    yield s
+    s.close()
+
+
+def test_pages_newest_first_with_filters(store):
+    for i in range(25):
+        store.append(_alert(i))
+    seen, cursor = [], None
+    while True:
+        page, cursor = store.query(AlertQuery(severity="HIGH"), limit=4, cursor=cursor)
+        seen += [a["transaction_id"] for a in page]
+        if cursor is None:
+            break
+    assert seen == [f"T{i}" for i in range(23, -1, -2)]
+    assert store.count() == 25
+
+
+def test_rejected_row_does_not_block_the_batch(tmp_path):
+    store = AlertStore(tmp_path / "alerts.db", flush_interval_s=3600)
+    try:
+        store.append(_alert(1))
+        store.append(_alert(2, transaction_id=None))  # violates NOT NULL
+        store.append(_alert(3))
+        store.flush()
+        assert store.rejected == 1
+        assert store._pending == []
+        assert [a["transaction_id"] for a in store.query(limit=10)[0]] == ["T3", "T1"]
+        store.append(_alert(4))
+        assert store.count() == 3  # later flushes are not stuck on the bad row
+    finally:
+        store.close()
+    reopened = AlertStore(tmp_path / "alerts.db")
+    try:
+        assert reopened.count() == 3
+    finally:
+        reopened.close()
+
+
+def test_alerts_without_ids_are_stored(tmp_path, monkeypatch):
+    monkeypatch.setenv("TS360_ALERT_DB", str(tmp_path / "alerts.db"))
+    alerter = FraudAlerter()
+    try:
+        # /predict passes transaction_id=None when the client omits it
+        tx = {"transaction_id": None, "source_id": "U1", "target_id": None, "amount": None}
+        alert = alerter._build_alert(tx, 0.95, "m")
+        assert (alert.transaction_id, alert.target_id, alert.amount) == ("UNKNOWN", "UNKNOWN", 0.0)
+        assert alerter.store.count() == 1
+        assert alerter.store.rejected == 0
+    finally:
+        alerter.store.close()
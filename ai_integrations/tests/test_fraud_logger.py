@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+"""Wallet reputation cache: rebuilds stay exact while blocks are sealed concurrently."""
+
+import asyncio
+import collections
+import random
+import time
+
+from blockchain.fraud_logger import BlockchainFraudLogger
+
+WALLETS = [f"W{i}" for i in range(16)]
+
+
+def test_reputation_reads_on_threads_while_logging(tmp_path, monkeypatch):
+    monkeypatch.setenv("TS360_LEDGER_CHECKPOINT_EVERY", "16")
+    logger = BlockchainFraudLogger(ledger_dir=str(tmp_path / "ledger"))
+    logger.batcher.max_entries = 8
+    logger.batcher.max_wait_ms = 1
+    rnd = random.Random(0)
+    expected = collections.Counter()
+    read_history = logger.blockchain.get_fraud_history
+
+    def slow_history(wallet):
+        history = read_history(wallet)
+        time.sleep(0.002)  # widen the window in which a block can be sealed mid-rebuild
+        return history
+
+    monkeypatch.setattr(logger.blockchain, "get_fraud_history", slow_history)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        readers = []
+        for i in range(400):
+            src, dst = rnd.sample(WALLETS, 2)
+            expected.update([src, dst])
+            await logger.log_fraud_detection(f"T{i}", src, dst, 5.0, rnd.random(), "m")
+            readers.append(loop.run_in_executor(None, logger.get_wallet_reputation, rnd.choice(WALLETS)))
+            if i % 10 == 0:
+                logger._aggregates.clear()  # as if evicted: the next reads rebuild on worker threads
+                await asyncio.sleep(0.002)  # let background seals land mid-rebuild
+        await asyncio.gather(*readers)
+        while logger.batcher.stats()["pending"] or logger.batcher.stats()["sealing"]:
+            await asyncio.sleep(0.01)
+
+    try:
+        asyncio.run(run())
+        for wallet in WALLETS:  # cached aggregates first, then fresh rebuilds
+            assert logger.get_wallet_reputation(wallet)["total_transactions"] == expected[wallet]
+            logger._aggregates.clear()
+            assert logger.get_wallet_reputation(wallet)["total_transactions"] == expected[wallet]
+    finally:
+        logger.close()
+
+
+def test_rebuild_does_not_lose_a_block_sealed_mid_read():
+    logger = BlockchainFraudLogger()
+    logger.batcher.max_entries = 100
+
+    async def log(n):
+        for i in range(n):
+            await logger.log_fraud_detection(f"T{i}", "A", "B", 5.0, 0.9, "m")
+
+    logger.batcher.max_wait_ms = 10**6  # entries stay pending until flush()
+    asyncio.run(log(3))
+    logger.flush()
+    asyncio.run(log(2))
+    logger._aggregates.clear()
+
+    read_history = logger.blockchain.get_fraud_history
+    sealed = []
+
+    def history_then_seal(wallet):
+        history = read_history(wallet)
+        if not sealed:  # the pending entries land in the ledger right after history was read
+            sealed.append(logger.flush())
+        return history
+
+    logger.blockchain.get_fraud_history = history_then_seal
+    assert logger.get_wallet_reputation("A")["total_transactions"] == 5
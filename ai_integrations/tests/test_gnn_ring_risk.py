@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+"""cycles_to_batch against the per-cycle `cycle_to_data` path."""
+
+import random
+
+import networkx as nx
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("torch_geometric")
+
+from cortex.gnn_ring_risk import RingRiskGNN, cycle_to_data, cycles_to_batch, score_rings  # noqa: E402
+
+
+def _graph(n_nodes: int, n_edges: int, seed: int = 0) -> nx.DiGraph:
+    rnd = random.Random(seed)
+    g = nx.DiGraph()
+    g.add_nodes_from(f"U{i}" for i in range(n_nodes))
+    while g.number_of_edges() < n_edges:
+        u, v = rnd.sample(range(n_nodes), 2)
+        g.add_edge(f"U{u}", f"U{v}")
+    return g
+
+
+def _rings(g: nx.DiGraph, limit: int = 40):
+    return [tuple(c) for c, _ in zip(nx.simple_cycles(g, length_bound=5), range(limit))]
+
+
+def _per_ring(batch, i):
+    """(sorted degrees, undirected edge set over batch-local node ids) of ring *i*."""
+    lo, hi = int(batch.ptr[i]), int(batch.ptr[i + 1])
+    mask = (batch.edge_index[0] >= lo) & (batch.edge_index[0] < hi)
+    edges = {tuple(sorted(e)) for e in (batch.edge_index[:, mask] - lo).t().tolist()}
+    return batch.x[lo:hi, 0].tolist(), edges
+
+
+def _undirected(data, names):
+    return {frozenset((names[u], names[v])) for u, v in data.edge_index.t().tolist()}
+
+
+def test_same_nodes_degrees_and_edges_as_cycle_to_data():
+    g = _graph(200, 600)  # rings are far smaller than g: networkx walks them in set order
+    rings = _rings(g)
+    assert rings
+    index = {n: i for i, n in enumerate(g.nodes())}
+    batch = cycles_to_batch(g, rings, index)
+    for i, ring in enumerate(rings):
+        data = cycle_to_data(g, ring)
+        local = sorted(set(ring), key=index.get)  # batch-local order is g's node order
+        degrees, edges = _per_ring(batch, i)
+        assert degrees == [float(g.subgraph(ring).to_undirected().degree[n]) for n in local]
+        assert {frozenset((local[u], local[v])) for u, v in edges} == _undirected(
+            data, list(g.subgraph(ring).to_undirected().nodes())
+        )
+
+
+def test_identical_to_cycle_to_data_when_walk_follows_graph_order():
+    # Rings holding at least half of g's nodes are walked in g's order: edge directions agree too
+    g = nx.DiGraph([("a", "b"), ("b", "c"), ("c", "a"), ("c", "d"), ("d", "a"), ("b", "d")])
+    rings = [tuple(c) for c in nx.simple_cycles(g)]
+    model = RingRiskGNN()
+    batch = cycles_to_batch(g, rings)
+    for i, ring in enumerate(rings):
+        data = cycle_to_data(g, ring)
+        lo, hi = int(batch.ptr[i]), int(batch.ptr[i + 1])
+        mask = (batch.edge_index[0] >= lo) & (batch.edge_index[0] < hi)
+        assert sorted(map(tuple, (batch.edge_index[:, mask] - lo).t().tolist())) == sorted(
+            map(tuple, data.edge_index.t().tolist())
+        )
+        assert batch.x[lo:hi].tolist() == data.x.tolist()
+    with torch.no_grad():
+        expected = [model.eval()(cycle_to_data(g, r)).item() for r in rings]
+    assert score_rings(g, rings, model) == pytest.approx(expected, abs=1e-6)
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+"""Merkle trees and block inclusion proofs (blockchain.merkle, MockBlockchain)."""
+
+import copy
+
+import pytest
+
+from blockchain.fraud_logger import BlockchainFraudLogger, FraudLogEntry, MockBlockchain
+from blockchain.merkle import _node_hash, leaf_hash, merkle_proof, merkle_root, verify_proof
+
+# 2**k + 1 leaves leave one odd node at every level
+SIZES = [1, 2, 3, 4, 5, 7, 8, 9, 17, 33]
+
+
+def _leaves(n):
+    return [leaf_hash(f"record-{i}".encode()) for i in range(n)]
+
+
+def _entry(i: int, wallet: str = "w1") -> FraudLogEntry:
+    return FraudLogEntry(
+        transaction_id=f"T{i}",
+        fraud_score=(i % 10) / 10,
+        model_used="isolation_forest",
+        timestamp=1_700_000_000 + i,
+        source_wallet=wallet,
+        target_wallet=f"m{i % 3}",
+        amount=10.0 + i,
+    )
+
+
+def _self_paired(leaf, proof):
+    """Steps where the node was paired with itself (flipping their side changes nothing)."""
+    node, steps = leaf, set()
+    for i, step in enumerate(proof):
+        sibling = bytes.fromhex(step["hash"])
+        if sibling == node:
+            steps.add(i)
+        node = _node_hash(sibling, node) if step["position"] == "left" else _node_hash(node, sibling)
+    return steps
+
+
+# ----------------------------------------------------------------------
+# merkle.py
+# ----------------------------------------------------------------------
+@pytest.mark.parametrize("n", SIZES)
+def test_every_leaf_proves_against_the_root(n):
+    leaves = _leaves(n)
+    root = merkle_root(leaves)
+    for i, leaf in enumerate(leaves):
+        proof = merkle_proof(leaves, i)
+        assert len(proof) == (n - 1).bit_length()
+        assert verify_proof(leaf, proof, root)
+
+
+def test_single_leaf_and_empty_roots():
+    leaf = leaf_hash(b"only")
+    assert merkle_root([leaf]) == leaf
+    assert merkle_proof([leaf], 0) == []
+    assert merkle_root([]) == bytes(32)
+
+
+def test_leaf_and_node_hashes_are_domain_separated():
+    a, b = leaf_hash(b"a"), leaf_hash(b"b")
+    assert leaf_hash(a + b) != _node_hash(a, b)
+
+
+@pytest.mark.parametrize("n", SIZES)
+def test_tampered_proofs_fail(n):
+    leaves = _leaves(n)
+    root = merkle_root(leaves)
+    for i, leaf in enumerate(leaves):
+        proof = merkle_proof(leaves, i)
+        assert not verify_proof(leaf_hash(b"forged"), proof, root)
+        assert not verify_proof(leaf, proof, leaf_hash(b"other root"))
+        self_paired = _self_paired(leaf, proof)
+        for s, step in enumerate(proof):
+            bad = copy.deepcopy(proof)
+            bad[s]["hash"] = leaf_hash(b"evil").hex()
+            assert not verify_proof(leaf, bad, root)
+            if s not in self_paired:
+                bad = copy.deepcopy(proof)
+                bad[s]["position"] = "left" if step["position"] == "right" else "right"
+                assert not verify_proof(leaf, bad, root)
+        if proof:
+            assert not verify_proof(leaf, proof[:-1], root)
+
+
+def test_proof_index_out_of_range():
+    with pytest.raises(IndexError):
+        merkle_proof(_leaves(3), 3)
+
+
+# ----------------------------------------------------------------------
+# MockBlockchain inclusion proofs
+# ----------------------------------------------------------------------
+@pytest.fixture
+def chain_with_blocks():
+    chain = MockBlockchain()
+    hashes = []
+    for block, n in enumerate(SIZES):
+        sealed = chain.add_fraud_block([_entry(block * 100 + i) for i in range(n)])
+        hashes.append(["0x" + leaf.hex() for leaf in sealed["leaves"]])
+    return chain, hashes
+
+
+def test_block_proofs_verify(chain_with_blocks):
+    chain, hashes = chain_with_blocks
+    for number, block in enumerate(hashes, start=1):
+        for index, tx_hash in enumerate(block):
+            proof = chain.get_inclusion_proof(tx_hash)
+            assert proof["tx_hash"] == tx_hash
+            assert proof["index"] == index
+            assert proof["header"]["number"] == number
+            assert MockBlockchain.verify_inclusion(proof)
+    assert chain.verify_chain()
+
+
+def test_tampered_block_proofs_fail(chain_with_blocks):
+    chain, hashes = chain_with_blocks
+    proof = chain.get_inclusion_proof(hashes[-1][5])  # 33-leaf block: a 6-step path
+
+    bad = copy.deepcopy(proof)
+    bad["record"] = bad["record"].replace('"fraud_score": ', '"fraud_score": 1')
+    assert not MockBlockchain.verify_inclusion(bad)
+
+    for s in range(len(proof["proof"])):
+        bad = copy.deepcopy(proof)
+        bad["proof"][s]["hash"] = "00" * 32
+        assert not MockBlockchain.verify_inclusion(bad)
+        bad = copy.deepcopy(proof)
+        bad["proof"][s]["position"] = "left" if proof["proof"][s]["position"] == "right" else "right"
+        assert not MockBlockchain.verify_inclusion(bad)
+
+    for field, value in [("timestamp", 0), ("number", 99), ("merkle_root", "00" * 32), ("size", 1)]:
+        bad = copy.deepcopy(proof)
+        bad["header"][field] = value
+        assert not MockBlockchain.verify_inclusion(bad)
+
+    bad = copy.deepcopy(proof)
+    bad["block_hash"] = "0x" + "00" * 32
+    assert not MockBlockchain.verify_inclusion(bad)
+
+
+def test_supply_chain_event_proof():
+    logger = BlockchainFraudLogger()
+    event = logger.track_product_journey("P1", "MANUFACTURED", "Plant A")
+    proof = logger.get_inclusion_proof(event["event_hash"])
+    assert proof["kind"] == "supply_chain"
+    assert MockBlockchain.verify_inclusion(proof)
+
+
+def test_pending_entry_has_no_proof_until_sealed():
+    logger = BlockchainFraudLogger()
+    receipt = logger.batcher.submit(_entry(1))  # no event loop: sealed on flush
+    assert receipt.status == "pending"
+    assert logger.get_inclusion_proof(receipt.tx_hash) is None
+    logger.flush()
+    assert MockBlockchain.verify_inclusion(logger.get_inclusion_proof(receipt.tx_hash))
+
+
+def test_proof_endpoint_404_for_pending(monkeypatch):
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient  # type: ignore
+
+    app_module = pytest.importorskip("api.fastapi_app")
+    logger = BlockchainFraudLogger()
+    monkeypatch.setattr(app_module, "_blockchain_logger", logger)
+    receipt = logger.batcher.submit(_entry(1))
+    client = TestClient(app_module.app)
+
+    assert client.get(f"/blockchain/proof/{receipt.tx_hash}").status_code == 404
+    assert client.get("/blockchain/proof/0x" + "ab" * 32).status_code == 404
+    logger.flush()
+    response = client.get(f"/blockchain/proof/{receipt.tx_hash}")
+    assert response.status_code == 200
+    assert response.json()["verified"] is True
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+"""SegmentLedger crash recovery: reopen after os._exit, torn batches, lost indexes, locking."""
+
+import json
+import os
+import random
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from blockchain.fraud_logger import BLOCK, FRAUD_LOG, SUPPLY_CHAIN, FraudLogEntry, MockBlockchain, SupplyChainEvent
+from blockchain.segment_ledger import _FRAME, SegmentLedger
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="ledger locking uses flock")
+
+ROOT = Path(__file__).resolve().parents[1]
+WALLETS = [f"W{i}" for i in range(12)]
+PRODUCTS = [f"P{i}" for i in range(4)]
+# Small segments and checkpoints so a run spans several of each, plus an unindexed tail
+LEDGER_OPTS = {"segment_bytes": 4096, "checkpoint_every": 7}
+
+
+def fill(chain: MockBlockchain, blocks: int, seed: int = 0) -> None:
+    rnd = random.Random(seed)
+    for b in range(blocks):
+        chain.add_fraud_block([
+            FraudLogEntry(
+                transaction_id=f"T{seed}-{b}-{i}",
+                fraud_score=round(rnd.random(), 3),
+                model_used="isolation_forest",
+                timestamp=1_700_000_000 + b,
+                source_wallet=rnd.choice(WALLETS),
+                target_wallet=rnd.choice(WALLETS),
+                amount=round(rnd.random() * 100, 2),
+            )
+            for i in range(rnd.randrange(1, 6))
+        ])
+        if b % 3 == 0:  # late events are ordered by timestamp in the trace
+            chain.add_supply_chain_event(SupplyChainEvent(PRODUCTS[b % 4], "SHIPPED", f"DC{b}", 1_700_001_000 - b))
+
+
+def state(chain: MockBlockchain) -> dict:
+    """Everything a reopened ledger must reproduce, as JSON-comparable data."""
+    return json.loads(json.dumps({
+        "head_hash": chain.head_hash,
+        "counts": {kind: chain.ledger.count(kind) for kind in (BLOCK, FRAUD_LOG, SUPPLY_CHAIN)},
+        "wallets": {w: chain.get_fraud_history(w) for w in WALLETS},
+        "products": {p: chain.get_supply_chain_trace(p) for p in PRODUCTS},
+    }))
+
+
+# Runs in a child process that dies with os._exit: no close(), no final checkpoint
+CHILD = """
+import json, os, sys
+from blockchain.fraud_logger import FraudLogEntry, MockBlockchain
+from blockchain.segment_ledger import SegmentLedger
+from tests.test_segment_ledger import LEDGER_OPTS, fill, state
+
+path, blocks, checkpoint_every, torn = sys.argv[1], int(sys.argv[2]), int(sys.argv[3]), sys.argv[4] == "1"
+ledger = SegmentLedger(path, **{**LEDGER_OPTS, "checkpoint_every": checkpoint_every})
+chain = MockBlockchain(ledger)
+fill(chain, blocks)
+out = {"state": state(chain), "before": [ledger._segment, ledger._offset]}
+if torn:  # one more block (a single append batch), which the test then cuts short on disk
+    chain.add_fraud_block([FraudLogEntry(f"X{i}", 0.5, "m", 1_700_009_999, "W0", "W1", 1.0) for i in range(3)])
+    out["after"] = [ledger._segment, ledger._offset]
+print(json.dumps(out), flush=True)
+os._exit(0)
+"""
+
+
+def crash_after_writes(path: Path, blocks: int, checkpoint_every: int = 7, torn: bool = False) -> dict:
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")]))}
+    done = subprocess.run(
+        [sys.executable, "-c", CHILD, str(path), str(blocks), str(checkpoint_every), "1" if torn else "0"],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=120, check=True,
+    )
+    return json.loads(done.stdout.strip().splitlines()[-1])
+
+
+def reopen(path: Path, **kwargs) -> MockBlockchain:
+    return MockBlockchain(SegmentLedger(path, **{**LEDGER_OPTS, **kwargs}))
+
+
+def test_reopen_after_crash(tmp_path):
+    child = crash_after_writes(tmp_path, blocks=60)
+    chain = reopen(tmp_path)
+    try:
+        assert chain.ledger.checkpoints == 0
+        assert 0 < chain.ledger.replayed < sum(child["state"]["counts"].values())  # only the tail
+        assert state(chain) == child["state"]
+        assert chain.verify_chain()
+
+        # The recovered ledger keeps appending on the same chain
+        fill(chain, 5, seed=1)
+        expected = state(chain)
+    finally:
+        chain.ledger.close()
+    chain = reopen(tmp_path)
+    try:
+        assert chain.ledger.replayed == 0  # close() checkpointed everything
+        assert state(chain) == expected
+        assert chain.verify_chain()
+    finally:
+        chain.ledger.close()
+
+
+def _frame_end(segment: Path, offset: int) -> int:
+    with open(segment, "rb") as f:
+        f.seek(offset)
+        _, _, _, keys_len, length, _ = _FRAME.unpack(f.read(_FRAME.size))
+    return offset + _FRAME.size + keys_len + length
+
+
+@pytest.mark.parametrize("cut", ["mid_header", "frame_boundary", "last_byte"])
+def test_torn_batch_is_truncated(tmp_path, cut):
+    # No checkpoint in the child: recovery replays everything from the segments
+    child = crash_after_writes(tmp_path, blocks=30, checkpoint_every=10**6, torn=True)
+    (seg_before, off_before), (seg_after, off_after) = child["before"], child["after"]
+    start = off_before if seg_after == seg_before else 0  # the extra block may open a new segment
+    segment = tmp_path / f"{seg_after:08d}.seg"
+    size = {
+        "mid_header": start + 5,
+        "frame_boundary": _frame_end(segment, start),  # whole frames, but no commit flag
+        "last_byte": off_after - 1,
+    }[cut]
+    os.truncate(segment, size)
+
+    chain = reopen(tmp_path)
+    try:
+        assert state(chain) == child["state"]
+        assert chain.ledger.replayed == sum(child["state"]["counts"].values())
+        assert segment.stat().st_size == start  # the partial batch is gone from disk
+        assert chain.verify_chain()
+        fill(chain, 3, seed=2)
+        expected = state(chain)
+    finally:
+        chain.ledger.close()
+    chain = reopen(tmp_path)
+    try:
+        assert state(chain) == expected and chain.verify_chain()
+    finally:
+        chain.ledger.close()
+
+
+def test_rebuild_when_index_files_are_missing(tmp_path):
+    child = crash_after_writes(tmp_path, blocks=40)
+    removed = list(tmp_path.glob("kind-*.idx"))
+    assert removed
+    for p in removed:
+        p.unlink()
+
+    chain = reopen(tmp_path)
+    try:
+        assert chain.ledger.replayed == sum(child["state"]["counts"].values())  # rebuilt from scratch
+        assert state(chain) == child["state"]
+        assert chain.verify_chain()
+    finally:
+        chain.ledger.close()
+
+
+def test_second_open_is_refused(tmp_path):
+    first = SegmentLedger(tmp_path)
+    try:
+        with pytest.raises(RuntimeError, match="open in another process"):
+            SegmentLedger(tmp_path)
+    finally:
+        first.close()
+    SegmentLedger(tmp_path).close()  # released on close
+
+
+def test_lock_is_released_when_the_writer_dies(tmp_path):
+    crash_after_writes(tmp_path, blocks=2)
+    SegmentLedger(tmp_path).close()